@@ -0,0 +1,58 @@
+"""
+Time customer preference table extraction in batch_process as the table grows.
+
+Extraction reads the sheet in one pass, so the time per row should stay flat. For
+comparison the script also times the previous access pattern, which re-created a row
+iterator for every row (`list(ws.iter_rows(min_row=r, max_row=r))[0]`).
+
+    python -m benchmarks.bench_preference_table [--rows 1000 2000 4000 8000]
+"""
+
+import argparse
+import time
+
+from openpyxl import Workbook
+
+from src.conversion.batch_process import extract_customer_preference_table, find_customer_preference_table
+
+
+def build_sheet(rows: int, values_per_row: int = 5):
+    ws = Workbook().active
+    ws.cell(row=1, column=1, value="Customer preferences")
+    for row in range(2, rows + 2):
+        ws.cell(row=row, column=1, value=f"preference {row}")
+        for col in range(2, values_per_row + 2):
+            ws.cell(row=row, column=col, value=f"value {row}.{col}")
+    return ws
+
+
+def extract(ws):
+    return extract_customer_preference_table(ws, find_customer_preference_table(ws))
+
+
+def per_row_iterators(ws):
+    """The previous pattern: one fresh iter_rows call per row."""
+    return [list(ws.iter_rows(min_row=r, max_row=r))[0][0].value for r in range(1, ws.max_row + 1)]
+
+
+def timed(function, ws):
+    start = time.perf_counter()
+    function(ws)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 2000, 4000, 8000])
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'extract':>10} {'us/row':>8} {'per-row iter_rows':>18} {'us/row':>8}")
+    for rows in args.rows:
+        ws = build_sheet(rows)
+        assert len(extract(ws)["preferences"]) == rows
+        fast, slow = timed(extract, ws), timed(per_row_iterators, ws)
+        print(f"{rows:>8} {fast:>9.3f}s {fast / rows * 1e6:>8.1f} {slow:>17.3f}s {slow / rows * 1e6:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,54 +1,114 @@
+import argparse
 import json
 import time
 import logging
 from tqdm import tqdm
 import os
+from functools import partial
 
+from src.conversion.cache import DEFAULT_MAX_BYTES, ConversionCache
 from src.conversion.converter import ExcelToPythonConverter, build_dependency_graph, topological_sort, ConvertedFormula
-from src.conversion.rules_generator import generate_python_rules_file
-from src.evaluation.evaluator import evaluate_rules
+from src.conversion.parallel import convert_formulas, map_files
+from src.conversion.rules_generator import write_python_rules_file
+from src.conversion.sheet_store import compact_sheet, index_sheets
+from src.evaluation.engine import RuleEngine
+from src.evaluation.scheduler import LevelScheduler
 from src.utils.scrape import extract_data_and_formulas_from_excel
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(message)s')
 
 
-def main():
+def main(argv=None):
     """Main conversion function."""
+    parser = argparse.ArgumentParser(description='Convert Excel formulas into Python rules')
+    parser.add_argument('--cache-dir', default='data/cache',
+                        help='Directory for cached extraction/conversion results (default: data/cache)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Re-extract and re-convert every workbook, ignoring the cache')
+    parser.add_argument('--cache-max-mb', type=int, default=DEFAULT_MAX_BYTES >> 20,
+                        help='Evict least recently used cache entries beyond this size '
+                             f'(0 = unbounded, default: {DEFAULT_MAX_BYTES >> 20})')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Processes to extract workbooks and convert formulas with (0 = one per CPU, default: 1)')
+    parser.add_argument('--max-in-flight', type=int, default=None,
+                        help='Most workbooks extracted or held in memory at once (default: two per worker)')
+    parser.add_argument('--eval-threads', type=int, default=1,
+                        help='Threads to evaluate independent rules of large dependency levels with '
+                             '(0 = one per CPU, default: 1 = sequential)')
+    parser.add_argument('--iterative', action='store_true',
+                        help='Allow circular references and solve each cycle by fixed-point iteration')
+    parser.add_argument('--max-iterations', type=int, default=100,
+                        help='Iterations per cycle with --iterative (default: 100, as in Excel)')
+    parser.add_argument('--max-change', type=float, default=0.001,
+                        help='Change below which a cycle has converged with --iterative (default: 0.001)')
+    parser.add_argument('--sparse', action='store_true',
+                        help='Skip blank cells during extraction and trim phantom used ranges')
+    parser.add_argument('--rules-backend', choices=['python', 'numpy'], default='python',
+                        help='Also write a NumPy-vectorized rules module when set to numpy (default: python)')
+    args = parser.parse_args(argv)
+
     start_time = time.time()
 
     input_dir = 'data/input'
     output_dir = 'data/output'
     os.makedirs(output_dir, exist_ok=True)
 
+    cache = None if args.no_cache else ConversionCache(args.cache_dir, max_bytes=(args.cache_max_mb << 20) or None)
+
     all_formulas = []
     all_data = {}
     # For semantic mapping
     sheet_cell_to_key = {}
 
-    for filename in os.listdir(input_dir):
-        if filename.endswith(('.xlsx', '.xlsm')):
-            file_path = os.path.join(input_dir, filename)
+    extract = partial(extract_data_and_formulas_from_excel, sparse=args.sparse)
+    file_paths = [os.path.join(input_dir, filename) for filename in os.listdir(input_dir)
+                  if filename.endswith(('.xlsx', '.xlsm'))]
+    cached_files = {}
+    if cache:
+        variant = 'sparse' if args.sparse else ''
+        cache_keys = {path: cache.extracted_key(path, variant) for path in file_paths}
+        for path in file_paths:
+            extracted_data = cache.load_extracted(cache_keys[path])
+            if extracted_data is not None:
+                cached_files[path] = extracted_data
+    # Uncached workbooks are extracted one per task; results come back in directory order
+    extracted_files = map_files(extract, [path for path in file_paths if path not in cached_files],
+                                workers=args.workers, max_in_flight=args.max_in_flight, ordered=True)
+
+    for file_path in file_paths:
+        filename = os.path.basename(file_path)
+        if file_path in cached_files:
+            logging.info(f"Loaded extracted data for {filename} from cache")
+            extracted_data = cached_files.pop(file_path)
+        else:
             logging.info(f"Extracting data and formulas from {filename}...")
-            extracted_data = extract_data_and_formulas_from_excel(file_path)
-            for sheet_name, sheet_data in extracted_data.items():
-                for formula_data in sheet_data["formulas"]:
-                    all_formulas.append({
-                        "formula": formula_data["formula"],
-                        "cell": formula_data["cell"],
-                        "sheet": sheet_name
-                    })
-                # Build normalized data structure
-                cell_values = sheet_data.get("data", {})
-                key_values = sheet_data.get("key_values", {})
-                all_data.setdefault(sheet_name, {})
-                # Put flat cell values at top-level for backward compatibility
+            _, extracted_data, error = next(extracted_files)
+            if error is not None:
+                logging.error(f"✗ Failed to extract {filename}: {error}")
+                continue
+            if cache:
+                cache.store_extracted(cache_keys[file_path], extracted_data)
+        for sheet_name, sheet_data in extracted_data.items():
+            for formula_data in sheet_data["formulas"]:
+                all_formulas.append({
+                    "formula": formula_data["formula"],
+                    "cell": formula_data["cell"],
+                    "sheet": sheet_name
+                })
+            # Build normalized data structure
+            cell_values = sheet_data.get("data", {})
+            key_values = sheet_data.get("key_values", {})
+            # Put flat cell values at top-level for backward compatibility, stored columnar
+            if sheet_name in all_data:
                 all_data[sheet_name].update(cell_values)
-                # Also attach by_key mapping used by get_value
-                all_data[sheet_name]['by_key'] = key_values
+            else:
+                all_data[sheet_name] = compact_sheet(cell_values)
+            # Also attach by_key mapping used by get_value
+            all_data[sheet_name]['by_key'] = key_values
 
-                # Build cell->key map for this sheet
-                sheet_cell_to_key.setdefault(sheet_name, {})
-                sheet_cell_to_key[sheet_name].update(sheet_data.get("cell_to_key", {}))
+            # Build cell->key map for this sheet
+            sheet_cell_to_key.setdefault(sheet_name, {})
+            sheet_cell_to_key[sheet_name].update(sheet_data.get("cell_to_key", {}))
 
     converter = ExcelToPythonConverter({})
     # Provide shared mappings to the visitor
@@ -59,22 +119,57 @@ def main():
     }
     converted_formulas = []
 
-    with tqdm(total=len(all_formulas), desc="Converting Formulas") as pbar:
-        for formula_data in all_formulas:
-            try:
-                converted = converter.analyze_formula(
-                    formula_data["formula"],
-                    formula_data["cell"],
-                    formula_data["sheet"],
-                    shared_data
-                )
-                converted_formulas.append(converted)
+    # Convert sheet by sheet so unchanged sheets can be served from the cache
+    formulas_by_sheet = {}
+    for formula_data in all_formulas:
+        formulas_by_sheet.setdefault(formula_data["sheet"], []).append(formula_data)
+
+    sheet_results = {}
+    pending = []
+    for sheet_name, sheet_formulas in formulas_by_sheet.items():
+        cache_key = cache.sheet_key(sheet_name, sheet_formulas, shared_data) if cache else None
+        cached = cache.load_sheet(cache_key) if cache else None
+        if cached is not None:
+            sheet_results[sheet_name] = cached
+            for error in cached["errors"]:
+                logging.error(f"✗ Error converting {error['cell']}: {error['error']}")
+            logging.info(f"✓ Loaded {len(cached['converted'])} converted formulas for {sheet_name} from cache")
+        else:
+            pending.append((sheet_name, cache_key, sheet_formulas))
+
+    # Convert every uncached sheet in one batch so the pool sees the whole workload
+    to_convert = [f for _, _, sheet_formulas in pending for f in sheet_formulas]
+    with tqdm(total=len(to_convert), desc="Converting Formulas") as pbar:
+        results = convert_formulas(to_convert, shared_data, workers=args.workers,
+                                   converter=converter, progress=pbar.update)
+
+    position = 0
+    for sheet_name, cache_key, sheet_formulas in pending:
+        sheet_converted = []
+        sheet_errors = []
+        for formula_data, (converted, error) in zip(sheet_formulas, results[position:position + len(sheet_formulas)]):
+            if converted is not None:
+                sheet_converted.append(converted)
                 logging.info(f"✓ Converted {formula_data['cell']}: {formula_data['formula']}")
-            except Exception as e:
-                logging.error(f"✗ Error converting {formula_data['cell']}: {e}")
-            pbar.update(1)
+            else:
+                sheet_errors.append({"cell": formula_data["cell"], "error": error})
+                logging.error(f"✗ Error converting {formula_data['cell']}: {error}")
+        position += len(sheet_formulas)
+        sheet_results[sheet_name] = {"converted": sheet_converted, "errors": sheet_errors}
+        if cache:
+            cache.store_sheet(cache_key, sheet_converted, sheet_errors)
+
+    for sheet_name in formulas_by_sheet:
+        converted_formulas.extend(sheet_results[sheet_name]["converted"])
 
     print(f"\nSuccessfully converted {len(converted_formulas)} formulas")
+    cache_stats = converter.parse_cache.stats()
+    logging.info(f"Parse cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses, "
+                 f"{cache_stats['shapes']} distinct formula shapes")
+    if cache:
+        disk_stats = cache.stats()
+        logging.info(f"Conversion cache: {disk_stats['hits']} hits, {disk_stats['misses']} misses, "
+                     f"{disk_stats['evictions']} evictions")
 
     if converted_formulas:
         dependency_graph = build_dependency_graph(converted_formulas)
@@ -83,23 +178,29 @@ def main():
             sorted_cells = topological_sort(dependency_graph)
             print("✓ Formulas topologically sorted.")
         except ValueError as e:
-            print(f"✗ Error: {e}")
-            return
-
-        formula_map = {f"{f.sheet}!{f.cell_reference}": f for f in converted_formulas}
-        sorted_formulas = [formula_map[cell] for cell in sorted_cells if cell in formula_map]
-
-        python_code = generate_python_rules_file(converter, sorted_formulas, shared_data, sorted_cells)
+            if not args.iterative:
+                print(f"✗ Error: {e} (use --iterative to solve circular references)")
+                return
+            # Order by strongly connected components; cycles are solved when evaluating
+            sorted_cells = [node for component in dependency_graph.strongly_connected_components()
+                            for node in component]
+            print("✓ Formulas ordered; circular references will be solved iteratively.")
 
         output_file = os.path.join(output_dir, "converted_rules.py")
         with open(output_file, 'w') as f:
-            f.write(python_code)
+            write_python_rules_file(f, converter, converted_formulas, shared_data, sorted_cells)
         print(f"✓ Generated Python rules file: {output_file}")
 
+        if args.rules_backend == 'numpy':
+            numpy_file = os.path.join(output_dir, "converted_rules_numpy.py")
+            with open(numpy_file, 'w') as f:
+                write_python_rules_file(f, converter, converted_formulas, shared_data, sorted_cells,
+                                        backend='numpy')
+            print(f"✓ Generated vectorized rules file: {numpy_file}")
+
         summary = []
         for conv in converted_formulas:
-            node_id = f"{conv.sheet}!{conv.cell_reference}"
-            deps = list(conv.dependencies.predecessors(node_id))
+            deps = conv.dependency_nodes()
             summary.append({
                 "cell": conv.cell_reference,
                 "sheet": conv.sheet,
@@ -114,14 +215,27 @@ def main():
 
         with open(os.path.join(output_dir, "conversion_summary.json"), 'w') as f:
             json.dump(summary, f, indent=2)
-        print(f"✓ Generated conversion summary: {os.path.join(output_dir, "conversion_summary.json")}")
-
-        # Evaluate the rules
-        evaluation_results = evaluate_rules(summary, all_data)
+        print(f"✓ Generated conversion summary: {os.path.join(output_dir, 'conversion_summary.json')}")
+
+        # Evaluate the rules in dependency order so dependents see computed values
+        engine = RuleEngine(summary, dependency_graph, sheet_cell_to_key, iterative=args.iterative,
+                            max_iterations=args.max_iterations, max_change=args.max_change)
+        if args.eval_threads != 1:
+            with LevelScheduler(workers=args.eval_threads) as scheduler:
+                evaluation_results = engine.evaluate(index_sheets(all_data), scheduler=scheduler)
+            logging.info(f"Evaluated {scheduler.parallel_levels} dependency levels in parallel, "
+                         f"{scheduler.inline_levels} inline")
+        else:
+            evaluation_results = engine.evaluate(index_sheets(all_data))
+        for stats in engine.cycle_stats:
+            status = "converged" if stats['converged'] else "did not converge"
+            logging.info(f"Cycle of {len(stats['cells'])} cells ({', '.join(stats['cells'][:5])}"
+                         f"{', ...' if len(stats['cells']) > 5 else ''}) {status} after "
+                         f"{stats['iterations']} iterations (max change {stats['max_change']:g})")
 
         # Append evaluation results to the summary
         for item in summary:
-            item['evaluation_result'] = evaluation_results.get(item['cell'])
+            item['evaluation_result'] = evaluation_results.get(f"{item['sheet']}!{item['cell']}")
 
         with open(os.path.join(output_dir, "conversion_summary.json"), 'w') as f:
             json.dump(summary, f, indent=2)
@@ -27,6 +27,9 @@ expression
     | ISERROR '(' expression ')'                                # IsErrorExpr
     | YEARFRAC '(' expression ',' expression ')'                # YearfracExpr
     | RIGHT '(' expression ',' expression ')'                   # RightExpr
+    | SUMIFS '(' range ',' range ',' expression (',' range ',' expression)* ')'  # SumIfsExpr
+    | AVERAGEIFS '(' range ',' range ',' expression (',' range ',' expression)* ')'  # AverageIfsExpr
+    | MAXIFS '(' range ',' range ',' expression (',' range ',' expression)* ')'  # MaxIfsExpr
     | cellReference                                             # CellExpr
     | namedRange                                                # NamedRangeExpr
     | NUMBER                                                    # NumberExpr
@@ -69,6 +72,9 @@ ROUND   : [Rr][Oo][Uu][Nn][Dd];
 ISERROR : [Ii][Ss][Ee][Rr][Rr][Oo][Rr];
 YEARFRAC : [Yy][Ee][Aa][Rr][Ff][Rr][Aa][Cc];
 RIGHT   : [Rr][Ii][Gg][Hh][Tt];
+SUMIFS  : [Ss][Uu][Mm][Ii][Ff][Ss];
+AVERAGEIFS : [Aa][Vv][Ee][Rr][Aa][Gg][Ee][Ii][Ff][Ss];
+MAXIFS  : [Mm][Aa][Xx][Ii][Ff][Ss];
 
 // Handle quoted sheet names with brackets and special characters
 SHEET_NAME: QUOTED_SHEET_NAME '!' | IDENTIFIER '!';
@@ -10,136 +10,146 @@ else:
 
 def serializedATN():
     return [
-        4,0,46,353,6,-1,2,0,7,0,2,1,7,1,2,2,7,2,2,3,7,3,2,4,7,4,2,5,7,5,
+        4,0,49,384,6,-1,2,0,7,0,2,1,7,1,2,2,7,2,2,3,7,3,2,4,7,4,2,5,7,5,
         2,6,7,6,2,7,7,7,2,8,7,8,2,9,7,9,2,10,7,10,2,11,7,11,2,12,7,12,2,
         13,7,13,2,14,7,14,2,15,7,15,2,16,7,16,2,17,7,17,2,18,7,18,2,19,7,
         19,2,20,7,20,2,21,7,21,2,22,7,22,2,23,7,23,2,24,7,24,2,25,7,25,2,
         26,7,26,2,27,7,27,2,28,7,28,2,29,7,29,2,30,7,30,2,31,7,31,2,32,7,
         32,2,33,7,33,2,34,7,34,2,35,7,35,2,36,7,36,2,37,7,37,2,38,7,38,2,
         39,7,39,2,40,7,40,2,41,7,41,2,42,7,42,2,43,7,43,2,44,7,44,2,45,7,
-        45,1,0,1,0,1,1,1,1,1,2,1,2,1,3,1,3,1,4,1,4,1,5,1,5,1,6,1,6,1,7,1,
-        7,1,8,1,8,1,9,1,9,1,9,1,10,1,10,1,10,1,11,1,11,1,12,1,12,1,13,1,
-        13,1,14,1,14,1,14,1,15,1,15,1,15,1,15,1,16,1,16,1,16,1,17,1,17,1,
-        17,1,17,1,18,1,18,1,18,1,18,1,18,1,18,1,18,1,18,1,19,1,19,1,19,1,
-        19,1,19,1,19,1,19,1,19,1,20,1,20,1,20,1,20,1,20,1,21,1,21,1,21,1,
-        21,1,21,1,22,1,22,1,22,1,22,1,22,1,22,1,23,1,23,1,23,1,23,1,23,1,
-        23,1,23,1,23,1,24,1,24,1,24,1,24,1,24,1,24,1,24,1,24,1,24,1,24,1,
-        25,1,25,1,25,1,25,1,25,1,25,1,26,1,26,1,26,1,26,1,26,1,26,1,26,1,
-        26,1,26,1,27,1,27,1,27,1,27,1,27,1,27,1,27,1,27,1,27,1,28,1,28,1,
-        28,1,28,1,28,1,28,1,28,1,28,1,29,1,29,1,29,1,29,1,30,1,30,1,30,1,
-        30,1,30,1,30,1,30,1,30,1,31,1,31,1,31,1,31,1,31,1,31,1,32,1,32,1,
-        32,1,32,1,32,1,32,1,32,1,33,1,33,1,33,1,33,1,34,1,34,1,34,1,34,1,
-        34,1,34,1,35,1,35,1,35,1,35,1,35,1,35,1,35,1,35,1,36,1,36,1,36,1,
-        36,1,36,1,36,1,36,1,36,1,36,1,37,1,37,1,37,1,37,1,37,1,37,1,38,1,
-        38,1,38,1,38,1,38,1,38,3,38,284,8,38,1,39,1,39,5,39,288,8,39,10,
-        39,12,39,291,9,39,1,39,1,39,1,40,3,40,296,8,40,1,40,4,40,299,8,40,
-        11,40,12,40,300,1,40,3,40,304,8,40,1,40,4,40,307,8,40,11,40,12,40,
-        308,1,41,1,41,5,41,313,8,41,10,41,12,41,316,9,41,1,42,4,42,319,8,
-        42,11,42,12,42,320,1,42,1,42,4,42,325,8,42,11,42,12,42,326,3,42,
-        329,8,42,1,43,1,43,5,43,333,8,43,10,43,12,43,336,9,43,1,43,1,43,
-        1,44,1,44,5,44,342,8,44,10,44,12,44,345,9,44,1,45,4,45,348,8,45,
-        11,45,12,45,349,1,45,1,45,0,0,46,1,1,3,2,5,3,7,4,9,5,11,6,13,7,15,
-        8,17,9,19,10,21,11,23,12,25,13,27,14,29,15,31,16,33,17,35,18,37,
-        19,39,20,41,21,43,22,45,23,47,24,49,25,51,26,53,27,55,28,57,29,59,
-        30,61,31,63,32,65,33,67,34,69,35,71,36,73,37,75,38,77,39,79,40,81,
-        41,83,42,85,43,87,44,89,45,91,46,1,0,30,2,0,73,73,105,105,2,0,70,
-        70,102,102,2,0,83,83,115,115,2,0,85,85,117,117,2,0,77,77,109,109,
-        2,0,79,79,111,111,2,0,82,82,114,114,2,0,65,65,97,97,2,0,78,78,110,
-        110,2,0,68,68,100,100,2,0,67,67,99,99,2,0,84,84,116,116,2,0,69,69,
-        101,101,2,0,87,87,119,119,2,0,86,86,118,118,2,0,76,76,108,108,2,
-        0,75,75,107,107,2,0,80,80,112,112,2,0,88,88,120,120,2,0,72,72,104,
-        104,2,0,71,71,103,103,2,0,89,89,121,121,3,0,10,10,13,13,39,39,1,
-        0,65,90,1,0,48,57,3,0,65,90,95,95,97,122,5,0,46,46,48,57,65,90,95,
-        95,97,122,1,0,34,34,4,0,48,57,65,90,95,95,97,122,3,0,9,10,13,13,
-        32,32,365,0,1,1,0,0,0,0,3,1,0,0,0,0,5,1,0,0,0,0,7,1,0,0,0,0,9,1,
-        0,0,0,0,11,1,0,0,0,0,13,1,0,0,0,0,15,1,0,0,0,0,17,1,0,0,0,0,19,1,
-        0,0,0,0,21,1,0,0,0,0,23,1,0,0,0,0,25,1,0,0,0,0,27,1,0,0,0,0,29,1,
-        0,0,0,0,31,1,0,0,0,0,33,1,0,0,0,0,35,1,0,0,0,0,37,1,0,0,0,0,39,1,
-        0,0,0,0,41,1,0,0,0,0,43,1,0,0,0,0,45,1,0,0,0,0,47,1,0,0,0,0,49,1,
-        0,0,0,0,51,1,0,0,0,0,53,1,0,0,0,0,55,1,0,0,0,0,57,1,0,0,0,0,59,1,
-        0,0,0,0,61,1,0,0,0,0,63,1,0,0,0,0,65,1,0,0,0,0,67,1,0,0,0,0,69,1,
-        0,0,0,0,71,1,0,0,0,0,73,1,0,0,0,0,75,1,0,0,0,0,77,1,0,0,0,0,79,1,
-        0,0,0,0,81,1,0,0,0,0,83,1,0,0,0,0,85,1,0,0,0,0,87,1,0,0,0,0,89,1,
-        0,0,0,0,91,1,0,0,0,1,93,1,0,0,0,3,95,1,0,0,0,5,97,1,0,0,0,7,99,1,
-        0,0,0,9,101,1,0,0,0,11,103,1,0,0,0,13,105,1,0,0,0,15,107,1,0,0,0,
-        17,109,1,0,0,0,19,111,1,0,0,0,21,114,1,0,0,0,23,117,1,0,0,0,25,119,
-        1,0,0,0,27,121,1,0,0,0,29,123,1,0,0,0,31,126,1,0,0,0,33,130,1,0,
-        0,0,35,133,1,0,0,0,37,137,1,0,0,0,39,145,1,0,0,0,41,153,1,0,0,0,
-        43,158,1,0,0,0,45,163,1,0,0,0,47,169,1,0,0,0,49,177,1,0,0,0,51,187,
-        1,0,0,0,53,193,1,0,0,0,55,202,1,0,0,0,57,211,1,0,0,0,59,219,1,0,
-        0,0,61,223,1,0,0,0,63,231,1,0,0,0,65,237,1,0,0,0,67,244,1,0,0,0,
-        69,248,1,0,0,0,71,254,1,0,0,0,73,262,1,0,0,0,75,271,1,0,0,0,77,283,
-        1,0,0,0,79,285,1,0,0,0,81,295,1,0,0,0,83,310,1,0,0,0,85,318,1,0,
-        0,0,87,330,1,0,0,0,89,339,1,0,0,0,91,347,1,0,0,0,93,94,5,40,0,0,
-        94,2,1,0,0,0,95,96,5,44,0,0,96,4,1,0,0,0,97,98,5,41,0,0,98,6,1,0,
-        0,0,99,100,5,42,0,0,100,8,1,0,0,0,101,102,5,47,0,0,102,10,1,0,0,
-        0,103,104,5,43,0,0,104,12,1,0,0,0,105,106,5,45,0,0,106,14,1,0,0,
-        0,107,108,5,62,0,0,108,16,1,0,0,0,109,110,5,60,0,0,110,18,1,0,0,
-        0,111,112,5,62,0,0,112,113,5,61,0,0,113,20,1,0,0,0,114,115,5,60,
-        0,0,115,116,5,61,0,0,116,22,1,0,0,0,117,118,5,61,0,0,118,24,1,0,
-        0,0,119,120,5,38,0,0,120,26,1,0,0,0,121,122,5,58,0,0,122,28,1,0,
-        0,0,123,124,7,0,0,0,124,125,7,1,0,0,125,30,1,0,0,0,126,127,7,2,0,
-        0,127,128,7,3,0,0,128,129,7,4,0,0,129,32,1,0,0,0,130,131,7,5,0,0,
-        131,132,7,6,0,0,132,34,1,0,0,0,133,134,7,7,0,0,134,135,7,8,0,0,135,
-        136,7,9,0,0,136,36,1,0,0,0,137,138,7,10,0,0,138,139,7,5,0,0,139,
-        140,7,3,0,0,140,141,7,8,0,0,141,142,7,11,0,0,142,143,7,0,0,0,143,
-        144,7,1,0,0,144,38,1,0,0,0,145,146,7,0,0,0,146,147,7,1,0,0,147,148,
-        7,12,0,0,148,149,7,6,0,0,149,150,7,6,0,0,150,151,7,5,0,0,151,152,
-        7,6,0,0,152,40,1,0,0,0,153,154,7,6,0,0,154,155,7,5,0,0,155,156,7,
-        13,0,0,156,157,7,2,0,0,157,42,1,0,0,0,158,159,7,1,0,0,159,160,7,
-        0,0,0,160,161,7,8,0,0,161,162,7,9,0,0,162,44,1,0,0,0,163,164,7,10,
-        0,0,164,165,7,5,0,0,165,166,7,3,0,0,166,167,7,8,0,0,167,168,7,11,
-        0,0,168,46,1,0,0,0,169,170,7,14,0,0,170,171,7,15,0,0,171,172,7,5,
-        0,0,172,173,7,5,0,0,173,174,7,16,0,0,174,175,7,3,0,0,175,176,7,17,
-        0,0,176,48,1,0,0,0,177,178,7,6,0,0,178,179,7,5,0,0,179,180,7,3,0,
-        0,180,181,7,8,0,0,181,182,7,9,0,0,182,183,7,9,0,0,183,184,7,5,0,
-        0,184,185,7,13,0,0,185,186,7,8,0,0,186,50,1,0,0,0,187,188,7,0,0,
-        0,188,189,7,8,0,0,189,190,7,9,0,0,190,191,7,12,0,0,191,192,7,18,
-        0,0,192,52,1,0,0,0,193,194,7,0,0,0,194,195,7,8,0,0,195,196,7,9,0,
-        0,196,197,7,0,0,0,197,198,7,6,0,0,198,199,7,12,0,0,199,200,7,10,
-        0,0,200,201,7,11,0,0,201,54,1,0,0,0,202,203,7,10,0,0,203,204,7,5,
-        0,0,204,205,7,3,0,0,205,206,7,8,0,0,206,207,7,11,0,0,207,208,7,0,
-        0,0,208,209,7,1,0,0,209,210,7,2,0,0,210,56,1,0,0,0,211,212,7,12,
-        0,0,212,213,7,5,0,0,213,214,7,4,0,0,214,215,7,5,0,0,215,216,7,8,
-        0,0,216,217,7,11,0,0,217,218,7,19,0,0,218,58,1,0,0,0,219,220,7,8,
-        0,0,220,221,7,5,0,0,221,222,7,11,0,0,222,60,1,0,0,0,223,224,7,7,
-        0,0,224,225,7,14,0,0,225,226,7,12,0,0,226,227,7,6,0,0,227,228,7,
-        7,0,0,228,229,7,20,0,0,229,230,7,12,0,0,230,62,1,0,0,0,231,232,7,
-        2,0,0,232,233,7,3,0,0,233,234,7,4,0,0,234,235,7,0,0,0,235,236,7,
-        1,0,0,236,64,1,0,0,0,237,238,7,10,0,0,238,239,7,5,0,0,239,240,7,
-        8,0,0,240,241,7,10,0,0,241,242,7,7,0,0,242,243,7,11,0,0,243,66,1,
-        0,0,0,244,245,7,15,0,0,245,246,7,12,0,0,246,247,7,8,0,0,247,68,1,
-        0,0,0,248,249,7,6,0,0,249,250,7,5,0,0,250,251,7,3,0,0,251,252,7,
-        8,0,0,252,253,7,9,0,0,253,70,1,0,0,0,254,255,7,0,0,0,255,256,7,2,
-        0,0,256,257,7,12,0,0,257,258,7,6,0,0,258,259,7,6,0,0,259,260,7,5,
-        0,0,260,261,7,6,0,0,261,72,1,0,0,0,262,263,7,21,0,0,263,264,7,12,
-        0,0,264,265,7,7,0,0,265,266,7,6,0,0,266,267,7,1,0,0,267,268,7,6,
-        0,0,268,269,7,7,0,0,269,270,7,10,0,0,270,74,1,0,0,0,271,272,7,6,
-        0,0,272,273,7,0,0,0,273,274,7,20,0,0,274,275,7,19,0,0,275,276,7,
-        11,0,0,276,76,1,0,0,0,277,278,3,79,39,0,278,279,5,33,0,0,279,284,
-        1,0,0,0,280,281,3,89,44,0,281,282,5,33,0,0,282,284,1,0,0,0,283,277,
-        1,0,0,0,283,280,1,0,0,0,284,78,1,0,0,0,285,289,5,39,0,0,286,288,
-        8,22,0,0,287,286,1,0,0,0,288,291,1,0,0,0,289,287,1,0,0,0,289,290,
-        1,0,0,0,290,292,1,0,0,0,291,289,1,0,0,0,292,293,5,39,0,0,293,80,
-        1,0,0,0,294,296,5,36,0,0,295,294,1,0,0,0,295,296,1,0,0,0,296,298,
-        1,0,0,0,297,299,7,23,0,0,298,297,1,0,0,0,299,300,1,0,0,0,300,298,
-        1,0,0,0,300,301,1,0,0,0,301,303,1,0,0,0,302,304,5,36,0,0,303,302,
-        1,0,0,0,303,304,1,0,0,0,304,306,1,0,0,0,305,307,7,24,0,0,306,305,
-        1,0,0,0,307,308,1,0,0,0,308,306,1,0,0,0,308,309,1,0,0,0,309,82,1,
-        0,0,0,310,314,7,25,0,0,311,313,7,26,0,0,312,311,1,0,0,0,313,316,
-        1,0,0,0,314,312,1,0,0,0,314,315,1,0,0,0,315,84,1,0,0,0,316,314,1,
-        0,0,0,317,319,7,24,0,0,318,317,1,0,0,0,319,320,1,0,0,0,320,318,1,
-        0,0,0,320,321,1,0,0,0,321,328,1,0,0,0,322,324,5,46,0,0,323,325,7,
-        24,0,0,324,323,1,0,0,0,325,326,1,0,0,0,326,324,1,0,0,0,326,327,1,
-        0,0,0,327,329,1,0,0,0,328,322,1,0,0,0,328,329,1,0,0,0,329,86,1,0,
-        0,0,330,334,5,34,0,0,331,333,8,27,0,0,332,331,1,0,0,0,333,336,1,
-        0,0,0,334,332,1,0,0,0,334,335,1,0,0,0,335,337,1,0,0,0,336,334,1,
-        0,0,0,337,338,5,34,0,0,338,88,1,0,0,0,339,343,7,25,0,0,340,342,7,
-        28,0,0,341,340,1,0,0,0,342,345,1,0,0,0,343,341,1,0,0,0,343,344,1,
-        0,0,0,344,90,1,0,0,0,345,343,1,0,0,0,346,348,7,29,0,0,347,346,1,
-        0,0,0,348,349,1,0,0,0,349,347,1,0,0,0,349,350,1,0,0,0,350,351,1,
-        0,0,0,351,352,6,45,0,0,352,92,1,0,0,0,14,0,283,289,295,300,303,308,
-        314,320,326,328,334,343,349,1,6,0,0
+        45,2,46,7,46,2,47,7,47,2,48,7,48,1,0,1,0,1,1,1,1,1,2,1,2,1,3,1,3,
+        1,4,1,4,1,5,1,5,1,6,1,6,1,7,1,7,1,8,1,8,1,9,1,9,1,9,1,10,1,10,1,
+        10,1,11,1,11,1,12,1,12,1,13,1,13,1,14,1,14,1,14,1,15,1,15,1,15,1,
+        15,1,16,1,16,1,16,1,17,1,17,1,17,1,17,1,18,1,18,1,18,1,18,1,18,1,
+        18,1,18,1,18,1,19,1,19,1,19,1,19,1,19,1,19,1,19,1,19,1,20,1,20,1,
+        20,1,20,1,20,1,21,1,21,1,21,1,21,1,21,1,22,1,22,1,22,1,22,1,22,1,
+        22,1,23,1,23,1,23,1,23,1,23,1,23,1,23,1,23,1,24,1,24,1,24,1,24,1,
+        24,1,24,1,24,1,24,1,24,1,24,1,25,1,25,1,25,1,25,1,25,1,25,1,26,1,
+        26,1,26,1,26,1,26,1,26,1,26,1,26,1,26,1,27,1,27,1,27,1,27,1,27,1,
+        27,1,27,1,27,1,27,1,28,1,28,1,28,1,28,1,28,1,28,1,28,1,28,1,29,1,
+        29,1,29,1,29,1,30,1,30,1,30,1,30,1,30,1,30,1,30,1,30,1,31,1,31,1,
+        31,1,31,1,31,1,31,1,32,1,32,1,32,1,32,1,32,1,32,1,32,1,33,1,33,1,
+        33,1,33,1,34,1,34,1,34,1,34,1,34,1,34,1,35,1,35,1,35,1,35,1,35,1,
+        35,1,35,1,35,1,36,1,36,1,36,1,36,1,36,1,36,1,36,1,36,1,36,1,37,1,
+        37,1,37,1,37,1,37,1,37,1,38,1,38,1,38,1,38,1,38,1,38,1,38,1,39,1,
+        39,1,39,1,39,1,39,1,39,1,39,1,39,1,39,1,39,1,39,1,40,1,40,1,40,1,
+        40,1,40,1,40,1,40,1,41,1,41,1,41,1,41,1,41,1,41,3,41,315,8,41,1,
+        42,1,42,5,42,319,8,42,10,42,12,42,322,9,42,1,42,1,42,1,43,3,43,327,
+        8,43,1,43,4,43,330,8,43,11,43,12,43,331,1,43,3,43,335,8,43,1,43,
+        4,43,338,8,43,11,43,12,43,339,1,44,1,44,5,44,344,8,44,10,44,12,44,
+        347,9,44,1,45,4,45,350,8,45,11,45,12,45,351,1,45,1,45,4,45,356,8,
+        45,11,45,12,45,357,3,45,360,8,45,1,46,1,46,5,46,364,8,46,10,46,12,
+        46,367,9,46,1,46,1,46,1,47,1,47,5,47,373,8,47,10,47,12,47,376,9,
+        47,1,48,4,48,379,8,48,11,48,12,48,380,1,48,1,48,0,0,49,1,1,3,2,5,
+        3,7,4,9,5,11,6,13,7,15,8,17,9,19,10,21,11,23,12,25,13,27,14,29,15,
+        31,16,33,17,35,18,37,19,39,20,41,21,43,22,45,23,47,24,49,25,51,26,
+        53,27,55,28,57,29,59,30,61,31,63,32,65,33,67,34,69,35,71,36,73,37,
+        75,38,77,39,79,40,81,41,83,42,85,43,87,44,89,45,91,46,93,47,95,48,
+        97,49,1,0,30,2,0,73,73,105,105,2,0,70,70,102,102,2,0,83,83,115,115,
+        2,0,85,85,117,117,2,0,77,77,109,109,2,0,79,79,111,111,2,0,82,82,
+        114,114,2,0,65,65,97,97,2,0,78,78,110,110,2,0,68,68,100,100,2,0,
+        67,67,99,99,2,0,84,84,116,116,2,0,69,69,101,101,2,0,87,87,119,119,
+        2,0,86,86,118,118,2,0,76,76,108,108,2,0,75,75,107,107,2,0,80,80,
+        112,112,2,0,88,88,120,120,2,0,72,72,104,104,2,0,71,71,103,103,2,
+        0,89,89,121,121,3,0,10,10,13,13,39,39,1,0,65,90,1,0,48,57,3,0,65,
+        90,95,95,97,122,5,0,46,46,48,57,65,90,95,95,97,122,1,0,34,34,4,0,
+        48,57,65,90,95,95,97,122,3,0,9,10,13,13,32,32,396,0,1,1,0,0,0,0,
+        3,1,0,0,0,0,5,1,0,0,0,0,7,1,0,0,0,0,9,1,0,0,0,0,11,1,0,0,0,0,13,
+        1,0,0,0,0,15,1,0,0,0,0,17,1,0,0,0,0,19,1,0,0,0,0,21,1,0,0,0,0,23,
+        1,0,0,0,0,25,1,0,0,0,0,27,1,0,0,0,0,29,1,0,0,0,0,31,1,0,0,0,0,33,
+        1,0,0,0,0,35,1,0,0,0,0,37,1,0,0,0,0,39,1,0,0,0,0,41,1,0,0,0,0,43,
+        1,0,0,0,0,45,1,0,0,0,0,47,1,0,0,0,0,49,1,0,0,0,0,51,1,0,0,0,0,53,
+        1,0,0,0,0,55,1,0,0,0,0,57,1,0,0,0,0,59,1,0,0,0,0,61,1,0,0,0,0,63,
+        1,0,0,0,0,65,1,0,0,0,0,67,1,0,0,0,0,69,1,0,0,0,0,71,1,0,0,0,0,73,
+        1,0,0,0,0,75,1,0,0,0,0,77,1,0,0,0,0,79,1,0,0,0,0,81,1,0,0,0,0,83,
+        1,0,0,0,0,85,1,0,0,0,0,87,1,0,0,0,0,89,1,0,0,0,0,91,1,0,0,0,0,93,
+        1,0,0,0,0,95,1,0,0,0,0,97,1,0,0,0,1,99,1,0,0,0,3,101,1,0,0,0,5,103,
+        1,0,0,0,7,105,1,0,0,0,9,107,1,0,0,0,11,109,1,0,0,0,13,111,1,0,0,
+        0,15,113,1,0,0,0,17,115,1,0,0,0,19,117,1,0,0,0,21,120,1,0,0,0,23,
+        123,1,0,0,0,25,125,1,0,0,0,27,127,1,0,0,0,29,129,1,0,0,0,31,132,
+        1,0,0,0,33,136,1,0,0,0,35,139,1,0,0,0,37,143,1,0,0,0,39,151,1,0,
+        0,0,41,159,1,0,0,0,43,164,1,0,0,0,45,169,1,0,0,0,47,175,1,0,0,0,
+        49,183,1,0,0,0,51,193,1,0,0,0,53,199,1,0,0,0,55,208,1,0,0,0,57,217,
+        1,0,0,0,59,225,1,0,0,0,61,229,1,0,0,0,63,237,1,0,0,0,65,243,1,0,
+        0,0,67,250,1,0,0,0,69,254,1,0,0,0,71,260,1,0,0,0,73,268,1,0,0,0,
+        75,277,1,0,0,0,77,283,1,0,0,0,79,290,1,0,0,0,81,301,1,0,0,0,83,314,
+        1,0,0,0,85,316,1,0,0,0,87,326,1,0,0,0,89,341,1,0,0,0,91,349,1,0,
+        0,0,93,361,1,0,0,0,95,370,1,0,0,0,97,378,1,0,0,0,99,100,5,40,0,0,
+        100,2,1,0,0,0,101,102,5,44,0,0,102,4,1,0,0,0,103,104,5,41,0,0,104,
+        6,1,0,0,0,105,106,5,42,0,0,106,8,1,0,0,0,107,108,5,47,0,0,108,10,
+        1,0,0,0,109,110,5,43,0,0,110,12,1,0,0,0,111,112,5,45,0,0,112,14,
+        1,0,0,0,113,114,5,62,0,0,114,16,1,0,0,0,115,116,5,60,0,0,116,18,
+        1,0,0,0,117,118,5,62,0,0,118,119,5,61,0,0,119,20,1,0,0,0,120,121,
+        5,60,0,0,121,122,5,61,0,0,122,22,1,0,0,0,123,124,5,61,0,0,124,24,
+        1,0,0,0,125,126,5,38,0,0,126,26,1,0,0,0,127,128,5,58,0,0,128,28,
+        1,0,0,0,129,130,7,0,0,0,130,131,7,1,0,0,131,30,1,0,0,0,132,133,7,
+        2,0,0,133,134,7,3,0,0,134,135,7,4,0,0,135,32,1,0,0,0,136,137,7,5,
+        0,0,137,138,7,6,0,0,138,34,1,0,0,0,139,140,7,7,0,0,140,141,7,8,0,
+        0,141,142,7,9,0,0,142,36,1,0,0,0,143,144,7,10,0,0,144,145,7,5,0,
+        0,145,146,7,3,0,0,146,147,7,8,0,0,147,148,7,11,0,0,148,149,7,0,0,
+        0,149,150,7,1,0,0,150,38,1,0,0,0,151,152,7,0,0,0,152,153,7,1,0,0,
+        153,154,7,12,0,0,154,155,7,6,0,0,155,156,7,6,0,0,156,157,7,5,0,0,
+        157,158,7,6,0,0,158,40,1,0,0,0,159,160,7,6,0,0,160,161,7,5,0,0,161,
+        162,7,13,0,0,162,163,7,2,0,0,163,42,1,0,0,0,164,165,7,1,0,0,165,
+        166,7,0,0,0,166,167,7,8,0,0,167,168,7,9,0,0,168,44,1,0,0,0,169,170,
+        7,10,0,0,170,171,7,5,0,0,171,172,7,3,0,0,172,173,7,8,0,0,173,174,
+        7,11,0,0,174,46,1,0,0,0,175,176,7,14,0,0,176,177,7,15,0,0,177,178,
+        7,5,0,0,178,179,7,5,0,0,179,180,7,16,0,0,180,181,7,3,0,0,181,182,
+        7,17,0,0,182,48,1,0,0,0,183,184,7,6,0,0,184,185,7,5,0,0,185,186,
+        7,3,0,0,186,187,7,8,0,0,187,188,7,9,0,0,188,189,7,9,0,0,189,190,
+        7,5,0,0,190,191,7,13,0,0,191,192,7,8,0,0,192,50,1,0,0,0,193,194,
+        7,0,0,0,194,195,7,8,0,0,195,196,7,9,0,0,196,197,7,12,0,0,197,198,
+        7,18,0,0,198,52,1,0,0,0,199,200,7,0,0,0,200,201,7,8,0,0,201,202,
+        7,9,0,0,202,203,7,0,0,0,203,204,7,6,0,0,204,205,7,12,0,0,205,206,
+        7,10,0,0,206,207,7,11,0,0,207,54,1,0,0,0,208,209,7,10,0,0,209,210,
+        7,5,0,0,210,211,7,3,0,0,211,212,7,8,0,0,212,213,7,11,0,0,213,214,
+        7,0,0,0,214,215,7,1,0,0,215,216,7,2,0,0,216,56,1,0,0,0,217,218,7,
+        12,0,0,218,219,7,5,0,0,219,220,7,4,0,0,220,221,7,5,0,0,221,222,7,
+        8,0,0,222,223,7,11,0,0,223,224,7,19,0,0,224,58,1,0,0,0,225,226,7,
+        8,0,0,226,227,7,5,0,0,227,228,7,11,0,0,228,60,1,0,0,0,229,230,7,
+        7,0,0,230,231,7,14,0,0,231,232,7,12,0,0,232,233,7,6,0,0,233,234,
+        7,7,0,0,234,235,7,20,0,0,235,236,7,12,0,0,236,62,1,0,0,0,237,238,
+        7,2,0,0,238,239,7,3,0,0,239,240,7,4,0,0,240,241,7,0,0,0,241,242,
+        7,1,0,0,242,64,1,0,0,0,243,244,7,10,0,0,244,245,7,5,0,0,245,246,
+        7,8,0,0,246,247,7,10,0,0,247,248,7,7,0,0,248,249,7,11,0,0,249,66,
+        1,0,0,0,250,251,7,15,0,0,251,252,7,12,0,0,252,253,7,8,0,0,253,68,
+        1,0,0,0,254,255,7,6,0,0,255,256,7,5,0,0,256,257,7,3,0,0,257,258,
+        7,8,0,0,258,259,7,9,0,0,259,70,1,0,0,0,260,261,7,0,0,0,261,262,7,
+        2,0,0,262,263,7,12,0,0,263,264,7,6,0,0,264,265,7,6,0,0,265,266,7,
+        5,0,0,266,267,7,6,0,0,267,72,1,0,0,0,268,269,7,21,0,0,269,270,7,
+        12,0,0,270,271,7,7,0,0,271,272,7,6,0,0,272,273,7,1,0,0,273,274,7,
+        6,0,0,274,275,7,7,0,0,275,276,7,10,0,0,276,74,1,0,0,0,277,278,7,
+        6,0,0,278,279,7,0,0,0,279,280,7,20,0,0,280,281,7,19,0,0,281,282,
+        7,11,0,0,282,76,1,0,0,0,283,284,7,2,0,0,284,285,7,3,0,0,285,286,
+        7,4,0,0,286,287,7,0,0,0,287,288,7,1,0,0,288,289,7,2,0,0,289,78,1,
+        0,0,0,290,291,7,7,0,0,291,292,7,14,0,0,292,293,7,12,0,0,293,294,
+        7,6,0,0,294,295,7,7,0,0,295,296,7,20,0,0,296,297,7,12,0,0,297,298,
+        7,0,0,0,298,299,7,1,0,0,299,300,7,2,0,0,300,80,1,0,0,0,301,302,7,
+        4,0,0,302,303,7,7,0,0,303,304,7,18,0,0,304,305,7,0,0,0,305,306,7,
+        1,0,0,306,307,7,2,0,0,307,82,1,0,0,0,308,309,3,85,42,0,309,310,5,
+        33,0,0,310,315,1,0,0,0,311,312,3,95,47,0,312,313,5,33,0,0,313,315,
+        1,0,0,0,314,308,1,0,0,0,314,311,1,0,0,0,315,84,1,0,0,0,316,320,5,
+        39,0,0,317,319,8,22,0,0,318,317,1,0,0,0,319,322,1,0,0,0,320,318,
+        1,0,0,0,320,321,1,0,0,0,321,323,1,0,0,0,322,320,1,0,0,0,323,324,
+        5,39,0,0,324,86,1,0,0,0,325,327,5,36,0,0,326,325,1,0,0,0,326,327,
+        1,0,0,0,327,329,1,0,0,0,328,330,7,23,0,0,329,328,1,0,0,0,330,331,
+        1,0,0,0,331,329,1,0,0,0,331,332,1,0,0,0,332,334,1,0,0,0,333,335,
+        5,36,0,0,334,333,1,0,0,0,334,335,1,0,0,0,335,337,1,0,0,0,336,338,
+        7,24,0,0,337,336,1,0,0,0,338,339,1,0,0,0,339,337,1,0,0,0,339,340,
+        1,0,0,0,340,88,1,0,0,0,341,345,7,25,0,0,342,344,7,26,0,0,343,342,
+        1,0,0,0,344,347,1,0,0,0,345,343,1,0,0,0,345,346,1,0,0,0,346,90,1,
+        0,0,0,347,345,1,0,0,0,348,350,7,24,0,0,349,348,1,0,0,0,350,351,1,
+        0,0,0,351,349,1,0,0,0,351,352,1,0,0,0,352,359,1,0,0,0,353,355,5,
+        46,0,0,354,356,7,24,0,0,355,354,1,0,0,0,356,357,1,0,0,0,357,355,
+        1,0,0,0,357,358,1,0,0,0,358,360,1,0,0,0,359,353,1,0,0,0,359,360,
+        1,0,0,0,360,92,1,0,0,0,361,365,5,34,0,0,362,364,8,27,0,0,363,362,
+        1,0,0,0,364,367,1,0,0,0,365,363,1,0,0,0,365,366,1,0,0,0,366,368,
+        1,0,0,0,367,365,1,0,0,0,368,369,5,34,0,0,369,94,1,0,0,0,370,374,
+        7,25,0,0,371,373,7,28,0,0,372,371,1,0,0,0,373,376,1,0,0,0,374,372,
+        1,0,0,0,374,375,1,0,0,0,375,96,1,0,0,0,376,374,1,0,0,0,377,379,7,
+        29,0,0,378,377,1,0,0,0,379,380,1,0,0,0,380,378,1,0,0,0,380,381,1,
+        0,0,0,381,382,1,0,0,0,382,383,6,48,0,0,383,98,1,0,0,0,14,0,314,320,
+        326,331,334,339,345,351,357,359,365,374,380,1,6,0,0
     ]
 
 class ExcelFormulaLexer(Lexer):
@@ -186,14 +196,17 @@ class ExcelFormulaLexer(Lexer):
     ISERROR = 36
     YEARFRAC = 37
     RIGHT = 38
-    SHEET_NAME = 39
-    QUOTED_SHEET_NAME = 40
-    CELL = 41
-    NAMED_RANGE_IDENTIFIER = 42
-    NUMBER = 43
-    STRING = 44
-    IDENTIFIER = 45
-    WS = 46
+    SUMIFS = 39
+    AVERAGEIFS = 40
+    MAXIFS = 41
+    SHEET_NAME = 42
+    QUOTED_SHEET_NAME = 43
+    CELL = 44
+    NAMED_RANGE_IDENTIFIER = 45
+    NUMBER = 46
+    STRING = 47
+    IDENTIFIER = 48
+    WS = 49
 
     channelNames = [ u"DEFAULT_TOKEN_CHANNEL", u"HIDDEN" ]
 
@@ -207,18 +220,19 @@ class ExcelFormulaLexer(Lexer):
             "IF", "SUM", "OR", "AND", "COUNTIF", "IFERROR", "ROWS", "FIND", 
             "COUNT", "VLOOKUP", "ROUNDDOWN", "INDEX", "INDIRECT", "COUNTIFS", 
             "EOMONTH", "NOT", "AVERAGE", "SUMIF", "CONCAT", "LEN", "ROUND", 
-            "ISERROR", "YEARFRAC", "RIGHT", "SHEET_NAME", "QUOTED_SHEET_NAME", 
-            "CELL", "NAMED_RANGE_IDENTIFIER", "NUMBER", "STRING", "IDENTIFIER", 
-            "WS" ]
+            "ISERROR", "YEARFRAC", "RIGHT", "SUMIFS", "AVERAGEIFS", "MAXIFS", 
+            "SHEET_NAME", "QUOTED_SHEET_NAME", "CELL", "NAMED_RANGE_IDENTIFIER", 
+            "NUMBER", "STRING", "IDENTIFIER", "WS" ]
 
     ruleNames = [ "T__0", "T__1", "T__2", "T__3", "T__4", "T__5", "T__6", 
                   "T__7", "T__8", "T__9", "T__10", "T__11", "T__12", "T__13", 
                   "IF", "SUM", "OR", "AND", "COUNTIF", "IFERROR", "ROWS", 
                   "FIND", "COUNT", "VLOOKUP", "ROUNDDOWN", "INDEX", "INDIRECT", 
                   "COUNTIFS", "EOMONTH", "NOT", "AVERAGE", "SUMIF", "CONCAT", 
-                  "LEN", "ROUND", "ISERROR", "YEARFRAC", "RIGHT", "SHEET_NAME", 
-                  "QUOTED_SHEET_NAME", "CELL", "NAMED_RANGE_IDENTIFIER", 
-                  "NUMBER", "STRING", "IDENTIFIER", "WS" ]
+                  "LEN", "ROUND", "ISERROR", "YEARFRAC", "RIGHT", "SUMIFS", 
+                  "AVERAGEIFS", "MAXIFS", "SHEET_NAME", "QUOTED_SHEET_NAME", 
+                  "CELL", "NAMED_RANGE_IDENTIFIER", "NUMBER", "STRING", 
+                  "IDENTIFIER", "WS" ]
 
     grammarFileName = "ExcelFormula.g4"
 
@@ -26,6 +26,15 @@ class ExcelFormulaListener(ParseTreeListener):
         pass
 
 
+    # Enter a parse tree produced by ExcelFormulaParser#SumIfsExpr.
+    def enterSumIfsExpr(self, ctx:ExcelFormulaParser.SumIfsExprContext):
+        pass
+
+    # Exit a parse tree produced by ExcelFormulaParser#SumIfsExpr.
+    def exitSumIfsExpr(self, ctx:ExcelFormulaParser.SumIfsExprContext):
+        pass
+
+
     # Enter a parse tree produced by ExcelFormulaParser#StringExpr.
     def enterStringExpr(self, ctx:ExcelFormulaParser.StringExprContext):
         pass
@@ -89,6 +98,15 @@ class ExcelFormulaListener(ParseTreeListener):
         pass
 
 
+    # Enter a parse tree produced by ExcelFormulaParser#AverageIfsExpr.
+    def enterAverageIfsExpr(self, ctx:ExcelFormulaParser.AverageIfsExprContext):
+        pass
+
+    # Exit a parse tree produced by ExcelFormulaParser#AverageIfsExpr.
+    def exitAverageIfsExpr(self, ctx:ExcelFormulaParser.AverageIfsExprContext):
+        pass
+
+
     # Enter a parse tree produced by ExcelFormulaParser#NumberExpr.
     def enterNumberExpr(self, ctx:ExcelFormulaParser.NumberExprContext):
         pass
@@ -107,6 +125,15 @@ class ExcelFormulaListener(ParseTreeListener):
         pass
 
 
+    # Enter a parse tree produced by ExcelFormulaParser#MaxIfsExpr.
+    def enterMaxIfsExpr(self, ctx:ExcelFormulaParser.MaxIfsExprContext):
+        pass
+
+    # Exit a parse tree produced by ExcelFormulaParser#MaxIfsExpr.
+    def exitMaxIfsExpr(self, ctx:ExcelFormulaParser.MaxIfsExprContext):
+        pass
+
+
     # Enter a parse tree produced by ExcelFormulaParser#NotExpr.
     def enterNotExpr(self, ctx:ExcelFormulaParser.NotExprContext):
         pass
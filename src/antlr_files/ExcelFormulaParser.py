@@ -10,7 +10,7 @@ else:
 
 def serializedATN():
     return [
-        4,1,46,222,2,0,7,0,2,1,7,1,2,2,7,2,2,3,7,3,2,4,7,4,2,5,7,5,1,0,1,
+        4,1,49,279,2,0,7,0,2,1,7,1,2,2,7,2,2,3,7,3,2,4,7,4,2,5,7,5,1,0,1,
         0,1,0,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,
         1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,
         1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,
@@ -22,69 +22,89 @@ def serializedATN():
         1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,
         1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,
         1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,
-        1,1,1,1,1,1,1,1,1,1,1,1,3,1,193,8,1,1,1,1,1,1,1,5,1,198,8,1,10,1,
-        12,1,201,9,1,1,2,1,2,1,2,5,2,206,8,2,10,2,12,2,209,9,2,1,3,1,3,1,
-        3,1,3,1,4,3,4,216,8,4,1,4,1,4,1,5,1,5,1,5,0,1,2,6,0,2,4,6,8,10,0,
-        1,1,0,4,13,249,0,12,1,0,0,0,2,192,1,0,0,0,4,202,1,0,0,0,6,210,1,
-        0,0,0,8,215,1,0,0,0,10,219,1,0,0,0,12,13,3,2,1,0,13,14,5,0,0,1,14,
+        1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,5,1,197,8,1,10,1,12,1,200,
+        9,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,5,1,
+        216,8,1,10,1,12,1,219,9,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,1,
+        1,1,1,1,1,1,1,1,1,5,1,235,8,1,10,1,12,1,238,9,1,1,1,1,1,1,1,1,1,
+        1,1,1,1,1,1,1,1,1,1,1,1,3,1,250,8,1,1,1,1,1,1,1,5,1,255,8,1,10,1,
+        12,1,258,9,1,1,2,1,2,1,2,5,2,263,8,2,10,2,12,2,266,9,2,1,3,1,3,1,
+        3,1,3,1,4,3,4,273,8,4,1,4,1,4,1,5,1,5,1,5,0,1,2,6,0,2,4,6,8,10,0,
+        1,1,0,4,13,312,0,12,1,0,0,0,2,249,1,0,0,0,4,259,1,0,0,0,6,267,1,
+        0,0,0,8,272,1,0,0,0,10,276,1,0,0,0,12,13,3,2,1,0,13,14,5,0,0,1,14,
         1,1,0,0,0,15,16,6,1,-1,0,16,17,5,15,0,0,17,18,5,1,0,0,18,19,3,2,
         1,0,19,20,5,2,0,0,20,21,3,2,1,0,21,22,5,2,0,0,22,23,3,2,1,0,23,24,
-        5,3,0,0,24,193,1,0,0,0,25,26,5,16,0,0,26,27,5,1,0,0,27,28,3,6,3,
-        0,28,29,5,3,0,0,29,193,1,0,0,0,30,31,5,17,0,0,31,32,5,1,0,0,32,33,
-        3,4,2,0,33,34,5,3,0,0,34,193,1,0,0,0,35,36,5,18,0,0,36,37,5,1,0,
-        0,37,38,3,4,2,0,38,39,5,3,0,0,39,193,1,0,0,0,40,41,5,19,0,0,41,42,
+        5,3,0,0,24,250,1,0,0,0,25,26,5,16,0,0,26,27,5,1,0,0,27,28,3,6,3,
+        0,28,29,5,3,0,0,29,250,1,0,0,0,30,31,5,17,0,0,31,32,5,1,0,0,32,33,
+        3,4,2,0,33,34,5,3,0,0,34,250,1,0,0,0,35,36,5,18,0,0,36,37,5,1,0,
+        0,37,38,3,4,2,0,38,39,5,3,0,0,39,250,1,0,0,0,40,41,5,19,0,0,41,42,
         5,1,0,0,42,43,3,6,3,0,43,44,5,2,0,0,44,45,3,2,1,0,45,46,5,3,0,0,
-        46,193,1,0,0,0,47,48,5,20,0,0,48,49,5,1,0,0,49,50,3,2,1,0,50,51,
-        5,2,0,0,51,52,3,2,1,0,52,53,5,3,0,0,53,193,1,0,0,0,54,55,5,21,0,
-        0,55,56,5,1,0,0,56,57,3,6,3,0,57,58,5,3,0,0,58,193,1,0,0,0,59,60,
+        46,250,1,0,0,0,47,48,5,20,0,0,48,49,5,1,0,0,49,50,3,2,1,0,50,51,
+        5,2,0,0,51,52,3,2,1,0,52,53,5,3,0,0,53,250,1,0,0,0,54,55,5,21,0,
+        0,55,56,5,1,0,0,56,57,3,6,3,0,57,58,5,3,0,0,58,250,1,0,0,0,59,60,
         5,22,0,0,60,61,5,1,0,0,61,62,3,2,1,0,62,63,5,2,0,0,63,64,3,2,1,0,
-        64,65,5,3,0,0,65,193,1,0,0,0,66,67,5,23,0,0,67,68,5,1,0,0,68,69,
-        3,6,3,0,69,70,5,3,0,0,70,193,1,0,0,0,71,72,5,24,0,0,72,73,5,1,0,
+        64,65,5,3,0,0,65,250,1,0,0,0,66,67,5,23,0,0,67,68,5,1,0,0,68,69,
+        3,6,3,0,69,70,5,3,0,0,70,250,1,0,0,0,71,72,5,24,0,0,72,73,5,1,0,
         0,73,74,3,2,1,0,74,75,5,2,0,0,75,76,3,6,3,0,76,77,5,2,0,0,77,78,
         3,2,1,0,78,80,5,2,0,0,79,81,3,2,1,0,80,79,1,0,0,0,80,81,1,0,0,0,
-        81,82,1,0,0,0,82,83,5,3,0,0,83,193,1,0,0,0,84,85,5,25,0,0,85,86,
+        81,82,1,0,0,0,82,83,5,3,0,0,83,250,1,0,0,0,84,85,5,25,0,0,85,86,
         5,1,0,0,86,87,3,2,1,0,87,88,5,2,0,0,88,89,3,2,1,0,89,90,5,3,0,0,
-        90,193,1,0,0,0,91,92,5,26,0,0,92,93,5,1,0,0,93,94,3,6,3,0,94,95,
+        90,250,1,0,0,0,91,92,5,26,0,0,92,93,5,1,0,0,93,94,3,6,3,0,94,95,
         5,2,0,0,95,96,3,2,1,0,96,98,5,2,0,0,97,99,3,2,1,0,98,97,1,0,0,0,
-        98,99,1,0,0,0,99,100,1,0,0,0,100,101,5,3,0,0,101,193,1,0,0,0,102,
+        98,99,1,0,0,0,99,100,1,0,0,0,100,101,5,3,0,0,101,250,1,0,0,0,102,
         103,5,27,0,0,103,104,5,1,0,0,104,105,3,2,1,0,105,106,5,3,0,0,106,
-        193,1,0,0,0,107,108,5,28,0,0,108,109,5,1,0,0,109,110,3,6,3,0,110,
+        250,1,0,0,0,107,108,5,28,0,0,108,109,5,1,0,0,109,110,3,6,3,0,110,
         111,5,2,0,0,111,119,3,2,1,0,112,113,5,2,0,0,113,114,3,6,3,0,114,
         115,5,2,0,0,115,116,3,2,1,0,116,118,1,0,0,0,117,112,1,0,0,0,118,
         121,1,0,0,0,119,117,1,0,0,0,119,120,1,0,0,0,120,122,1,0,0,0,121,
-        119,1,0,0,0,122,123,5,3,0,0,123,193,1,0,0,0,124,125,5,29,0,0,125,
+        119,1,0,0,0,122,123,5,3,0,0,123,250,1,0,0,0,124,125,5,29,0,0,125,
         126,5,1,0,0,126,127,3,2,1,0,127,128,5,2,0,0,128,129,3,2,1,0,129,
-        130,5,3,0,0,130,193,1,0,0,0,131,132,5,30,0,0,132,133,5,1,0,0,133,
-        134,3,2,1,0,134,135,5,3,0,0,135,193,1,0,0,0,136,137,5,31,0,0,137,
-        138,5,1,0,0,138,139,3,6,3,0,139,140,5,3,0,0,140,193,1,0,0,0,141,
+        130,5,3,0,0,130,250,1,0,0,0,131,132,5,30,0,0,132,133,5,1,0,0,133,
+        134,3,2,1,0,134,135,5,3,0,0,135,250,1,0,0,0,136,137,5,31,0,0,137,
+        138,5,1,0,0,138,139,3,6,3,0,139,140,5,3,0,0,140,250,1,0,0,0,141,
         142,5,32,0,0,142,143,5,1,0,0,143,144,3,6,3,0,144,145,5,2,0,0,145,
-        146,3,2,1,0,146,147,5,3,0,0,147,193,1,0,0,0,148,149,5,33,0,0,149,
-        150,5,1,0,0,150,151,3,4,2,0,151,152,5,3,0,0,152,193,1,0,0,0,153,
+        146,3,2,1,0,146,147,5,3,0,0,147,250,1,0,0,0,148,149,5,33,0,0,149,
+        150,5,1,0,0,150,151,3,4,2,0,151,152,5,3,0,0,152,250,1,0,0,0,153,
         154,5,34,0,0,154,155,5,1,0,0,155,156,3,2,1,0,156,157,5,3,0,0,157,
-        193,1,0,0,0,158,159,5,35,0,0,159,160,5,1,0,0,160,161,3,2,1,0,161,
-        162,5,2,0,0,162,163,3,2,1,0,163,164,5,3,0,0,164,193,1,0,0,0,165,
+        250,1,0,0,0,158,159,5,35,0,0,159,160,5,1,0,0,160,161,3,2,1,0,161,
+        162,5,2,0,0,162,163,3,2,1,0,163,164,5,3,0,0,164,250,1,0,0,0,165,
         166,5,36,0,0,166,167,5,1,0,0,167,168,3,2,1,0,168,169,5,3,0,0,169,
-        193,1,0,0,0,170,171,5,37,0,0,171,172,5,1,0,0,172,173,3,2,1,0,173,
-        174,5,2,0,0,174,175,3,2,1,0,175,176,5,3,0,0,176,193,1,0,0,0,177,
+        250,1,0,0,0,170,171,5,37,0,0,171,172,5,1,0,0,172,173,3,2,1,0,173,
+        174,5,2,0,0,174,175,3,2,1,0,175,176,5,3,0,0,176,250,1,0,0,0,177,
         178,5,38,0,0,178,179,5,1,0,0,179,180,3,2,1,0,180,181,5,2,0,0,181,
-        182,3,2,1,0,182,183,5,3,0,0,183,193,1,0,0,0,184,193,3,8,4,0,185,
-        193,3,10,5,0,186,193,5,43,0,0,187,193,5,44,0,0,188,189,5,1,0,0,189,
-        190,3,2,1,0,190,191,5,3,0,0,191,193,1,0,0,0,192,15,1,0,0,0,192,25,
-        1,0,0,0,192,30,1,0,0,0,192,35,1,0,0,0,192,40,1,0,0,0,192,47,1,0,
-        0,0,192,54,1,0,0,0,192,59,1,0,0,0,192,66,1,0,0,0,192,71,1,0,0,0,
-        192,84,1,0,0,0,192,91,1,0,0,0,192,102,1,0,0,0,192,107,1,0,0,0,192,
-        124,1,0,0,0,192,131,1,0,0,0,192,136,1,0,0,0,192,141,1,0,0,0,192,
-        148,1,0,0,0,192,153,1,0,0,0,192,158,1,0,0,0,192,165,1,0,0,0,192,
-        170,1,0,0,0,192,177,1,0,0,0,192,184,1,0,0,0,192,185,1,0,0,0,192,
-        186,1,0,0,0,192,187,1,0,0,0,192,188,1,0,0,0,193,199,1,0,0,0,194,
-        195,10,2,0,0,195,196,7,0,0,0,196,198,3,2,1,3,197,194,1,0,0,0,198,
-        201,1,0,0,0,199,197,1,0,0,0,199,200,1,0,0,0,200,3,1,0,0,0,201,199,
-        1,0,0,0,202,207,3,2,1,0,203,204,5,2,0,0,204,206,3,2,1,0,205,203,
-        1,0,0,0,206,209,1,0,0,0,207,205,1,0,0,0,207,208,1,0,0,0,208,5,1,
-        0,0,0,209,207,1,0,0,0,210,211,3,8,4,0,211,212,5,14,0,0,212,213,3,
-        8,4,0,213,7,1,0,0,0,214,216,5,39,0,0,215,214,1,0,0,0,215,216,1,0,
-        0,0,216,217,1,0,0,0,217,218,5,41,0,0,218,9,1,0,0,0,219,220,5,42,
-        0,0,220,11,1,0,0,0,7,80,98,119,192,199,207,215
+        182,3,2,1,0,182,183,5,3,0,0,183,250,1,0,0,0,184,185,5,39,0,0,185,
+        186,5,1,0,0,186,187,3,6,3,0,187,188,5,2,0,0,188,189,3,6,3,0,189,
+        190,5,2,0,0,190,198,3,2,1,0,191,192,5,2,0,0,192,193,3,6,3,0,193,
+        194,5,2,0,0,194,195,3,2,1,0,195,197,1,0,0,0,196,191,1,0,0,0,197,
+        200,1,0,0,0,198,196,1,0,0,0,198,199,1,0,0,0,199,201,1,0,0,0,200,
+        198,1,0,0,0,201,202,5,3,0,0,202,250,1,0,0,0,203,204,5,40,0,0,204,
+        205,5,1,0,0,205,206,3,6,3,0,206,207,5,2,0,0,207,208,3,6,3,0,208,
+        209,5,2,0,0,209,217,3,2,1,0,210,211,5,2,0,0,211,212,3,6,3,0,212,
+        213,5,2,0,0,213,214,3,2,1,0,214,216,1,0,0,0,215,210,1,0,0,0,216,
+        219,1,0,0,0,217,215,1,0,0,0,217,218,1,0,0,0,218,220,1,0,0,0,219,
+        217,1,0,0,0,220,221,5,3,0,0,221,250,1,0,0,0,222,223,5,41,0,0,223,
+        224,5,1,0,0,224,225,3,6,3,0,225,226,5,2,0,0,226,227,3,6,3,0,227,
+        228,5,2,0,0,228,236,3,2,1,0,229,230,5,2,0,0,230,231,3,6,3,0,231,
+        232,5,2,0,0,232,233,3,2,1,0,233,235,1,0,0,0,234,229,1,0,0,0,235,
+        238,1,0,0,0,236,234,1,0,0,0,236,237,1,0,0,0,237,239,1,0,0,0,238,
+        236,1,0,0,0,239,240,5,3,0,0,240,250,1,0,0,0,241,250,3,8,4,0,242,
+        250,3,10,5,0,243,250,5,46,0,0,244,250,5,47,0,0,245,246,5,1,0,0,246,
+        247,3,2,1,0,247,248,5,3,0,0,248,250,1,0,0,0,249,15,1,0,0,0,249,25,
+        1,0,0,0,249,30,1,0,0,0,249,35,1,0,0,0,249,40,1,0,0,0,249,47,1,0,
+        0,0,249,54,1,0,0,0,249,59,1,0,0,0,249,66,1,0,0,0,249,71,1,0,0,0,
+        249,84,1,0,0,0,249,91,1,0,0,0,249,102,1,0,0,0,249,107,1,0,0,0,249,
+        124,1,0,0,0,249,131,1,0,0,0,249,136,1,0,0,0,249,141,1,0,0,0,249,
+        148,1,0,0,0,249,153,1,0,0,0,249,158,1,0,0,0,249,165,1,0,0,0,249,
+        170,1,0,0,0,249,177,1,0,0,0,249,184,1,0,0,0,249,203,1,0,0,0,249,
+        222,1,0,0,0,249,241,1,0,0,0,249,242,1,0,0,0,249,243,1,0,0,0,249,
+        244,1,0,0,0,249,245,1,0,0,0,250,256,1,0,0,0,251,252,10,2,0,0,252,
+        253,7,0,0,0,253,255,3,2,1,3,254,251,1,0,0,0,255,258,1,0,0,0,256,
+        254,1,0,0,0,256,257,1,0,0,0,257,3,1,0,0,0,258,256,1,0,0,0,259,264,
+        3,2,1,0,260,261,5,2,0,0,261,263,3,2,1,0,262,260,1,0,0,0,263,266,
+        1,0,0,0,264,262,1,0,0,0,264,265,1,0,0,0,265,5,1,0,0,0,266,264,1,
+        0,0,0,267,268,3,8,4,0,268,269,5,14,0,0,269,270,3,8,4,0,270,7,1,0,
+        0,0,271,273,5,42,0,0,272,271,1,0,0,0,272,273,1,0,0,0,273,274,1,0,
+        0,0,274,275,5,44,0,0,275,9,1,0,0,0,276,277,5,45,0,0,277,11,1,0,0,
+        0,10,80,98,119,198,217,236,249,256,264,272
     ]
 
 class ExcelFormulaParser ( Parser ):
@@ -109,8 +129,9 @@ class ExcelFormulaParser ( Parser ):
                       "COUNT", "VLOOKUP", "ROUNDDOWN", "INDEX", "INDIRECT", 
                       "COUNTIFS", "EOMONTH", "NOT", "AVERAGE", "SUMIF", 
                       "CONCAT", "LEN", "ROUND", "ISERROR", "YEARFRAC", "RIGHT", 
-                      "SHEET_NAME", "QUOTED_SHEET_NAME", "CELL", "NAMED_RANGE_IDENTIFIER", 
-                      "NUMBER", "STRING", "IDENTIFIER", "WS" ]
+                      "SUMIFS", "AVERAGEIFS", "MAXIFS", "SHEET_NAME", "QUOTED_SHEET_NAME", 
+                      "CELL", "NAMED_RANGE_IDENTIFIER", "NUMBER", "STRING", 
+                      "IDENTIFIER", "WS" ]
 
     RULE_formula = 0
     RULE_expression = 1
@@ -161,14 +182,17 @@ class ExcelFormulaParser ( Parser ):
     ISERROR=36
     YEARFRAC=37
     RIGHT=38
-    SHEET_NAME=39
-    QUOTED_SHEET_NAME=40
-    CELL=41
-    NAMED_RANGE_IDENTIFIER=42
-    NUMBER=43
-    STRING=44
-    IDENTIFIER=45
-    WS=46
+    SUMIFS=39
+    AVERAGEIFS=40
+    MAXIFS=41
+    SHEET_NAME=42
+    QUOTED_SHEET_NAME=43
+    CELL=44
+    NAMED_RANGE_IDENTIFIER=45
+    NUMBER=46
+    STRING=47
+    IDENTIFIER=48
+    WS=49
 
     def __init__(self, input:TokenStream, output:TextIO = sys.stdout):
         super().__init__(input, output)
@@ -275,6 +299,42 @@ class ExcelFormulaParser ( Parser ):
                 return visitor.visitChildren(self)
 
 
+    class SumIfsExprContext(ExpressionContext):
+
+        def __init__(self, parser, ctx:ParserRuleContext): # actually a ExcelFormulaParser.ExpressionContext
+            super().__init__(parser)
+            self.copyFrom(ctx)
+
+        def SUMIFS(self):
+            return self.getToken(ExcelFormulaParser.SUMIFS, 0)
+        def range_(self, i:int=None):
+            if i is None:
+                return self.getTypedRuleContexts(ExcelFormulaParser.RangeContext)
+            else:
+                return self.getTypedRuleContext(ExcelFormulaParser.RangeContext,i)
+
+        def expression(self, i:int=None):
+            if i is None:
+                return self.getTypedRuleContexts(ExcelFormulaParser.ExpressionContext)
+            else:
+                return self.getTypedRuleContext(ExcelFormulaParser.ExpressionContext,i)
+
+
+        def enterRule(self, listener:ParseTreeListener):
+            if hasattr( listener, "enterSumIfsExpr" ):
+                listener.enterSumIfsExpr(self)
+
+        def exitRule(self, listener:ParseTreeListener):
+            if hasattr( listener, "exitSumIfsExpr" ):
+                listener.exitSumIfsExpr(self)
+
+        def accept(self, visitor:ParseTreeVisitor):
+            if hasattr( visitor, "visitSumIfsExpr" ):
+                return visitor.visitSumIfsExpr(self)
+            else:
+                return visitor.visitChildren(self)
+
+
     class StringExprContext(ExpressionContext):
 
         def __init__(self, parser, ctx:ParserRuleContext): # actually a ExcelFormulaParser.ExpressionContext
@@ -488,6 +548,42 @@ class ExcelFormulaParser ( Parser ):
                 return visitor.visitChildren(self)
 
 
+    class AverageIfsExprContext(ExpressionContext):
+
+        def __init__(self, parser, ctx:ParserRuleContext): # actually a ExcelFormulaParser.ExpressionContext
+            super().__init__(parser)
+            self.copyFrom(ctx)
+
+        def AVERAGEIFS(self):
+            return self.getToken(ExcelFormulaParser.AVERAGEIFS, 0)
+        def range_(self, i:int=None):
+            if i is None:
+                return self.getTypedRuleContexts(ExcelFormulaParser.RangeContext)
+            else:
+                return self.getTypedRuleContext(ExcelFormulaParser.RangeContext,i)
+
+        def expression(self, i:int=None):
+            if i is None:
+                return self.getTypedRuleContexts(ExcelFormulaParser.ExpressionContext)
+            else:
+                return self.getTypedRuleContext(ExcelFormulaParser.ExpressionContext,i)
+
+
+        def enterRule(self, listener:ParseTreeListener):
+            if hasattr( listener, "enterAverageIfsExpr" ):
+                listener.enterAverageIfsExpr(self)
+
+        def exitRule(self, listener:ParseTreeListener):
+            if hasattr( listener, "exitAverageIfsExpr" ):
+                listener.exitAverageIfsExpr(self)
+
+        def accept(self, visitor:ParseTreeVisitor):
+            if hasattr( visitor, "visitAverageIfsExpr" ):
+                return visitor.visitAverageIfsExpr(self)
+            else:
+                return visitor.visitChildren(self)
+
+
     class NumberExprContext(ExpressionContext):
 
         def __init__(self, parser, ctx:ParserRuleContext): # actually a ExcelFormulaParser.ExpressionContext
@@ -545,6 +641,42 @@ class ExcelFormulaParser ( Parser ):
                 return visitor.visitChildren(self)
 
 
+    class MaxIfsExprContext(ExpressionContext):
+
+        def __init__(self, parser, ctx:ParserRuleContext): # actually a ExcelFormulaParser.ExpressionContext
+            super().__init__(parser)
+            self.copyFrom(ctx)
+
+        def MAXIFS(self):
+            return self.getToken(ExcelFormulaParser.MAXIFS, 0)
+        def range_(self, i:int=None):
+            if i is None:
+                return self.getTypedRuleContexts(ExcelFormulaParser.RangeContext)
+            else:
+                return self.getTypedRuleContext(ExcelFormulaParser.RangeContext,i)
+
+        def expression(self, i:int=None):
+            if i is None:
+                return self.getTypedRuleContexts(ExcelFormulaParser.ExpressionContext)
+            else:
+                return self.getTypedRuleContext(ExcelFormulaParser.ExpressionContext,i)
+
+
+        def enterRule(self, listener:ParseTreeListener):
+            if hasattr( listener, "enterMaxIfsExpr" ):
+                listener.enterMaxIfsExpr(self)
+
+        def exitRule(self, listener:ParseTreeListener):
+            if hasattr( listener, "exitMaxIfsExpr" ):
+                listener.exitMaxIfsExpr(self)
+
+        def accept(self, visitor:ParseTreeVisitor):
+            if hasattr( visitor, "visitMaxIfsExpr" ):
+                return visitor.visitMaxIfsExpr(self)
+            else:
+                return visitor.visitChildren(self)
+
+
     class NotExprContext(ExpressionContext):
 
         def __init__(self, parser, ctx:ParserRuleContext): # actually a ExcelFormulaParser.ExpressionContext
@@ -1110,7 +1242,7 @@ class ExcelFormulaParser ( Parser ):
         self._la = 0 # Token type
         try:
             self.enterOuterAlt(localctx, 1)
-            self.state = 192
+            self.state = 249
             self._errHandler.sync(self)
             token = self._input.LA(1)
             if token in [15]:
@@ -1274,7 +1406,7 @@ class ExcelFormulaParser ( Parser ):
                 self.state = 80
                 self._errHandler.sync(self)
                 _la = self._input.LA(1)
-                if (((_la) & ~0x3f) == 0 and ((1 << _la) & 34084860428290) != 0):
+                if (((_la) & ~0x3f) == 0 and ((1 << _la) & 272678883655682) != 0):
                     self.state = 79
                     self.expression(0)
 
@@ -1318,7 +1450,7 @@ class ExcelFormulaParser ( Parser ):
                 self.state = 98
                 self._errHandler.sync(self)
                 _la = self._input.LA(1)
-                if (((_la) & ~0x3f) == 0 and ((1 << _la) & 34084860428290) != 0):
+                if (((_la) & ~0x3f) == 0 and ((1 << _la) & 272678883655682) != 0):
                     self.state = 97
                     self.expression(0)
 
@@ -1522,52 +1654,163 @@ class ExcelFormulaParser ( Parser ):
                 self.state = 182
                 self.match(ExcelFormulaParser.T__2)
                 pass
-            elif token in [39, 41]:
-                localctx = ExcelFormulaParser.CellExprContext(self, localctx)
+            elif token in [39]:
+                localctx = ExcelFormulaParser.SumIfsExprContext(self, localctx)
                 self._ctx = localctx
                 _prevctx = localctx
                 self.state = 184
+                self.match(ExcelFormulaParser.SUMIFS)
+                self.state = 185
+                self.match(ExcelFormulaParser.T__0)
+                self.state = 186
+                self.range_()
+                self.state = 187
+                self.match(ExcelFormulaParser.T__1)
+                self.state = 188
+                self.range_()
+                self.state = 189
+                self.match(ExcelFormulaParser.T__1)
+                self.state = 190
+                self.expression(0)
+                self.state = 198
+                self._errHandler.sync(self)
+                _la = self._input.LA(1)
+                while _la==2:
+                    self.state = 191
+                    self.match(ExcelFormulaParser.T__1)
+                    self.state = 192
+                    self.range_()
+                    self.state = 193
+                    self.match(ExcelFormulaParser.T__1)
+                    self.state = 194
+                    self.expression(0)
+                    self.state = 200
+                    self._errHandler.sync(self)
+                    _la = self._input.LA(1)
+
+                self.state = 201
+                self.match(ExcelFormulaParser.T__2)
+                pass
+            elif token in [40]:
+                localctx = ExcelFormulaParser.AverageIfsExprContext(self, localctx)
+                self._ctx = localctx
+                _prevctx = localctx
+                self.state = 203
+                self.match(ExcelFormulaParser.AVERAGEIFS)
+                self.state = 204
+                self.match(ExcelFormulaParser.T__0)
+                self.state = 205
+                self.range_()
+                self.state = 206
+                self.match(ExcelFormulaParser.T__1)
+                self.state = 207
+                self.range_()
+                self.state = 208
+                self.match(ExcelFormulaParser.T__1)
+                self.state = 209
+                self.expression(0)
+                self.state = 217
+                self._errHandler.sync(self)
+                _la = self._input.LA(1)
+                while _la==2:
+                    self.state = 210
+                    self.match(ExcelFormulaParser.T__1)
+                    self.state = 211
+                    self.range_()
+                    self.state = 212
+                    self.match(ExcelFormulaParser.T__1)
+                    self.state = 213
+                    self.expression(0)
+                    self.state = 219
+                    self._errHandler.sync(self)
+                    _la = self._input.LA(1)
+
+                self.state = 220
+                self.match(ExcelFormulaParser.T__2)
+                pass
+            elif token in [41]:
+                localctx = ExcelFormulaParser.MaxIfsExprContext(self, localctx)
+                self._ctx = localctx
+                _prevctx = localctx
+                self.state = 222
+                self.match(ExcelFormulaParser.MAXIFS)
+                self.state = 223
+                self.match(ExcelFormulaParser.T__0)
+                self.state = 224
+                self.range_()
+                self.state = 225
+                self.match(ExcelFormulaParser.T__1)
+                self.state = 226
+                self.range_()
+                self.state = 227
+                self.match(ExcelFormulaParser.T__1)
+                self.state = 228
+                self.expression(0)
+                self.state = 236
+                self._errHandler.sync(self)
+                _la = self._input.LA(1)
+                while _la==2:
+                    self.state = 229
+                    self.match(ExcelFormulaParser.T__1)
+                    self.state = 230
+                    self.range_()
+                    self.state = 231
+                    self.match(ExcelFormulaParser.T__1)
+                    self.state = 232
+                    self.expression(0)
+                    self.state = 238
+                    self._errHandler.sync(self)
+                    _la = self._input.LA(1)
+
+                self.state = 239
+                self.match(ExcelFormulaParser.T__2)
+                pass
+            elif token in [42, 44]:
+                localctx = ExcelFormulaParser.CellExprContext(self, localctx)
+                self._ctx = localctx
+                _prevctx = localctx
+                self.state = 241
                 self.cellReference()
                 pass
-            elif token in [42]:
+            elif token in [45]:
                 localctx = ExcelFormulaParser.NamedRangeExprContext(self, localctx)
                 self._ctx = localctx
                 _prevctx = localctx
-                self.state = 185
+                self.state = 242
                 self.namedRange()
                 pass
-            elif token in [43]:
+            elif token in [46]:
                 localctx = ExcelFormulaParser.NumberExprContext(self, localctx)
                 self._ctx = localctx
                 _prevctx = localctx
-                self.state = 186
+                self.state = 243
                 self.match(ExcelFormulaParser.NUMBER)
                 pass
-            elif token in [44]:
+            elif token in [47]:
                 localctx = ExcelFormulaParser.StringExprContext(self, localctx)
                 self._ctx = localctx
                 _prevctx = localctx
-                self.state = 187
+                self.state = 244
                 self.match(ExcelFormulaParser.STRING)
                 pass
             elif token in [1]:
                 localctx = ExcelFormulaParser.ParenthesizedExprContext(self, localctx)
                 self._ctx = localctx
                 _prevctx = localctx
-                self.state = 188
+                self.state = 245
                 self.match(ExcelFormulaParser.T__0)
-                self.state = 189
+                self.state = 246
                 self.expression(0)
-                self.state = 190
+                self.state = 247
                 self.match(ExcelFormulaParser.T__2)
                 pass
             else:
                 raise NoViableAltException(self)
 
             self._ctx.stop = self._input.LT(-1)
-            self.state = 199
+            self.state = 256
             self._errHandler.sync(self)
-            _alt = self._interp.adaptivePredict(self._input,4,self._ctx)
+            _alt = self._interp.adaptivePredict(self._input,7,self._ctx)
             while _alt!=2 and _alt!=ATN.INVALID_ALT_NUMBER:
                 if _alt==1:
                     if self._parseListeners is not None:
@@ -1575,11 +1818,11 @@ class ExcelFormulaParser ( Parser ):
                     _prevctx = localctx
                     localctx = ExcelFormulaParser.BinaryOpExprContext(self, ExcelFormulaParser.ExpressionContext(self, _parentctx, _parentState))
                     self.pushNewRecursionContext(localctx, _startState, self.RULE_expression)
-                    self.state = 194
+                    self.state = 251
                     if not self.precpred(self._ctx, 2):
                         from antlr4.error.Errors import FailedPredicateException
                         raise FailedPredicateException(self, "self.precpred(self._ctx, 2)")
-                    self.state = 195
+                    self.state = 252
                     localctx.operator = self._input.LT(1)
                     _la = self._input.LA(1)
                     if not((((_la) & ~0x3f) == 0 and ((1 << _la) & 16368) != 0)):
@@ -1587,11 +1830,11 @@ class ExcelFormulaParser ( Parser ):
                     else:
                         self._errHandler.reportMatch(self)
                         self.consume()
-                    self.state = 196
+                    self.state = 253
                     self.expression(3) 
-                self.state = 201
+                self.state = 258
                 self._errHandler.sync(self)
-                _alt = self._interp.adaptivePredict(self._input,4,self._ctx)
+                _alt = self._interp.adaptivePredict(self._input,7,self._ctx)
 
         except RecognitionException as re:
             localctx.exception = re
@@ -1643,17 +1886,17 @@ class ExcelFormulaParser ( Parser ):
         self._la = 0 # Token type
         try:
             self.enterOuterAlt(localctx, 1)
-            self.state = 202
+            self.state = 259
             self.expression(0)
-            self.state = 207
+            self.state = 264
             self._errHandler.sync(self)
             _la = self._input.LA(1)
             while _la==2:
-                self.state = 203
+                self.state = 260
                 self.match(ExcelFormulaParser.T__1)
-                self.state = 204
+                self.state = 261
                 self.expression(0)
-                self.state = 209
+                self.state = 266
                 self._errHandler.sync(self)
                 _la = self._input.LA(1)
 
@@ -1706,11 +1949,11 @@ class ExcelFormulaParser ( Parser ):
         self.enterRule(localctx, 6, self.RULE_range)
         try:
             self.enterOuterAlt(localctx, 1)
-            self.state = 210
+            self.state = 267
             self.cellReference()
-            self.state = 211
+            self.state = 268
             self.match(ExcelFormulaParser.T__13)
-            self.state = 212
+            self.state = 269
             self.cellReference()
         except RecognitionException as re:
             localctx.exception = re
@@ -1761,15 +2004,15 @@ class ExcelFormulaParser ( Parser ):
         self._la = 0 # Token type
         try:
             self.enterOuterAlt(localctx, 1)
-            self.state = 215
+            self.state = 272
             self._errHandler.sync(self)
             _la = self._input.LA(1)
-            if _la==39:
-                self.state = 214
+            if _la==42:
+                self.state = 271
                 self.match(ExcelFormulaParser.SHEET_NAME)
 
 
-            self.state = 217
+            self.state = 274
             self.match(ExcelFormulaParser.CELL)
         except RecognitionException as re:
             localctx.exception = re
@@ -1816,7 +2059,7 @@ class ExcelFormulaParser ( Parser ):
         self.enterRule(localctx, 10, self.RULE_namedRange)
         try:
             self.enterOuterAlt(localctx, 1)
-            self.state = 219
+            self.state = 276
             self.match(ExcelFormulaParser.NAMED_RANGE_IDENTIFIER)
         except RecognitionException as re:
             localctx.exception = re
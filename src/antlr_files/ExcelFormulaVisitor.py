@@ -19,6 +19,11 @@ class ExcelFormulaVisitor(ParseTreeVisitor):
         return self.visitChildren(ctx)
 
 
+    # Visit a parse tree produced by ExcelFormulaParser#SumIfsExpr.
+    def visitSumIfsExpr(self, ctx:ExcelFormulaParser.SumIfsExprContext):
+        return self.visitChildren(ctx)
+
+
     # Visit a parse tree produced by ExcelFormulaParser#StringExpr.
     def visitStringExpr(self, ctx:ExcelFormulaParser.StringExprContext):
         return self.visitChildren(ctx)
@@ -54,6 +59,11 @@ class ExcelFormulaVisitor(ParseTreeVisitor):
         return self.visitChildren(ctx)
 
 
+    # Visit a parse tree produced by ExcelFormulaParser#AverageIfsExpr.
+    def visitAverageIfsExpr(self, ctx:ExcelFormulaParser.AverageIfsExprContext):
+        return self.visitChildren(ctx)
+
+
     # Visit a parse tree produced by ExcelFormulaParser#NumberExpr.
     def visitNumberExpr(self, ctx:ExcelFormulaParser.NumberExprContext):
         return self.visitChildren(ctx)
@@ -64,6 +74,11 @@ class ExcelFormulaVisitor(ParseTreeVisitor):
         return self.visitChildren(ctx)
 
 
+    # Visit a parse tree produced by ExcelFormulaParser#MaxIfsExpr.
+    def visitMaxIfsExpr(self, ctx:ExcelFormulaParser.MaxIfsExprContext):
+        return self.visitChildren(ctx)
+
+
     # Visit a parse tree produced by ExcelFormulaParser#NotExpr.
     def visitNotExpr(self, ctx:ExcelFormulaParser.NotExprContext):
         return self.visitChildren(ctx)
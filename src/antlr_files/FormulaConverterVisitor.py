@@ -1,9 +1,13 @@
+import re
+
 from src.antlr_files.ExcelFormulaVisitor import ExcelFormulaVisitor
 from src.antlr_files.ExcelFormulaParser import ExcelFormulaParser
 
+_CELL_PARTS_RE = re.compile(r'(\$?)([A-Z]+)(\$?)([0-9]+)')
+
 
 class FormulaConverterVisitor(ExcelFormulaVisitor):
-    def __init__(self, data, shared_data, sheet_name):
+    def __init__(self, data, shared_data, sheet_name, offset=(0, 0)):
         self.data = data
         self.shared_data = shared_data
         self.dependencies = set()
@@ -14,6 +18,9 @@ class FormulaConverterVisitor(ExcelFormulaVisitor):
         self.unresolved = set()
         # Strict mode: disallow external cell/range refs that aren't key-mapped
         self.strict = bool(self.shared_data.get('strict_no_cells'))
+        # (rows, cols) to shift relative references by when visiting a parse tree
+        # that was produced for another cell with the same relative formula shape
+        self.row_offset, self.col_offset = offset
 
     def _extract_sheet_and_cells(self, text):
         """Helper method to extract sheet name and cells from range text, handling quoted sheet names.
@@ -26,10 +33,25 @@ class FormulaConverterVisitor(ExcelFormulaVisitor):
                 sheet = sheet[1:-1]
         else:
             sheet, cells = self.sheet_name, text
+        if self.row_offset or self.col_offset:
+            cells = ':'.join(self._shift_ref(part) for part in cells.split(':'))
         # Remove absolute markers
         cells = cells.replace('$', '')
         return sheet, cells
 
+    def _shift_ref(self, ref):
+        """Shift the relative parts of a cell reference by the visitor offset."""
+        sheet, bang, cell = ref.rpartition('!')
+        match = _CELL_PARTS_RE.fullmatch(cell)
+        if not match:
+            return ref
+        col_abs, col, row_abs, row = match.groups()
+        if not col_abs:
+            col = self._num_to_col(self._col_to_num(col) + self.col_offset)
+        if not row_abs:
+            row = str(int(row) + self.row_offset)
+        return f"{sheet}{bang}{col_abs}{col}{row_abs}{row}"
+
     def _maybe_key_lookup(self, sheet, cell_ref):
         """If a semantic key exists for this cell, return get_value expression; else None."""
         try:
@@ -75,9 +97,9 @@ class FormulaConverterVisitor(ExcelFormulaVisitor):
 
     def _keys_for_range(self, sheet, start, end):
         cell_to_key_map = self.shared_data.get('cell_to_key_map', {}).get(sheet, {})
-        cells = list(self._expand_range_cells(start, end))
         keys = []
-        for c in cells:
+        # Stops at the first unkeyed cell, so large unkeyed ranges aren't expanded
+        for c in self._expand_range_cells(start, end):
             k = cell_to_key_map.get(c)
             if k:
                 keys.append(k)
@@ -205,8 +227,8 @@ class FormulaConverterVisitor(ExcelFormulaVisitor):
 
     def visitRange(self, ctx:ExcelFormulaParser.RangeContext):
         # Ensure returned range omits absolute markers
-        left = ctx.cellReference(0).getText().replace('$', '')
-        right = ctx.cellReference(1).getText().replace('$', '')
+        left = self._shift_ref(ctx.cellReference(0).getText()).replace('$', '')
+        right = self._shift_ref(ctx.cellReference(1).getText()).replace('$', '')
         return left + ':' + right
 
     # New function implementations
@@ -240,41 +262,59 @@ class FormulaConverterVisitor(ExcelFormulaVisitor):
         ref = self.visit(ctx.expression())
         return f"indirect(data, {ref})"
 
-    def visitCountIfsExpr(self, ctx:ExcelFormulaParser.CountIfsExprContext):
+    def _ifs_call(self, function, criteria_ranges, criteria_exprs, value_range=None):
+        """Emit a COUNTIFS-style call; value_range is the SUMIFS/AVERAGEIFS/MAXIFS range."""
         keys_lists = []
-        criteria_list = []
         text_ranges = []
-        # Ranges and criteria alternate: range, crit, range, crit, ...
-        for i in range(0, len(ctx.range_())):
-            range_text = ctx.range_(i).getText()
-            sheet, cells = self._extract_sheet_and_cells(range_text)
+        range_ctxs = ([value_range] if value_range is not None else []) + list(criteria_ranges)
+        for range_ctx in range_ctxs:
+            sheet, cells = self._extract_sheet_and_cells(range_ctx.getText())
             start, end = cells.split(':')
             self.dependencies.add(f"{sheet}!{start}:{end}")
             text_ranges.append((sheet, start, end))
-            crit = self.visit(ctx.expression(i))
-            criteria_list.append(crit)
             keys = self._keys_for_range(sheet, start, end)
             if keys:
                 # Track all semantic keys used
                 for k in keys:
                     self.input_keys.add((sheet, k))
-                keys_lists.append(keys)
-            else:
-                keys_lists.append(None)
-        # If all ranges mapped to keys and all on same sheet, emit key-based countifs
+            keys_lists.append(keys)
+        criteria_list = [self.visit(expr) for expr in criteria_exprs]
+        criteria_args = f"[{', '.join(criteria_list)}]"
+        # If all ranges mapped to keys and all on same sheet, emit key-based call
         if all(k is not None for k in keys_lists):
             # Determine a sheet to use (prefer current when present among ranges)
             sheet_candidates = {s for (s, _, _) in text_ranges}
             out_sheet = self.sheet_name if self.sheet_name in sheet_candidates else next(iter(sheet_candidates))
-            return f"countifs_keys(data, '{out_sheet}', {repr(keys_lists)}, {repr(criteria_list)})"
-        # Otherwise, fall back to cell-based COUNTIFS, but enforce strict for external unmapped ranges
-        ranges_criteria = []
-        for (sheet, start, end), crit, keys in zip(text_ranges, criteria_list, keys_lists):
+            if value_range is not None:
+                return (f"{function}_keys(data, '{out_sheet}', {repr(keys_lists[0])}, "
+                        f"{repr(keys_lists[1:])}, {criteria_args})")
+            return f"{function}_keys(data, '{out_sheet}', {repr(keys_lists)}, {criteria_args})"
+        # Otherwise, fall back to cell-based ranges, but enforce strict for external unmapped ranges
+        for (sheet, start, end), keys in zip(text_ranges, keys_lists):
             if keys is None and sheet != self.sheet_name and self.strict:
                 self.unresolved.add(f"{sheet}!{start}:{end}")
                 raise ValueError(f"Unmapped external range {sheet}!{start}:{end} in strict mode")
-            ranges_criteria.append(f"('{sheet}', '{start}:{end}', {crit})")
-        return f"countifs(data, [{', '.join(ranges_criteria)}])"
+        if value_range is not None:
+            value_sheet, value_start, value_end = text_ranges.pop(0)
+        ranges_criteria = ', '.join(
+            f"('{sheet}', '{start}:{end}', {crit})" for (sheet, start, end), crit in zip(text_ranges, criteria_list)
+        )
+        if value_range is not None:
+            return f"{function}(data, ('{value_sheet}', '{value_start}:{value_end}'), [{ranges_criteria}])"
+        return f"{function}(data, [{ranges_criteria}])"
+
+    def visitCountIfsExpr(self, ctx:ExcelFormulaParser.CountIfsExprContext):
+        # Ranges and criteria alternate: range, crit, range, crit, ...
+        return self._ifs_call('countifs', ctx.range_(), ctx.expression())
+
+    def visitSumIfsExpr(self, ctx:ExcelFormulaParser.SumIfsExprContext):
+        return self._ifs_call('sumifs', ctx.range_()[1:], ctx.expression(), value_range=ctx.range_(0))
+
+    def visitAverageIfsExpr(self, ctx:ExcelFormulaParser.AverageIfsExprContext):
+        return self._ifs_call('averageifs', ctx.range_()[1:], ctx.expression(), value_range=ctx.range_(0))
+
+    def visitMaxIfsExpr(self, ctx:ExcelFormulaParser.MaxIfsExprContext):
+        return self._ifs_call('maxifs', ctx.range_()[1:], ctx.expression(), value_range=ctx.range_(0))
 
     def visitEoMonthExpr(self, ctx:ExcelFormulaParser.EoMonthExprContext):
         start_date = self.visit(ctx.expression(0))
@@ -3,7 +3,26 @@ import json
 import argparse
 from pathlib import Path
 from openpyxl import load_workbook
-from typing import Dict, List, Any, Tuple, Optional
+from typing import Dict, Iterator, List, Any, Set, Tuple, Optional
+
+from src.conversion.parallel import map_files
+
+class _RowCache:
+    """Rows of a worksheet, read on demand from a single `iter_rows` pass and kept."""
+
+    def __init__(self, ws):
+        self.max_row = ws.max_row
+        self._source = ws.iter_rows()
+        self._rows = []
+
+    def row(self, row_idx: int) -> tuple:
+        """Cells of a 1-based row, or () past the end of the sheet."""
+        while len(self._rows) < row_idx:
+            row = next(self._source, None)
+            if row is None:
+                return ()
+            self._rows.append(row)
+        return self._rows[row_idx - 1]
 
 def find_key_value_columns(ws) -> Optional[Tuple[int, int]]:
     """Find columns containing 'key' and 'value' headers."""
@@ -40,13 +59,14 @@ def extract_key_value_pairs(ws, key_col: int, value_col: int) -> Dict[str, Any]:
     
     return key_value_pairs
 
-def find_customer_preference_data(ws) -> Optional[Dict[str, int]]:
+def find_customer_preference_data(ws, rows: Optional[_RowCache] = None) -> Optional[Dict[str, int]]:
     """Find the actual customer preference values (not formulas/weights)."""
     columns = {}
+    rows = rows or _RowCache(ws)
     
     # Look for "Customer preferences" header and the data beneath it
-    for row_idx, row in enumerate(ws.iter_rows(max_row=15), 1):
-        for cell in row:
+    for row_idx in range(1, min(15, rows.max_row) + 1):
+        for cell in rows.row(row_idx):
             if cell.value and isinstance(cell.value, str):
                 cell_value = cell.value.lower().strip()
                 if 'customer preferences' in cell_value:
@@ -56,8 +76,8 @@ def find_customer_preference_data(ws) -> Optional[Dict[str, int]]:
                     
                     # Look at the next few rows to find where the actual data starts
                     # and verify it contains text values (not just numbers)
-                    for data_row_idx in range(row_idx + 1, min(row_idx + 10, ws.max_row + 1)):
-                        data_row = list(ws.iter_rows(min_row=data_row_idx, max_row=data_row_idx))[0]
+                    for data_row_idx in range(row_idx + 1, min(row_idx + 10, rows.max_row + 1)):
+                        data_row = rows.row(data_row_idx)
                         if len(data_row) > cell.column - 1:
                             first_cell = data_row[cell.column - 1]
                             if first_cell.value and isinstance(first_cell.value, str):
@@ -236,13 +256,14 @@ def merge_preference_data(values_data: Dict[str, Any], weights_data: Dict[str, A
         "total_weight": weights_data.get("total_weight", 0)
     }
 
-def find_customer_preference_table(ws) -> Optional[Dict[str, int]]:
+def find_customer_preference_table(ws, rows: Optional[_RowCache] = None) -> Optional[Dict[str, int]]:
     """Find a table of customer preferences with format 'preference | value1 | value2 | etc'."""
     columns = {}
+    rows = rows or _RowCache(ws)
     
     # Look for "Customer preferences" header row
-    for row_idx, row in enumerate(ws.iter_rows(max_row=20), 1):
-        for cell_idx, cell in enumerate(row, 1):
+    for row_idx in range(1, min(20, rows.max_row) + 1):
+        for cell_idx, cell in enumerate(rows.row(row_idx), 1):
             if cell.value and isinstance(cell.value, str):
                 cell_value = cell.value.lower().strip()
                 if 'customer preferences' in cell_value:
@@ -250,9 +271,9 @@ def find_customer_preference_table(ws) -> Optional[Dict[str, int]]:
                     columns['start_col'] = cell_idx
                     
                     # Found the header, now check if the next row contains preference names
-                    if row_idx + 1 <= ws.max_row:
+                    if row_idx + 1 <= rows.max_row:
                         # Get first item in the next row (under "Customer preferences")
-                        next_row = list(ws.iter_rows(min_row=row_idx + 1, max_row=row_idx + 1))[0]
+                        next_row = rows.row(row_idx + 1)
                         if len(next_row) >= cell_idx:
                             first_item = next_row[cell_idx - 1]
                             if first_item and first_item.value:
@@ -261,17 +282,19 @@ def find_customer_preference_table(ws) -> Optional[Dict[str, int]]:
     
     return None
 
-def extract_customer_preference_table(ws, columns: Dict[str, int]) -> Dict[str, Any]:
+def extract_customer_preference_table(ws, columns: Dict[str, int],
+                                      rows: Optional[_RowCache] = None) -> Dict[str, Any]:
     """Extract customer preferences from a table format."""
     preferences = {}
+    rows = rows or _RowCache(ws)
     
     start_row = columns['data_start_row']
     start_col = columns['start_col']
     
     # Determine how many rows to process (stop at blank row)
     end_row = start_row
-    for row_idx in range(start_row, ws.max_row + 1):
-        row = list(ws.iter_rows(min_row=row_idx, max_row=row_idx))[0]
+    for row_idx in range(start_row, rows.max_row + 1):
+        row = rows.row(row_idx)
         if len(row) >= start_col and row[start_col - 1].value:
             end_row = row_idx
         else:
@@ -279,7 +302,7 @@ def extract_customer_preference_table(ws, columns: Dict[str, int]) -> Dict[str,
     
     # Process each row in the preference table
     for row_idx in range(start_row, end_row + 1):
-        row = list(ws.iter_rows(min_row=row_idx, max_row=row_idx))[0]
+        row = rows.row(row_idx)
         if len(row) < start_col:
             continue
             
@@ -329,10 +352,11 @@ def extract_formulas_and_data(file_path: str) -> Dict[str, Any]:
         
         # Try to find a dedicated customer preference table 
         # (like the one in your screenshot)
-        pref_table = find_customer_preference_table(ws)
+        rows = _RowCache(ws)
+        pref_table = find_customer_preference_table(ws, rows)
         if pref_table:
             print(f"  Found customer preference TABLE in {sheet_name}")
-            customer_values_data = extract_customer_preference_table(ws, pref_table)
+            customer_values_data = extract_customer_preference_table(ws, pref_table, rows)
             if customer_values_data["preferences"]:
                 print(f"  Extracted {len(customer_values_data['preferences'])} preference values from table")
                 break  # Found what we need, stop looking further
@@ -396,10 +420,51 @@ def extract_formulas_and_data(file_path: str) -> Dict[str, Any]:
     
     return result
 
-def batch_process_files(input_dir: str, output_file: str) -> None:
-    """Process all Excel files in the input directory."""
+def read_ndjson(output_file: str) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Yield (file name, extracted data) for each workbook record of an NDJSON output.
+
+    A trailing partial line (from a run that was killed mid-write) is ignored.
+    """
+    with open(output_file, 'rb') as f:
+        for line in f:
+            if not line.endswith(b'\n'):
+                break
+            record = json.loads(line)
+            yield record["file"], record["data"]
+
+def _resume_ndjson(output_file: str) -> Set[str]:
+    """Names of the workbooks already in an NDJSON output; drops a trailing partial line."""
+    if not os.path.exists(output_file):
+        return set()
+    done = set()
+    complete_size = 0
+    with open(output_file, 'rb') as f:
+        for line in f:
+            if not line.endswith(b'\n'):
+                break
+            done.add(json.loads(line)["file"])
+            complete_size += len(line)
+    if complete_size < os.path.getsize(output_file):
+        os.truncate(output_file, complete_size)
+    return done
+
+def batch_process_files(input_dir: str, output_file: str, workers: int = 1,
+                        max_in_flight: Optional[int] = None, output_format: str = 'json',
+                        resume: bool = False) -> None:
+    """Process all Excel files in the input directory, one workbook per task.
+
+    With workers > 1 the workbooks are extracted on a process pool and added to the
+    aggregate as they finish; `max_in_flight` caps how many are in memory at once.
+    A workbook that fails is reported and skipped.
+
+    `output_format` 'json' writes one object keyed by file name once every file is
+    done. 'ndjson' writes a {"file", "data"} line per workbook as soon as it finishes
+    (see `read_ndjson`); with `resume`, files already in the output are skipped and
+    new records are appended.
+    """
     input_path = Path(input_dir)
     all_data: Dict[str, Dict[str, Any]] = {}
+    streaming = output_format == 'ndjson'
     
     # Find all Excel files
     excel_files = list(input_path.glob("**/*.xlsx"))
@@ -408,29 +473,47 @@ def batch_process_files(input_dir: str, output_file: str) -> None:
         print(f"No Excel files found in {input_dir}")
         return
 
-    # Process each file
-    for file_path in excel_files:
-        print(f"Processing: {file_path.name}")
-        try:
-            file_data = extract_formulas_and_data(str(file_path))
-            all_data[file_path.name] = file_data
-            
+    done = _resume_ndjson(output_file) if streaming and resume else set()
+    to_process = [str(p) for p in excel_files if p.name not in done]
+    if done:
+        print(f"Resuming: {len(excel_files) - len(to_process)} files already in {output_file}")
+
+    processed = 0
+    output = open(output_file, 'a' if done else 'w') if streaming else None
+    try:
+        # Process each file as it completes
+        for file_path, file_data, error in map_files(extract_formulas_and_data, to_process,
+                                                     workers=workers, max_in_flight=max_in_flight):
+            name = Path(file_path).name
+            if error is not None:
+                print(f"Error processing {name}: {error}")
+                continue
+            if streaming:
+                # One complete line per workbook, flushed so a crash loses at most this file
+                output.write(json.dumps({"file": name, "data": file_data}) + "\n")
+                output.flush()
+            else:
+                all_data[name] = file_data
+            processed += 1
+
             formula_count = len(file_data["formulas"])
             kv_count = sum(len(sheet_data) for sheet_data in file_data["key_value_data"].values())
             pref_count = sum(len(sheet_data["preferences"]) for sheet_data in file_data["customer_preferences"].values())
-            
-            print(f"Found {formula_count} formulas, {kv_count} key-value pairs, and {pref_count} customer preferences")
-            
-        except Exception as e:
-            print(f"Error processing {file_path.name}: {str(e)}")
-            continue
 
-    # Save results
-    with open(output_file, 'w') as f:
-        json.dump(all_data, f, indent=2)
+            print(f"Processed {name}: {formula_count} formulas, {kv_count} key-value pairs, "
+                  f"and {pref_count} customer preferences")
+    finally:
+        if output:
+            output.close()
+
+    if not streaming:
+        # Save results in input order, whatever order the workers finished in
+        ordered_data = {p.name: all_data[p.name] for p in excel_files if p.name in all_data}
+        with open(output_file, 'w') as f:
+            json.dump(ordered_data, f, indent=2)
     
     print(f"\nProcessing complete!")
-    print(f"Processed {len(excel_files)} files")
+    print(f"Processed {processed} of {len(to_process)} files")
     print(f"Results saved to: {output_file}")
 
 def main():
@@ -439,6 +522,14 @@ def main():
     parser.add_argument('--output', '-o', 
                        default='extracted_data.json',
                        help='Output JSON file path (default: extracted_data.json)')
+    parser.add_argument('--workers', type=int, default=1,
+                       help='Processes to extract workbooks with (0 = one per CPU, default: 1)')
+    parser.add_argument('--max-in-flight', type=int, default=None,
+                       help='Most workbooks extracted or held in memory at once (default: two per worker)')
+    parser.add_argument('--format', choices=['json', 'ndjson'], default='json',
+                       help='json: one object written at the end; ndjson: one line per workbook as it finishes')
+    parser.add_argument('--resume', action='store_true',
+                       help='With --format ndjson, skip workbooks already in the output and append the rest')
     
     args = parser.parse_args()
     
@@ -446,7 +537,8 @@ def main():
         print(f"Error: Input directory '{args.input_dir}' does not exist")
         return
 
-    batch_process_files(args.input_dir, args.output)
+    batch_process_files(args.input_dir, args.output, workers=args.workers, max_in_flight=args.max_in_flight,
+                        output_format=args.format, resume=args.resume)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
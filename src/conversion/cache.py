@@ -0,0 +1,208 @@
+"""
+Content-addressed on-disk cache for extracted workbooks and converted formulas.
+
+Extraction results are keyed by the SHA-256 of the workbook bytes. Conversion results
+are stored per sheet, keyed by the sheet's formulas, the key maps of the sheets those
+formulas reference, the converter settings and a fingerprint of the grammar/converter
+sources, so editing one sheet only invalidates that sheet (and sheets that reference its
+semantic keys).
+
+Entries are pickled with protocol 5. The cache is capped in bytes on disk: a hit marks
+its entry as recently used (its mtime), and the least recently used entries are evicted
+once a store takes the cache over the cap.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+import re
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+SRC_DIR = Path(__file__).resolve().parents[1]
+
+# Sources whose contents determine the Python emitted for a formula
+CONVERTER_SOURCES = [
+    SRC_DIR / 'antlr_files' / 'ExcelFormula.g4',
+    SRC_DIR / 'antlr_files' / 'FormulaConverterVisitor.py',
+    SRC_DIR / 'conversion' / 'converter.py',
+]
+EXTRACTOR_SOURCES = [
+    SRC_DIR / 'conversion' / 'sheet_store.py',
+    SRC_DIR / 'utils' / 'scrape.py',
+    SRC_DIR / 'utils' / 'xlsx_reader.py',
+]
+
+# Default on-disk size cap of a cache directory
+DEFAULT_MAX_BYTES = 1 << 30
+
+# 'Quoted Sheet'!A1 or Sheet1!A1
+_SHEET_REF_RE = re.compile(r"'([^']+)'!|([A-Za-z_][A-Za-z0-9_.]*)!")
+
+
+def file_digest(file_path: str, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 of a file's bytes."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def source_fingerprint(paths: Iterable[Path]) -> str:
+    """Hash the contents of source files; missing files hash as empty."""
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(path.name.encode())
+        if path.exists():
+            digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def referenced_sheets(formulas: Iterable[str], sheet: str) -> List[str]:
+    """Sheets referenced by a list of formula strings, including the sheet they live on."""
+    names = {sheet}
+    for formula in formulas:
+        for quoted, bare in _SHEET_REF_RE.findall(formula):
+            names.add(quoted or bare)
+    return sorted(names)
+
+
+class ConversionCache:
+    """Persistent cache of extraction and per-sheet conversion results."""
+
+    def __init__(self, cache_dir: str, max_bytes: Optional[int] = DEFAULT_MAX_BYTES):
+        """`max_bytes` caps the size of the cache directory; None leaves it unbounded."""
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.grammar_version = source_fingerprint(CONVERTER_SOURCES)
+        self.extractor_version = source_fingerprint(EXTRACTOR_SOURCES)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Bytes on disk, counted on the first store and kept up to date after that
+        self._total_bytes = None
+
+    # --- storage helpers ---
+    def _path(self, kind: str, key: str) -> Path:
+        return self.cache_dir / kind / f"{key}.pkl"
+
+    def _load(self, kind: str, key: str) -> Optional[Any]:
+        path = self._path(kind, key)
+        try:
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception as e:
+            logging.warning(f"Discarding unreadable cache entry {path}: {e}")
+            self.misses += 1
+            return None
+        self.hits += 1
+        try:
+            # Mark the entry as recently used for LRU eviction
+            os.utime(path)
+        except OSError:
+            pass
+        return value
+
+    def _store(self, kind: str, key: str, value: Any) -> None:
+        path = self._path(kind, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temp file and rename so an interrupted run never leaves a torn entry
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(value, f, protocol=5)
+            size = os.stat(tmp_path).st_size
+            try:
+                # Re-storing a key replaces its entry: only the difference is added
+                replaced = path.stat().st_size
+            except FileNotFoundError:
+                replaced = 0
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        if self.max_bytes is None:
+            return
+        if self._total_bytes is None:
+            self._evict()
+        else:
+            self._total_bytes += size - replaced
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        """Delete least recently used entries until the cache fits `max_bytes`."""
+        entries = []
+        for path in self.cache_dir.glob('*/*.pkl'):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        # The newest entry (the one just stored) is kept even if it alone exceeds the cap
+        for _, size, path in entries[:-1]:
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            self.evictions += 1
+        self._total_bytes = total
+
+    # --- extraction ---
+    def extract(self, file_path: str, extract: Callable[[str], Dict[str, Any]], variant: str = '') -> Dict[str, Any]:
+        """
+        Return extracted workbook data, calling `extract(file_path)` only on a cache miss.
+        `variant` names extraction options (e.g. 'sparse') that change the result.
+        """
+        key = self.extracted_key(file_path, variant)
+        extracted = self.load_extracted(key)
+        if extracted is None:
+            extracted = extract(file_path)
+            self.store_extracted(key, extracted)
+        return extracted
+
+    def extracted_key(self, file_path: str, variant: str = '') -> str:
+        """Cache key of a workbook's extracted data (see `extract`)."""
+        key = f"{file_digest(file_path)}-{self.extractor_version}"
+        return f"{key}-{variant}" if variant else key
+
+    def load_extracted(self, key: str) -> Optional[Dict[str, Any]]:
+        return self._load('extracted', key)
+
+    def store_extracted(self, key: str, extracted: Dict[str, Any]) -> None:
+        self._store('extracted', key, extracted)
+
+    # --- conversion ---
+    def sheet_key(self, sheet: str, formulas: List[Dict[str, str]], shared_data: Dict[str, Any]) -> str:
+        """Cache key for converting one sheet's formulas under the given shared data."""
+        formula_texts = [f["formula"] for f in formulas]
+        cell_to_key_map = shared_data.get('cell_to_key_map', {})
+        settings = {k: v for k, v in shared_data.items() if k != 'cell_to_key_map'}
+        payload = {
+            "grammar": self.grammar_version,
+            "settings": settings,
+            "sheet": sheet,
+            "formulas": [(f["cell"], f["formula"]) for f in formulas],
+            "key_maps": {s: cell_to_key_map.get(s, {}) for s in referenced_sheets(formula_texts, sheet)},
+        }
+        encoded = json.dumps(payload, sort_keys=True, default=str).encode()
+        return hashlib.sha256(encoded).hexdigest()
+
+    def load_sheet(self, key: str) -> Optional[Dict[str, list]]:
+        """Return {'converted': [ConvertedFormula], 'errors': [...]} or None on a miss."""
+        return self._load('sheets', key)
+
+    def store_sheet(self, key: str, converted: list, errors: list) -> None:
+        self._store('sheets', key, {"converted": converted, "errors": errors})
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions}
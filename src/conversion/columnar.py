@@ -0,0 +1,163 @@
+"""
+Columnar evaluation of multi-criteria aggregates (COUNTIFS, SUMIFS, AVERAGEIFS, MAXIFS).
+
+Each criteria range is materialized once into NumPy columns (numeric values, lower-cased
+text, booleans, blanks). A compiled `Criteria` then becomes a boolean mask over a whole
+column, and the masks of all criteria are combined with `&`. On an indexed sheet the
+materialized columns are cached and shared until the sheet is written.
+"""
+
+import operator
+
+import numpy as np
+
+from .indexes import cell_position, column_letter
+from .sheet_store import IndexedCells
+
+_RELATIONS = {'>=': operator.ge, '<=': operator.le, '>': operator.gt, '<': operator.lt}
+
+
+# Type codes of cell values; blank strings are told apart from text after coding
+_BLANK, _BOOL, _INT, _FLOAT, _TEXT, _OTHER = range(6)
+_TYPE_CODES = {type(None): _BLANK, bool: _BOOL, int: _INT, float: _FLOAT, str: _TEXT}
+
+
+def _type_code(value_type):
+    code = _TYPE_CODES.get(value_type)
+    if code is None:
+        # Subclasses (and other types) are classified once per type
+        for base, base_code in ((bool, _BOOL), (int, _INT), (float, _FLOAT), (str, _TEXT)):
+            if issubclass(value_type, base):
+                code = base_code
+                break
+        else:
+            code = _OTHER
+        _TYPE_CODES[value_type] = code
+    return code
+
+
+class Column:
+    """One column of cell values as typed NumPy arrays; missing cells are blank."""
+
+    def __init__(self, values):
+        count = len(values)
+        self.values = np.empty(count, dtype=object)
+        self.values[:] = values
+        codes = np.fromiter((_type_code(type(v)) for v in values), dtype=np.int8, count=count)
+        self.is_bool = codes == _BOOL
+        self.is_float = codes == _FLOAT
+        self.is_number = self.is_float | (codes == _INT)
+        self.is_text = codes == _TEXT
+        self.is_blank = codes == _BLANK
+        if self.is_text.any():
+            self.is_blank |= self.is_text & (self.values == '')
+        self.numbers = np.zeros(count, dtype=np.float64)
+        if self.is_number.any():
+            self.numbers[self.is_number] = self.values[self.is_number].astype(np.float64)
+        self._text = None
+
+    @property
+    def text(self):
+        """Lower-cased text values (only set where is_text), built on first use."""
+        if self._text is None:
+            self._text = np.empty(len(self), dtype=object)
+            self._text[self.is_text] = [v.lower() for v in self.values[self.is_text]]
+        return self._text
+
+    @classmethod
+    def from_cells(cls, cells, letter, start_row, end_row):
+        return cls([cells.get(f"{letter}{row}") for row in range(start_row, end_row + 1)])
+
+    def __len__(self):
+        return len(self.values)
+
+    def mask(self, criteria):
+        """Boolean mask of the values matching a compiled `Criteria`."""
+        if criteria.operator in ('=', '<>'):
+            matches = self._equals(criteria)
+            return ~matches if criteria.operator == '<>' else matches
+
+        relation = _RELATIONS[criteria.operator]
+        result = np.zeros(len(self), dtype=bool)
+        if criteria.number is not None:
+            result[self.is_number] = relation(self.numbers[self.is_number], criteria.number)
+        elif self.is_text.any():
+            result[self.is_text] = np.array(
+                [relation(v, criteria.text) for v in self.text[self.is_text]], dtype=bool
+            )
+        return result
+
+    def _equals(self, criteria):
+        if not criteria.text:
+            return self.is_blank.copy()
+        if criteria.pattern is not None:
+            result = np.zeros(len(self), dtype=bool)
+            result[self.is_text] = [criteria.pattern.fullmatch(v) is not None for v in self.values[self.is_text]]
+            return result
+        result = self.is_text & (self.text == criteria.text)
+        if criteria.text in ('true', 'false'):
+            result |= self.is_bool & (self.values == (criteria.text == 'true'))
+        if criteria.number is not None:
+            result |= self.is_number & (self.numbers == criteria.number)
+        return result
+
+
+def range_columns(data, sheet, range_text):
+    """The Columns of a rectangular range like 'A2:C9', or None if it isn't one."""
+    start_cell, _, end_cell = range_text.partition(':')
+    start, end = cell_position(start_cell), cell_position(end_cell or start_cell)
+    if start is None or end is None:
+        return None
+    (start_row, start_col), (end_row, end_col) = start, end
+    cells = data.get(sheet, {})
+    columns = []
+    for col in range(start_col, end_col + 1):
+        letter = column_letter(col)
+        if isinstance(cells, IndexedCells):
+            column = cells.derived(
+                ('column', letter, start_row, end_row),
+                lambda sheet_cells: Column.from_cells(sheet_cells, letter, start_row, end_row),
+            )
+        else:
+            column = Column.from_cells(cells, letter, start_row, end_row)
+        columns.append(column)
+    return columns
+
+
+def criteria_mask(blocks, predicates):
+    """
+    Combine one mask per (columns, Criteria) block with `&`.
+
+    Returns a (rows, columns) mask, or None when the blocks differ in shape (#VALUE!).
+    """
+    mask = None
+    for columns, criteria in zip(blocks, predicates):
+        if not columns:
+            return None
+        block = np.column_stack([column.mask(criteria) for column in columns])
+        if mask is None:
+            mask = block
+        elif block.shape != mask.shape:
+            return None
+        else:
+            mask &= block
+    return mask
+
+
+def aggregate(columns, mask, how):
+    """Aggregate the numeric values of `columns` where `mask` is set ('sum', 'average', 'max')."""
+    if columns is None or mask is None or len(columns) != mask.shape[1] or len(columns[0]) != mask.shape[0]:
+        return "#VALUE!"
+    selected = np.column_stack([column.is_number for column in columns]) & mask
+    values = np.column_stack([column.numbers for column in columns])[selected]
+    if how == 'max':
+        result = values.max() if values.size else 0
+    elif how == 'average':
+        result = values.mean() if values.size else 0
+    else:
+        result = values.sum()
+    has_floats = (np.column_stack([column.is_float for column in columns]) & selected).any()
+    if how != 'average' and not has_floats:
+        # Aggregates of whole numbers stay ints, as the scalar helpers return
+        return int(result)
+    return float(result)
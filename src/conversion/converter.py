@@ -1,19 +1,140 @@
 import re
 import json
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterable, List, Optional, Tuple
 from dataclasses import dataclass
 import time
 import logging
 from tqdm import tqdm
 import antlr4
+from antlr4.error.Errors import ParseCancellationException
+from antlr4.error.ErrorStrategy import BailErrorStrategy
 from src.antlr_files.ExcelFormulaLexer import ExcelFormulaLexer
 from src.antlr_files.ExcelFormulaParser import ExcelFormulaParser
 from src.antlr_files.FormulaConverterVisitor import FormulaConverterVisitor
+from .dependencies import link_ranges
+from .graph import DependencyGraph
 from .rules_generator import generate_python_rules_file
 import networkx as nx
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(message)s')
 
+# A1-style cell reference outside of string literals and sheet names. Tokens followed by
+# '(' are function names and tokens followed by '!' are sheet names, so neither is a cell.
+_CELL_REF_RE = re.compile(r"(?<![A-Za-z0-9_.$])(\$?)([A-Z]+)(\$?)([0-9]+)(?![A-Za-z0-9_.(!])")
+# String literals and quoted sheet names are copied verbatim when normalizing
+_LITERAL_RE = re.compile(r'("[^"]*"|\'[^\']*\')')
+
+
+def _col_to_num(col: str) -> int:
+    n = 0
+    for c in col:
+        n = n * 26 + (ord(c) - ord('A') + 1)
+    return n
+
+
+def _parse_anchor(cell: str) -> Optional[tuple]:
+    """Parse a cell coordinate like 'C12' into (row, col), or None if it is not one."""
+    match = _CELL_REF_RE.fullmatch(cell.replace('$', ''))
+    if not match:
+        return None
+    return int(match.group(4)), _col_to_num(match.group(2))
+
+
+def to_relative_r1c1(formula_body: str, row: int, col: int) -> str:
+    """Rewrite the A1 references of a formula into R1C1 notation relative to (row, col).
+
+    Copy-down formulas such as '$B2/SUM($B$2:$B$9)' in C2 and '$B3/SUM($B$2:$B$9)' in C3
+    both normalize to 'R[0]C2/SUM(R2C2:R9C2)'; relative parts are written as R[n] and C[n].
+    """
+    def relative(match):
+        col_abs, col_letters, row_abs, row_digits = match.groups()
+        r, c = int(row_digits), _col_to_num(col_letters)
+        row_part = f"R{r}" if row_abs else f"R[{r - row}]"
+        col_part = f"C{c}" if col_abs else f"C[{c - col}]"
+        return row_part + col_part
+
+    parts = _LITERAL_RE.split(formula_body)
+    # split() with a capture group puts literals at odd indexes
+    return ''.join(part if i % 2 else _CELL_REF_RE.sub(relative, part) for i, part in enumerate(parts))
+
+
+def _parse_formula(formula_body: str):
+    """Lex and parse a formula body (without leading '='), returning the parse tree."""
+    input_stream = antlr4.InputStream(formula_body)
+
+    lexer = ExcelFormulaLexer(input_stream)
+    stream = antlr4.CommonTokenStream(lexer)
+    parser = ExcelFormulaParser(stream)
+
+    parser.removeErrorListeners()
+    parser._errHandler = BailErrorStrategy()
+    return parser.formula()
+
+
+class FormulaParseCache:
+    """Caches ANTLR parse trees by relative (R1C1) formula shape.
+
+    Each distinct shape is parsed once; other cells with the same shape reuse the tree
+    and the visitor shifts relative references by the offset from the cached anchor.
+    """
+
+    def __init__(self):
+        self._trees = {}
+        # Shapes parsed by worker processes (see `merge`), which keep the trees themselves
+        self._worker_shapes = set()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, formula_body: str, cell: str):
+        """Return (tree, (row_offset, col_offset)) for a formula placed in `cell`.
+
+        Returns a tree of None if the formula does not parse.
+        """
+        anchor = _parse_anchor(cell)
+        if anchor is None:
+            self.misses += 1
+            return self._parse(formula_body), (0, 0)
+
+        row, col = anchor
+        shape = to_relative_r1c1(formula_body, row, col)
+        cached = self._trees.get(shape)
+        if cached is not None:
+            self.hits += 1
+            tree, anchor_row, anchor_col = cached
+            return tree, (row - anchor_row, col - anchor_col)
+
+        self.misses += 1
+        tree = self._parse(formula_body)
+        self._trees[shape] = (tree, row, col)
+        return tree, (0, 0)
+
+    def _parse(self, formula_body: str):
+        try:
+            return _parse_formula(formula_body)
+        except ParseCancellationException:
+            return None
+
+    def shapes(self) -> List[str]:
+        """Formula shapes parsed here, in the order they were first seen."""
+        return list(self._trees)
+
+    def merge(self, hits: int, misses: int, shapes: Iterable[str]) -> None:
+        """Add the counts and shapes of a worker process's cache to this one."""
+        self.hits += hits
+        self.misses += misses
+        self._worker_shapes.update(shapes)
+
+    def stats(self) -> Dict[str, int]:
+        """Report hit/miss counts and the number of distinct formula shapes parsed."""
+        shapes = len(self._trees.keys() | self._worker_shapes) if self._worker_shapes else len(self._trees)
+        return {"hits": self.hits, "misses": self.misses, "shapes": shapes}
+
+    def clear(self):
+        self._trees.clear()
+        self._worker_shapes.clear()
+        self.hits = 0
+        self.misses = 0
+
 
 @dataclass
 class ConvertedFormula:
@@ -22,12 +143,20 @@ class ConvertedFormula:
     python_expression: str
     cell_reference: str
     sheet: str
-    dependencies: nx.DiGraph
+    dependencies: List[Tuple[str, str]]  # (dependency, dependent) edges
     description: str
     rule_type: str
     input_keys: List[str]
     unresolved_inputs: List[str]
 
+    @property
+    def node_id(self) -> str:
+        return f"{self.sheet}!{self.cell_reference}"
+
+    def dependency_nodes(self) -> List[str]:
+        """Nodes (cells, semantic keys, ranges) this formula reads."""
+        return [source for source, target in self.dependencies if target == self.node_id]
+
 
 class ExcelToPythonConverter:
     """Fixed converter for Excel formulas to Python expressions."""
@@ -35,6 +164,7 @@ class ExcelToPythonConverter:
     def __init__(self, data: Dict[str, Any]):
         self.data = data
         self.converted_cells = set()
+        self.parse_cache = FormulaParseCache()
 
     def convert_expression(
         self,
@@ -96,56 +226,25 @@ class ExcelToPythonConverter:
         original = formula
 
         formula_body = formula[1:] if formula.startswith('=') else formula
-        input_stream = antlr4.InputStream(formula_body)
-
-        lexer = ExcelFormulaLexer(input_stream)
-        stream = antlr4.CommonTokenStream(lexer)
-        parser = ExcelFormulaParser(stream)
-
-        parser.removeErrorListeners()
-        from antlr4.error.Errors import ParseCancellationException
-        from antlr4.error.ErrorStrategy import BailErrorStrategy
-        parser._errHandler = BailErrorStrategy()
-        try:
-            tree = parser.formula()
-        except ParseCancellationException as e:
-            raise Exception(f"Invalid formula: {formula}") from e
+        tree, offset = self.parse_cache.get(formula_body, cell)
+        if tree is None:
+            raise Exception(f"Invalid formula: {formula}")
 
-        visitor = FormulaConverterVisitor(self.data, shared_data, sheet)
+        visitor = FormulaConverterVisitor(self.data, shared_data, sheet, offset)
         python_expression = visitor.visit(tree)
 
-        # Build dependencies list (expand ranges) and map to keys where possible
-        dependencies = visitor.dependencies
-        dep_list = []
-        for dep in dependencies:
-            if ':' in dep:
-                sheet_name, cells = dep.split('!')
-                start, end = cells.split(':')
-                # Expand range into individual cells
-                col_start = ''.join(filter(str.isalpha, start))
-                row_start = int(''.join(filter(str.isdigit, start)))
-                col_end = ''.join(filter(str.isalpha, end))
-                row_end = int(''.join(filter(str.isdigit, end)))
-
-                for col in range(ord(col_start), ord(col_end) + 1):
-                    for row in range(row_start, row_end + 1):
-                        dep_list.append(f"{sheet_name}!{chr(col)}{row}")
-            else:
-                dep_list.append(dep)
-
-        seen = set()
-        unique_deps = [x for x in dep_list if not (x in seen or seen.add(x))]
-
-        # Map to semantic keys where possible
+        # Ranges stay single range nodes (see dependencies.py); cells map to keys where possible
         cell_to_key_map = shared_data.get('cell_to_key_map', {})
-        mapped_deps = [self._map_dep_to_key(d, cell_to_key_map) for d in unique_deps]
+        mapped_deps = [dep if ':' in dep else self._map_dep_to_key(dep, cell_to_key_map)
+                       for dep in sorted(visitor.dependencies)]
 
-        # Build graph with mapped dependencies
-        deps_graph = nx.DiGraph()
+        # Dependency edges; build_dependency_graph merges them into one graph
         node_id = f"{sheet}!{cell}"
-        deps_graph.add_node(node_id)
-        for dep in mapped_deps:
-            deps_graph.add_edge(dep, node_id)
+        dependency_edges = [(dep, node_id) for dep in mapped_deps]
+        # Formulas that read this cell through its semantic key depend on it as well
+        own_key = cell_to_key_map.get(sheet, {}).get(cell)
+        if own_key:
+            dependency_edges.append((node_id, f"{sheet}:{own_key}"))
 
         rule_type = self.classify_formula(formula)
         description = self.generate_description(formula, rule_type)
@@ -158,7 +257,7 @@ class ExcelToPythonConverter:
             python_expression=python_expression,
             cell_reference=cell,
             sheet=sheet,
-            dependencies=deps_graph,
+            dependencies=dependency_edges,
             description=description,
             rule_type=rule_type,
             input_keys=input_keys,
@@ -169,9 +268,7 @@ class ExcelToPythonConverter:
         """Generate a complete Python function from converted formula."""
         func_name = f"rule_{converted.sheet.lower()}_{converted.cell_reference.lower()}"
 
-        node_id = f"{converted.sheet}!{converted.cell_reference}"
-        deps = list(converted.dependencies.predecessors(node_id))
-        deps_str = ", ".join(deps)
+        deps_str = ", ".join(converted.dependency_nodes())
         inputs_str = ", ".join(converted.input_keys)
 
         function_code = f'''def {func_name}(data, shared_data):
@@ -193,17 +290,23 @@ class ExcelToPythonConverter:
         return function_code
 
 
-def build_dependency_graph(converted_formulas: List[ConvertedFormula]) -> nx.DiGraph:
-    """Builds a dependency graph from a list of converted formulas using networkx."""
-    all_graphs = [f.dependencies for f in converted_formulas]
-    return nx.compose_all(all_graphs)
-
+def build_dependency_graph(converted_formulas: List[ConvertedFormula]) -> DependencyGraph:
+    """Builds one dependency graph from the edge lists of converted formulas.
 
-def topological_sort(graph: nx.DiGraph) -> List[str]:
-    """Topologically sorts a dependency graph using networkx."""
-    try:
-        return list(nx.topological_sort(graph))
-    except nx.NetworkXUnfeasible:
-        raise ValueError("Circular dependency detected!")
+    Ranges are single nodes; each cell node gets an edge to the ranges that contain it.
+    """
+    graph = DependencyGraph()
+    for converted in converted_formulas:
+        graph.add_node(converted.node_id)
+        graph.add_edges_from(converted.dependencies)
+    link_ranges(graph)
+    return graph
+
+
+def topological_sort(graph) -> List[str]:
+    """Topologically sorts a DependencyGraph (or a networkx DiGraph)."""
+    if isinstance(graph, nx.DiGraph):
+        graph = DependencyGraph.from_networkx(graph)
+    return graph.topological_sort()
 
 
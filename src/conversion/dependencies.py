@@ -0,0 +1,124 @@
+"""
+Range nodes in the formula dependency graph.
+
+A formula that reads a range depends on a single range node ("Sheet!B2:B9000") rather
+than on one node per cell, so the graph grows with the number of distinct references
+instead of the area they cover. `RangeContainment` answers "which range nodes contain
+cell X" with interval trees: one over the column spans of a sheet's ranges, and for each
+span one over the row intervals of the ranges sharing it. `link_ranges` uses it to add
+an edge from every cell node of a graph to the ranges that contain it.
+"""
+
+from typing import Any, Iterable, List, Optional, Tuple
+
+from .graph import DependencyGraph
+from .indexes import cell_position
+
+
+def parse_cell_node(node: str) -> Optional[Tuple[str, int, int]]:
+    """(sheet, row, column) of a cell node like 'Sheet!B7', or None if it is not one."""
+    sheet, sep, ref = node.rpartition('!') if isinstance(node, str) else ('', '', '')
+    position = cell_position(ref) if sep and ':' not in ref else None
+    return (sheet, *position) if position else None
+
+
+def parse_range_node(node: str) -> Optional[Tuple[str, int, int, int, int]]:
+    """(sheet, top, left, bottom, right) of a range node like 'Sheet!B2:C9', or None."""
+    sheet, sep, ref = node.rpartition('!') if isinstance(node, str) else ('', '', '')
+    start, colon, end = ref.partition(':')
+    if not (sep and colon):
+        return None
+    first, last = cell_position(start), cell_position(end)
+    if first is None or last is None:
+        return None
+    # Excel accepts corners in any order (B9:A2 is A2:B9)
+    return (sheet, min(first[0], last[0]), min(first[1], last[1]),
+            max(first[0], last[0]), max(first[1], last[1]))
+
+
+class IntervalTree:
+    """Static centered interval tree: `stab(x)` returns the items of intervals containing x."""
+
+    def __init__(self, intervals: Iterable[Tuple[int, int, Any]]):
+        self._root = self._build(list(intervals))
+
+    @classmethod
+    def _build(cls, intervals):
+        if not intervals:
+            return None
+        endpoints = sorted(bound for low, high, _ in intervals for bound in (low, high))
+        center = endpoints[len(endpoints) // 2]
+        left, here, right = [], [], []
+        for interval in intervals:
+            if interval[1] < center:
+                left.append(interval)
+            elif interval[0] > center:
+                right.append(interval)
+            else:
+                here.append(interval)
+        # Intervals at a node all contain the center: scan by low end left of it, by high end right of it
+        by_low = sorted(here, key=lambda interval: interval[0])
+        by_high = sorted(here, key=lambda interval: -interval[1])
+        return center, by_low, by_high, cls._build(left), cls._build(right)
+
+    def stab(self, x: int) -> List[Any]:
+        found = []
+        node = self._root
+        while node is not None:
+            center, by_low, by_high, left, right = node
+            if x < center:
+                for low, _, item in by_low:
+                    if low > x:
+                        break
+                    found.append(item)
+                node = left
+            elif x > center:
+                for _, high, item in by_high:
+                    if high < x:
+                        break
+                    found.append(item)
+                node = right
+            else:
+                found.extend(item for _, _, item in by_low)
+                break
+        return found
+
+
+class RangeContainment:
+    """Index of range nodes answering which of them contain a cell node."""
+
+    def __init__(self, ranges: Iterable[str]):
+        rows_by_span = {}
+        for node in ranges:
+            parsed = parse_range_node(node)
+            if parsed is not None:
+                sheet, top, left, bottom, right = parsed
+                rows_by_span.setdefault((sheet, left, right), []).append((top, bottom, node))
+        spans_by_sheet = {}
+        for (sheet, left, right), rows in rows_by_span.items():
+            spans_by_sheet.setdefault(sheet, []).append((left, right, IntervalTree(rows)))
+        self._sheets = {sheet: IntervalTree(spans) for sheet, spans in spans_by_sheet.items()}
+
+    def __bool__(self):
+        return bool(self._sheets)
+
+    def containing(self, node: str) -> List[str]:
+        """Range nodes containing a cell node ('Sheet!B7'); [] for any other node."""
+        parsed = parse_cell_node(node)
+        if parsed is None or parsed[0] not in self._sheets:
+            return []
+        sheet, row, col = parsed
+        return [item for rows in self._sheets[sheet].stab(col) for item in rows.stab(row)]
+
+
+def link_ranges(graph: DependencyGraph) -> RangeContainment:
+    """
+    Add an edge from each cell node of `graph` to every range node containing it, so a
+    formula reading a range is ordered after the formulas inside it. Returns the index.
+    """
+    containment = RangeContainment(node for node in graph if parse_range_node(node))
+    if containment:
+        for node in list(graph):
+            for range_node in containment.containing(node):
+                graph.add_edge(node, range_node)
+    return containment
@@ -4,10 +4,16 @@ These functions provide Python implementations of Excel operations.
 """
 
 import math
+import operator
 import re
+from functools import lru_cache
 from datetime import datetime, timedelta
 from calendar import monthrange
 
+from . import columnar
+from .indexes import column_letter
+from .sheet_store import IndexedCells
+
 
 def get_cell(data, sheet, cell):
     """Get cell value from data structure"""
@@ -53,53 +59,76 @@ def average_keys(data, sheet, keys):
 
 
 def count_if_keys(data, sheet, keys, criteria):
+    matches = compile_criteria(criteria).test
     cnt = 0
     for v in _iter_key_values(data, sheet, keys):
-        if evaluate_criteria(v, criteria):
+        if matches(v):
             cnt += 1
     return cnt
 
 
 def sum_if_keys(data, sheet, keys, criteria):
+    matches = compile_criteria(criteria).test
     total = 0
     for v in _iter_key_values(data, sheet, keys):
-        if evaluate_criteria(v, criteria) and isinstance(v, (int, float)):
+        if matches(v) and isinstance(v, (int, float)):
             total += v
     return total
 
 
+def _key_blocks(data, sheet, keys_lists):
+    # Key lists are aligned by position; the shortest list bounds the rows
+    length = min(len(keys) for keys in keys_lists)
+    return [[columnar.Column([get_value(data, sheet, key, None) for key in keys[:length]])] for keys in keys_lists]
+
+
 def countifs_keys(data, sheet, keys_lists, criteria_list):
     """COUNTIFS over key-mapped ranges.
     - keys_lists: list of lists of keys (one list per criteria range), all aligned order-wise
     - criteria_list: list of criteria expressions corresponding to keys_lists
-    We evaluate each "row" (i.e., same position across lists) and count when all criteria match.
+    Each criterion becomes a mask over its column of key values; rows matching all are counted.
     """
     if not keys_lists or not criteria_list:
         return 0
-    # Ensure all lists have comparable length; use the shortest to avoid IndexErrors
-    length = min(len(lst) for lst in keys_lists)
-    count = 0
-    for i in range(length):
-        all_match = True
-        for lst, crit in zip(keys_lists, criteria_list):
-            v = get_value(data, sheet, lst[i])
-            if not evaluate_criteria(v, crit):
-                all_match = False
-                break
-        if all_match:
-            count += 1
-    return count
+    predicates = [compile_criteria(criteria) for criteria in criteria_list]
+    return int(columnar.criteria_mask(_key_blocks(data, sheet, keys_lists), predicates).sum())
+
+
+def _aggregate_ifs_keys(data, sheet, value_keys, keys_lists, criteria_list, how):
+    if not keys_lists or not criteria_list:
+        return 0
+    values, *blocks = _key_blocks(data, sheet, [value_keys] + list(keys_lists))
+    predicates = [compile_criteria(criteria) for criteria in criteria_list]
+    return columnar.aggregate(values, columnar.criteria_mask(blocks, predicates), how)
+
+
+def sumifs_keys(data, sheet, sum_keys, keys_lists, criteria_list):
+    """SUMIFS over key-mapped ranges (see countifs_keys)."""
+    return _aggregate_ifs_keys(data, sheet, sum_keys, keys_lists, criteria_list, 'sum')
+
+
+def averageifs_keys(data, sheet, average_keys, keys_lists, criteria_list):
+    """AVERAGEIFS over key-mapped ranges (see countifs_keys)."""
+    return _aggregate_ifs_keys(data, sheet, average_keys, keys_lists, criteria_list, 'average')
+
+
+def maxifs_keys(data, sheet, max_keys, keys_lists, criteria_list):
+    """MAXIFS over key-mapped ranges (see countifs_keys)."""
+    return _aggregate_ifs_keys(data, sheet, max_keys, keys_lists, criteria_list, 'max')
 
 
 def sum_range(data, sheet, start_cell, end_cell):
     """Sum a range of cells"""
+    sheet_data = data.get(sheet)
+    if isinstance(sheet_data, IndexedCells):
+        return sheet_data.range_stats(start_cell, end_cell).total
     values = []
     start_col, start_row = parse_cell_ref(start_cell)
     end_col, end_row = parse_cell_ref(end_cell)
     
     for row in range(start_row, end_row + 1):
         for col in range(start_col, end_col + 1):
-            cell_ref = f"{chr(ord('A') + col - 1)}{row}"
+            cell_ref = f"{column_letter(col)}{row}"
             try:
                 value = data[sheet][cell_ref]
                 if isinstance(value, (int, float)):
@@ -111,13 +140,16 @@ def sum_range(data, sheet, start_cell, end_cell):
 
 def count_range(data, sheet, start_cell, end_cell):
     """Count non-empty cells in a range"""
+    sheet_data = data.get(sheet)
+    if isinstance(sheet_data, IndexedCells):
+        return sheet_data.range_stats(start_cell, end_cell).nonempty
     count = 0
     start_col, start_row = parse_cell_ref(start_cell)
     end_col, end_row = parse_cell_ref(end_cell)
     
     for row in range(start_row, end_row + 1):
         for col in range(start_col, end_col + 1):
-            cell_ref = f"{chr(ord('A') + col - 1)}{row}"
+            cell_ref = f"{column_letter(col)}{row}"
             try:
                 value = data[sheet][cell_ref]
                 if value is not None and value != "":
@@ -129,13 +161,17 @@ def count_range(data, sheet, start_cell, end_cell):
 
 def average_range(data, sheet, start_cell, end_cell):
     """Calculate average of a range"""
+    sheet_data = data.get(sheet)
+    if isinstance(sheet_data, IndexedCells):
+        stats = sheet_data.range_stats(start_cell, end_cell)
+        return stats.total / stats.numeric if stats.numeric else 0
     values = []
     start_col, start_row = parse_cell_ref(start_cell)
     end_col, end_row = parse_cell_ref(end_cell)
     
     for row in range(start_row, end_row + 1):
         for col in range(start_col, end_col + 1):
-            cell_ref = f"{chr(ord('A') + col - 1)}{row}"
+            cell_ref = f"{column_letter(col)}{row}"
             try:
                 value = data[sheet][cell_ref]
                 if isinstance(value, (int, float)):
@@ -147,19 +183,18 @@ def average_range(data, sheet, start_cell, end_cell):
 
 def count_if_range(data, sheet, start_cell, end_cell, criteria):
     """Count cells meeting criteria"""
+    matches = compile_criteria(criteria).test
+    cells = data.get(sheet, {})
     count = 0
     start_col, start_row = parse_cell_ref(start_cell)
     end_col, end_row = parse_cell_ref(end_cell)
-    
+    letters = [column_letter(col) for col in range(start_col, end_col + 1)]
+
     for row in range(start_row, end_row + 1):
-        for col in range(start_col, end_col + 1):
-            cell_ref = f"{chr(ord('A') + col - 1)}{row}"
-            try:
-                value = data[sheet][cell_ref]
-                if evaluate_criteria(value, criteria):
-                    count += 1
-            except KeyError:
-                continue
+        for letter in letters:
+            # Missing cells are blank
+            if matches(cells.get(f"{letter}{row}")):
+                count += 1
     return count
 
 
@@ -170,19 +205,20 @@ def count_if(data, sheet, start_cell, end_cell, criteria):
 
 def sum_if(data, sheet, start_cell, end_cell, criteria):
     """Sum cells meeting criteria"""
+    matches = compile_criteria(criteria).test
+    cells = data.get(sheet, {})
     total = 0
     start_col, start_row = parse_cell_ref(start_cell)
     end_col, end_row = parse_cell_ref(end_cell)
-    
+    letters = [column_letter(col) for col in range(start_col, end_col + 1)]
+
     for row in range(start_row, end_row + 1):
-        for col in range(start_col, end_col + 1):
-            cell_ref = f"{chr(ord('A') + col - 1)}{row}"
-            try:
-                value = data[sheet][cell_ref]
-                if evaluate_criteria(value, criteria):
+        for letter in letters:
+            cell_ref = f"{letter}{row}"
+            if cell_ref in cells:
+                value = cells[cell_ref]
+                if matches(value):
                     total += value if isinstance(value, (int, float)) else 0
-            except KeyError:
-                continue
     return total
 
 
@@ -242,45 +278,74 @@ def right_text(text, num_chars):
 
 # Complex functions that should be identified for user replacement
 
-def vlookup(lookup_value, data, sheet, range_text, col_index, exact_match=True):
-    """VLOOKUP implementation"""
-    start_cell, end_cell = range_text.split(':')
-    start_col, start_row = parse_cell_ref(start_cell)
-    end_col, end_row = parse_cell_ref(end_cell)
-
-    lookup_col_str = chr(ord('A') + start_col - 1)
-
+def _vlookup_scan(cells, lookup_value, lookup_col_str, return_col_str, start_row, end_row, exact_match):
     for row in range(start_row, end_row + 1):
         cell_ref = f"{lookup_col_str}{row}"
         try:
-            cell_value = data[sheet][cell_ref]
+            cell_value = cells[cell_ref]
             if (exact_match and cell_value == lookup_value) or \
                (not exact_match and cell_value >= lookup_value):
-                
-                return_col_str = chr(ord('A') + start_col + col_index - 2)
-                return_cell_ref = f"{return_col_str}{row}"
-                return data[sheet][return_cell_ref]
-        except KeyError:
+                return cells[f"{return_col_str}{row}"]
+        except (KeyError, TypeError):
+            # Missing cells and values that don't compare with the lookup value are skipped
             continue
-    
     return "#N/A"
 
 
+def vlookup(lookup_value, data, sheet, range_text, col_index, exact_match=True):
+    """VLOOKUP implementation
+
+    Exact match returns the first row equal to the lookup value; approximate match the
+    first row whose value is >= the lookup value. On an indexed sheet the lookup column is
+    indexed once and shared by every VLOOKUP into the same table.
+    """
+    start_cell, end_cell = range_text.split(':')
+    start_col, start_row = parse_cell_ref(start_cell)
+    end_col, end_row = parse_cell_ref(end_cell)
+
+    lookup_col_str = column_letter(start_col)
+    return_col_str = column_letter(start_col + col_index - 1)
+    try:
+        cells = data[sheet]
+    except KeyError:
+        return "#N/A"
+
+    if isinstance(cells, IndexedCells):
+        lookup_index = cells.lookup_index(lookup_col_str, start_row, end_row)
+        if lookup_index is not None:
+            if exact_match:
+                for row in lookup_index.exact_rows(lookup_value):
+                    return_cell_ref = f"{return_col_str}{row}"
+                    if return_cell_ref in cells:
+                        return cells[return_cell_ref]
+                return "#N/A"
+            row = lookup_index.first_row_at_least(lookup_value)
+            if row is None:
+                return "#N/A"
+            return_cell_ref = f"{return_col_str}{row}"
+            if return_cell_ref in cells:
+                return cells[return_cell_ref]
+            # Rare: no value to return on that row; continue the scan past it
+            return _vlookup_scan(cells, lookup_value, lookup_col_str, return_col_str,
+                                 row + 1, end_row, exact_match)
+
+    return _vlookup_scan(cells, lookup_value, lookup_col_str, return_col_str, start_row, end_row, exact_match)
+
+
 def index(data, sheet, range_text, row, col=1):
-    """INDEX implementation"""
+    """INDEX implementation; a missing cell inside the range is blank (None)"""
     start_cell, end_cell = range_text.split(':')
     start_col, start_row = parse_cell_ref(start_cell)
+    end_col, end_row = parse_cell_ref(end_cell)
     
     target_col = start_col + col - 1
     target_row = start_row + row - 1
-
-    target_cell_ref = f"{chr(ord('A') + target_col - 1)}{target_row}"
-
-    try:
-        return data[sheet][target_cell_ref]
-    except KeyError:
+    if not (start_col <= target_col <= end_col and start_row <= target_row <= end_row) or sheet not in data:
         return "#REF!"
 
+    target_cell_ref = f"{column_letter(target_col)}{target_row}"
+    return data[sheet].get(target_cell_ref)
+
 
 def indirect(data, ref):
     """INDIRECT implementation"""
@@ -295,34 +360,41 @@ def indirect(data, ref):
             return "#REF!"
 
 
+def _ifs_mask(data, ranges_criteria):
+    blocks = [columnar.range_columns(data, sheet, cells) for sheet, cells, _ in ranges_criteria]
+    predicates = [compile_criteria(criteria) for _, _, criteria in ranges_criteria]
+    return columnar.criteria_mask(blocks, predicates)
+
+
 def countifs(data, ranges_criteria):
-    """COUNTIFS implementation"""
-    # Get the dimensions of the first range to determine the number of rows to check
-    first_range_sheet, first_range_cells = ranges_criteria[0]
-    start_cell, end_cell = first_range_cells.split(':')
-    start_col, start_row = parse_cell_ref(start_cell)
-    end_col, end_row = parse_cell_ref(end_cell)
+    """COUNTIFS implementation
+
+    ranges_criteria is a list of (sheet, 'A2:A9', criteria). Each criteria range becomes a
+    boolean mask over its (columnar) values and the masks are combined; ranges must have
+    the same shape. Missing cells are treated as blank.
+    """
+    mask = _ifs_mask(data, ranges_criteria)
+    if mask is None:
+        return "#VALUE!"
+    return int(mask.sum())
+
+
+def sumifs(data, value_range, ranges_criteria):
+    """SUMIFS implementation; value_range is the (sheet, 'C2:C9') range to sum."""
+    sheet, cells = value_range
+    return columnar.aggregate(columnar.range_columns(data, sheet, cells), _ifs_mask(data, ranges_criteria), 'sum')
+
+
+def averageifs(data, value_range, ranges_criteria):
+    """AVERAGEIFS implementation; 0 when no numeric cell matches, like average_range."""
+    sheet, cells = value_range
+    return columnar.aggregate(columnar.range_columns(data, sheet, cells), _ifs_mask(data, ranges_criteria), 'average')
 
-    count = 0
-    for row in range(start_row, end_row + 1):
-        all_criteria_met = True
-        for sheet, cells, criteria in ranges_criteria:
-            
-            col, _ = parse_cell_ref(cells.split(':')[0])
-            cell_ref = f"{chr(ord('A') + col - 1)}{row}"
-            try:
-                value = data[sheet][cell_ref]
-                if not evaluate_criteria(value, criteria):
-                    all_criteria_met = False
-                    break
-            except KeyError:
-                all_criteria_met = False
-                break
-        
-        if all_criteria_met:
-            count += 1
-            
-    return count
+
+def maxifs(data, value_range, ranges_criteria):
+    """MAXIFS implementation; 0 when no numeric cell matches, as in Excel."""
+    sheet, cells = value_range
+    return columnar.aggregate(columnar.range_columns(data, sheet, cells), _ifs_mask(data, ranges_criteria), 'max')
 
 
 def eomonth(start_date, months):
@@ -382,25 +454,126 @@ def parse_cell_ref(cell_ref):
     return 1, 1
 
 
+def _as_number(value):
+    """Numeric value of a cell for criteria comparisons; booleans and text are not numbers."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value
+    return None
+
+
+def _wildcard_pattern(text):
+    """Regex for an Excel wildcard pattern (* and ?, escaped with ~), or None for plain text."""
+    parts = []
+    has_wildcard = False
+    i = 0
+    while i < len(text):
+        char = text[i]
+        if char == '~' and i + 1 < len(text) and text[i + 1] in '*?~':
+            # An escaped character still needs the pattern to unescape it
+            has_wildcard = True
+            parts.append(re.escape(text[i + 1]))
+            i += 2
+            continue
+        if char in '*?':
+            has_wildcard = True
+            parts.append('.*' if char == '*' else '.')
+        else:
+            parts.append(re.escape(char))
+        i += 1
+    return re.compile(''.join(parts), re.IGNORECASE | re.DOTALL) if has_wildcard else None
+
+
+class Criteria:
+    """
+    A COUNTIF/SUMIF criteria compiled once into a predicate: `Criteria(">=10")(value)`.
+
+    Supports the comparison prefixes >=, <=, <>, >, <, =, wildcards (* and ?, ~ escapes)
+    and plain equality, which is case-insensitive for text and numeric for numbers.
+    Relational comparisons only match values of the operand's kind (numbers against a
+    numeric operand, text against a text operand). `test` is the specialized predicate
+    function; hot loops can call it directly.
+    """
+
+    __slots__ = ('operator', 'number', 'text', 'pattern', 'test')
+
+    _OPERATORS = ('>=', '<=', '<>', '>', '<', '=')
+    _RELATIONS = {'>=': operator.ge, '<=': operator.le, '>': operator.gt, '<': operator.lt}
+
+    def __init__(self, criteria):
+        self.operator = '='
+        self.pattern = None
+        if isinstance(criteria, str):
+            criteria = criteria.strip('"')
+            for prefix in self._OPERATORS:
+                if criteria.startswith(prefix):
+                    self.operator = prefix
+                    criteria = criteria[len(prefix):]
+                    break
+            try:
+                self.number = float(criteria) if criteria.strip() else None
+            except ValueError:
+                self.number = None
+            self.text = criteria.lower()
+            if self.operator in ('=', '<>') and self.number is None:
+                self.pattern = _wildcard_pattern(criteria)
+        else:
+            self.number = _as_number(criteria)
+            self.text = None if criteria is None else str(criteria).lower()
+        self.test = self._build()
+
+    def _build(self):
+        number, text, pattern = self.number, self.text, self.pattern
+        if self.operator in ('=', '<>'):
+            if not text:
+                def equals(value):
+                    return value is None or value == ''
+            elif pattern is not None:
+                def equals(value):
+                    return isinstance(value, str) and pattern.fullmatch(value) is not None
+            else:
+                def equals(value):
+                    if isinstance(value, str):
+                        return value.lower() == text
+                    if isinstance(value, bool):
+                        return str(value).lower() == text
+                    return isinstance(value, (int, float)) and value == number
+            if self.operator == '=':
+                return equals
+            return lambda value: not equals(value)
+
+        relation = self._RELATIONS[self.operator]
+        if number is not None:
+            def compare(value):
+                return isinstance(value, (int, float)) and not isinstance(value, bool) and relation(value, number)
+        else:
+            def compare(value):
+                return isinstance(value, str) and relation(value.lower(), text)
+        return compare
+
+    def __call__(self, value):
+        return self.test(value)
+
+    def __repr__(self):
+        return f"Criteria({self.operator}{self.text!r})"
+
+
+@lru_cache(maxsize=4096, typed=True)
+def _compile_cached(criteria):
+    return Criteria(criteria)
+
+
+def compile_criteria(criteria):
+    """Return the compiled `Criteria` for a criteria value, cached by value."""
+    try:
+        return _compile_cached(criteria)
+    except TypeError:
+        # Unhashable criteria (not produced by the converter) are compiled uncached
+        return Criteria(criteria)
+
+
 def evaluate_criteria(value, criteria):
     """Evaluate criteria string like '>10' against value"""
-    criteria = criteria.strip('"')
-    if criteria.startswith('>='):
-        return value >= float(criteria[2:])
-    elif criteria.startswith('<='):
-        return value <= float(criteria[2:])
-    elif criteria.startswith('>'):
-        return value > float(criteria[1:])
-    elif criteria.startswith('<'):
-        return value < float(criteria[1:])
-    elif criteria.startswith('='):
-        return value == criteria[1:]
-    else:
-        # strip case
-        if isinstance(value, str) and isinstance(criteria, str):
-            return value.lower() == criteria.lower()
-        else:
-            return value == criteria
+    return compile_criteria(criteria)(value)
 
 
 def rows_count_keys(keys):
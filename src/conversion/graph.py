@@ -0,0 +1,223 @@
+"""
+Integer-indexed dependency graph.
+
+Node ids ("Sheet!A1", "Sheet:Key", "Sheet!B2:B9") are interned to consecutive integers
+and edges are appended to two flat integer arrays. The first query freezes the edges
+into CSR form: duplicate edges are dropped and successor and predecessor lists become
+slices of one NumPy array each. Adding edges afterwards simply unfreezes the graph.
+`to_networkx` exports the graph for analysis.
+"""
+
+from array import array
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Set, Tuple
+
+import networkx as nx
+import numpy as np
+
+
+class DependencyGraph:
+    """Directed graph of dependency edges (dependency -> dependent) over interned node ids."""
+
+    def __init__(self, edges: Iterable[Tuple[str, str]] = ()):
+        self._ids: Dict[str, int] = {}
+        self._nodes: List[str] = []
+        self._sources = array('q')
+        self._targets = array('q')
+        self._csr = None
+        self.add_edges_from(edges)
+
+    @classmethod
+    def from_networkx(cls, graph: nx.DiGraph) -> 'DependencyGraph':
+        dependency_graph = cls()
+        for node in graph:
+            dependency_graph.add_node(node)
+        dependency_graph.add_edges_from(graph.edges)
+        return dependency_graph
+
+    def copy(self) -> 'DependencyGraph':
+        graph = DependencyGraph()
+        graph._ids = dict(self._ids)
+        graph._nodes = list(self._nodes)
+        graph._sources = array('q', self._sources)
+        graph._targets = array('q', self._targets)
+        graph._csr = self._csr
+        return graph
+
+    # --- building ---
+    def add_node(self, node: str) -> int:
+        """Intern `node` and return its integer id."""
+        node_id = self._ids.get(node)
+        if node_id is None:
+            node_id = self._ids[node] = len(self._nodes)
+            self._nodes.append(node)
+            self._csr = None
+        return node_id
+
+    def add_edge(self, source: str, target: str) -> None:
+        self._sources.append(self.add_node(source))
+        self._targets.append(self.add_node(target))
+        self._csr = None
+
+    def add_edges_from(self, edges: Iterable[Tuple[str, str]]) -> None:
+        for source, target in edges:
+            self.add_edge(source, target)
+
+    # --- CSR form ---
+    def _frozen(self):
+        if self._csr is None:
+            count = len(self._nodes)
+            sources = np.array(self._sources, dtype=np.int64)
+            targets = np.array(self._targets, dtype=np.int64)
+            if count:
+                # Sorted unique (source, target) keys: deduplicated and grouped by source
+                sources, targets = np.divmod(np.unique(sources * count + targets), count)
+            self._sources, self._targets = array('q', sources.tolist()), array('q', targets.tolist())
+            by_target = np.argsort(targets, kind='stable')
+            self._csr = (
+                self._offsets(sources, count), targets,
+                self._offsets(targets, count), sources[by_target],
+            )
+        return self._csr
+
+    @staticmethod
+    def _offsets(ids, count):
+        offsets = np.zeros(count + 1, dtype=np.int64)
+        np.cumsum(np.bincount(ids, minlength=count), out=offsets[1:])
+        return offsets
+
+    def successor_ids(self, node_id: int) -> np.ndarray:
+        offsets, targets, _, _ = self._frozen()
+        return targets[offsets[node_id]:offsets[node_id + 1]]
+
+    def predecessor_ids(self, node_id: int) -> np.ndarray:
+        _, _, offsets, sources = self._frozen()
+        return sources[offsets[node_id]:offsets[node_id + 1]]
+
+    # --- queries ---
+    def __contains__(self, node) -> bool:
+        return node in self._ids
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._nodes)
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def index(self, node: str) -> int:
+        return self._ids[node]
+
+    def node(self, node_id: int) -> str:
+        return self._nodes[node_id]
+
+    def number_of_nodes(self) -> int:
+        return len(self._nodes)
+
+    def number_of_edges(self) -> int:
+        return len(self._frozen()[1])
+
+    def edges(self) -> Iterator[Tuple[str, str]]:
+        self._frozen()
+        nodes = self._nodes
+        return ((nodes[s], nodes[t]) for s, t in zip(self._sources, self._targets))
+
+    def successors(self, node: str) -> List[str]:
+        return [self._nodes[i] for i in self.successor_ids(self._ids[node]).tolist()]
+
+    def predecessors(self, node: str) -> List[str]:
+        return [self._nodes[i] for i in self.predecessor_ids(self._ids[node]).tolist()]
+
+    def ancestors(self, node: str) -> Set[str]:
+        """Nodes with a path to `node`, excluding `node` itself unless it is on a cycle."""
+        _, _, offsets, sources = self._frozen()
+        offsets, sources = offsets.tolist(), sources.tolist()
+        seen = set()
+        stack = [self._ids[node]]
+        while stack:
+            current = stack.pop()
+            for predecessor in sources[offsets[current]:offsets[current + 1]]:
+                if predecessor not in seen:
+                    seen.add(predecessor)
+                    stack.append(predecessor)
+        return {self._nodes[i] for i in seen}
+
+    def topological_sort(self) -> List[str]:
+        """Kahn's algorithm; raises ValueError if the graph has a cycle."""
+        offsets, targets, _, _ = self._frozen()
+        count = len(self._nodes)
+        in_degree = np.bincount(targets, minlength=count).tolist()
+        offsets, targets = offsets.tolist(), targets.tolist()
+        ready = deque(i for i, degree in enumerate(in_degree) if not degree)
+        order = []
+        while ready:
+            current = ready.popleft()
+            order.append(current)
+            for successor in targets[offsets[current]:offsets[current + 1]]:
+                in_degree[successor] -= 1
+                if not in_degree[successor]:
+                    ready.append(successor)
+        if len(order) < count:
+            raise ValueError("Circular dependency detected!")
+        return [self._nodes[i] for i in order]
+
+    def strongly_connected_components(self) -> List[List[str]]:
+        """
+        Strongly connected components (Tarjan's algorithm, iteratively) in dependency
+        order: a component only depends on components before it.
+        """
+        offsets, targets, _, _ = self._frozen()
+        offsets, targets = offsets.tolist(), targets.tolist()
+        count = len(self._nodes)
+        index = [-1] * count
+        low = [0] * count
+        on_stack = [False] * count
+        stack, components = [], []
+        counter = 0
+        for root in range(count):
+            if index[root] != -1:
+                continue
+            index[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = True
+            work = [(root, offsets[root])]
+            while work:
+                node, edge = work[-1]
+                if edge < offsets[node + 1]:
+                    work[-1] = (node, edge + 1)
+                    successor = targets[edge]
+                    if index[successor] == -1:
+                        index[successor] = low[successor] = counter
+                        counter += 1
+                        stack.append(successor)
+                        on_stack[successor] = True
+                        work.append((successor, offsets[successor]))
+                    elif on_stack[successor]:
+                        low[node] = min(low[node], index[successor])
+                    continue
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = False
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+        # Tarjan finishes dependents first
+        components.reverse()
+        return [[self._nodes[i] for i in reversed(component)] for component in components]
+
+    def has_self_loop(self, node: str) -> bool:
+        node_id = self._ids[node]
+        return bool((self.successor_ids(node_id) == node_id).any())
+
+    def to_networkx(self) -> nx.DiGraph:
+        graph = nx.DiGraph()
+        graph.add_nodes_from(self._nodes)
+        graph.add_edges_from(self.edges())
+        return graph
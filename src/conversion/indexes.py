@@ -0,0 +1,240 @@
+"""
+Derived indexes over a sheet's cell values.
+
+Indexes are built from a snapshot of a sheet dict ({"A1": value, ...}) and are immutable;
+`IndexedSheet` (see sheet_store.py) caches them and drops them when a cell changes.
+"""
+
+import re
+from bisect import bisect_left
+from datetime import date, datetime, time, timedelta
+from typing import NamedTuple, Optional, Tuple
+
+import numpy as np
+
+_CELL_RE = re.compile(r'\$?([A-Z]+)\$?([0-9]+)$')
+
+
+def column_letter(col_num: int) -> str:
+    """Column letters of a 1-based column number (1 -> 'A', 27 -> 'AA')."""
+    letters = ''
+    while col_num > 0:
+        col_num, remainder = divmod(col_num - 1, 26)
+        letters = chr(ord('A') + remainder) + letters
+    return letters
+
+
+def cell_position(cell_ref: str) -> Optional[Tuple[int, int]]:
+    """1-based (row, column) of an A1-style reference, or None if it is not one."""
+    match = _CELL_RE.match(cell_ref) if isinstance(cell_ref, str) else None
+    if not match:
+        return None
+    col = 0
+    for char in match.group(1):
+        col = col * 26 + (ord(char) - ord('A') + 1)
+    return int(match.group(2)), col
+
+
+class RangeStats(NamedTuple):
+    """Aggregates of a rectangular range, matching the loops in excel_functions."""
+    total: float
+    numeric: int
+    nonempty: int
+
+
+def _is_numeric(value) -> bool:
+    return isinstance(value, (int, float))
+
+
+def _is_nonempty(value) -> bool:
+    return value is not None and value != ""
+
+
+def _make_stats(int_total, float_total, float_count, numeric, nonempty) -> RangeStats:
+    # Keep integer sums integral, as summing Python ints does
+    total = int_total + float_total if float_count else int_total
+    return RangeStats(total, numeric, nonempty)
+
+
+def scan_range(cells, start_row, start_col, end_row, end_col) -> RangeStats:
+    """Aggregate a range by looking up each cell; used before an index is worth building."""
+    int_total = float_total = 0
+    float_count = numeric = nonempty = 0
+    for col in range(start_col, end_col + 1):
+        letter = column_letter(col)
+        for row in range(start_row, end_row + 1):
+            value = cells.get(f"{letter}{row}")
+            if _is_numeric(value):
+                numeric += 1
+                if isinstance(value, float):
+                    float_total += value
+                    float_count += 1
+                else:
+                    int_total += value
+            if _is_nonempty(value):
+                nonempty += 1
+    return _make_stats(int_total, float_total, float_count, numeric, nonempty)
+
+
+class RangeIndex:
+    """
+    2-D prefix sums of a sheet, so SUM/COUNT/AVERAGE over any rectangle is O(1).
+
+    Separate tables are kept for integer and float sums (so all-integer ranges sum to an
+    int), float count, numeric count and non-empty count. Float ranges whose prefix
+    difference would lose precision to large values outside them are summed from the
+    float grid instead. Sheets the tables cannot represent (a very sparse extent,
+    integers beyond int64, NaN/infinity) are left unindexed and `stats` returns None.
+    """
+
+    # Largest table (in cells) built for a sheet, relative to its number of cells
+    MAX_DENSITY_RATIO = 64
+
+    def __init__(self, cells):
+        self._tables = None
+        positions = []
+        for ref, value in cells.items():
+            position = cell_position(ref)
+            if position is not None:
+                positions.append((position, value))
+        self.max_row = max((p[0] for p, _ in positions), default=0)
+        self.max_col = max((p[1] for p, _ in positions), default=0)
+        if self.max_row * self.max_col > max(self.MAX_DENSITY_RATIO * len(positions), 1 << 16):
+            return
+        try:
+            self._tables = self._build(positions)
+        except OverflowError:
+            self._tables = None
+
+    def _build(self, positions):
+        shape = (self.max_row + 1, self.max_col + 1)
+        ints = np.zeros(shape, dtype=np.int64)
+        floats = np.zeros(shape, dtype=np.float64)
+        float_counts = np.zeros(shape, dtype=np.int32)
+        numeric = np.zeros(shape, dtype=np.int32)
+        nonempty = np.zeros(shape, dtype=np.int32)
+        for (row, col), value in positions:
+            if _is_numeric(value):
+                numeric[row, col] = 1
+                if isinstance(value, float):
+                    floats[row, col] = value
+                    float_counts[row, col] = 1
+                else:
+                    ints[row, col] = value
+            if _is_nonempty(value):
+                nonempty[row, col] = 1
+        return self._prefix_tables(ints, floats, float_counts, numeric, nonempty)
+
+    @classmethod
+    def from_grids(cls, ints, floats, float_counts, numeric, nonempty):
+        """
+        Build the index from dense per-cell grids (row 0 / column 0 being A1), as a
+        columnar store holds them; the grids must not include values the tables cannot
+        represent.
+        """
+        index = cls.__new__(cls)
+        index.max_row, index.max_col = ints.shape
+        pad = ((1, 0), (1, 0))
+        grids = (ints.astype(np.int64), floats.astype(np.float64), float_counts.astype(np.int32),
+                 numeric.astype(np.int32), nonempty.astype(np.int32))
+        index._tables = index._prefix_tables(*(np.pad(grid, pad) for grid in grids))
+        return index
+
+    @classmethod
+    def unindexed(cls):
+        """An index that answers no query, for sheets the tables cannot represent."""
+        index = cls.__new__(cls)
+        index.max_row = index.max_col = 0
+        index._tables = None
+        return index
+
+    @staticmethod
+    def _prefix_tables(ints, floats, float_counts, numeric, nonempty):
+        if not np.isfinite(floats).all():
+            return None
+        # Row/column 0 stay zero so prefix[r, c] covers rows 1..r and columns 1..c
+        prefixes = [table.cumsum(axis=0).cumsum(axis=1)
+                    for table in (ints, floats, float_counts, numeric, nonempty, np.abs(floats))]
+        # The float grid itself is kept for ranges the float prefix sums cannot answer accurately
+        return prefixes + [floats]
+
+    def stats(self, start_row, start_col, end_row, end_col) -> Optional[RangeStats]:
+        if self._tables is None:
+            return None
+        end_row, end_col = min(end_row, self.max_row), min(end_col, self.max_col)
+        top, left = max(start_row, 1) - 1, max(start_col, 1) - 1
+        if end_row <= top or end_col <= left:
+            return RangeStats(0, 0, 0)
+        *prefixes, floats = self._tables
+        int_total, float_total, float_count, numeric, nonempty, magnitude = (
+            (t[end_row, end_col] - t[top, end_col] - t[end_row, left] + t[top, left]).item()
+            for t in prefixes
+        )
+        if float_count:
+            # Subtracting prefixes cancels the rounding error of everything summed into
+            # them (|values| up to the corner). When that bound exceeds a scan's own bound
+            # by more than 16x (a small range below large values), sum the range's floats
+            # in scan order instead, so the index and a scan agree.
+            area = (end_row - top) * (end_col - left)
+            if (4 * (end_row + end_col) + 3) * prefixes[5][end_row, end_col] > 16 * area * magnitude:
+                float_total = sum(floats[top + 1:end_row + 1, left + 1:end_col + 1].T.ravel().tolist())
+        return _make_stats(int_total, float_total, float_count, numeric, nonempty)
+
+
+def _kind(value):
+    """Group values that compare with each other; None for values that are never matched."""
+    if isinstance(value, (int, float)):
+        return 'number'
+    if isinstance(value, str):
+        return 'text'
+    if isinstance(value, (datetime, date, time, timedelta)):
+        # datetime and date don't compare with each other, so group by exact type
+        return type(value)
+    return None
+
+
+class LookupIndex:
+    """
+    Index of one lookup column (rows start_row..end_row) for VLOOKUP.
+
+    Exact match uses a dict of value -> rows in order. Approximate match returns the first
+    row (in sheet order) whose value is >= the lookup value: values of each kind are
+    sorted, and a suffix minimum of their rows answers the query with one bisect.
+    """
+
+    def __init__(self, cells, letter, start_row, end_row):
+        self.rows_by_value = {}
+        by_kind = {}
+        for row in range(start_row, end_row + 1):
+            value = cells.get(f"{letter}{row}")
+            if value is None:
+                continue
+            try:
+                self.rows_by_value.setdefault(value, []).append(row)
+            except TypeError:
+                continue
+            kind = _kind(value)
+            if kind is not None:
+                by_kind.setdefault(kind, []).append((value, row))
+
+        self._sorted = {}
+        for kind, entries in by_kind.items():
+            entries.sort(key=lambda entry: entry[0])
+            values = [value for value, _ in entries]
+            first_rows = [row for _, row in entries]
+            for i in range(len(first_rows) - 2, -1, -1):
+                first_rows[i] = min(first_rows[i], first_rows[i + 1])
+            self._sorted[kind] = (values, first_rows)
+
+    def exact_rows(self, value):
+        """Rows whose value equals `value`, in sheet order."""
+        try:
+            return self.rows_by_value.get(value, ())
+        except TypeError:
+            return ()
+
+    def first_row_at_least(self, value):
+        """First row (in sheet order) with a value >= `value` of the same kind, or None."""
+        values, first_rows = self._sorted.get(_kind(value), ((), ()))
+        position = bisect_left(values, value)
+        return first_rows[position] if position < len(first_rows) else None
@@ -0,0 +1,251 @@
+"""
+NumPy versions of the Excel helper functions, used by the vectorized rules backend.
+
+In a vectorized rules module each input may be a scalar (shared by every scenario) or a
+1-D array with one element per scenario, so a batch is evaluated in a few array passes.
+Rules that use a helper without a vectorized form run through `per_element`, which
+evaluates the scalar expression once per scenario; so do the scenarios of a vectorized
+rule that raise or come out NaN/infinite in an array pass (see `run_rules`).
+"""
+
+import logging
+import math
+from collections.abc import Mapping
+from functools import reduce
+
+import numpy as np
+
+from .excel_functions import compile_criteria, evaluate_criteria
+
+
+def _numeric(value):
+    """Return `value` with non-numeric entries replaced by 0, and a mask of numeric entries."""
+    if isinstance(value, np.ndarray):
+        if value.dtype.kind in 'iufb':
+            return value, np.ones(value.shape, dtype=bool)
+        mask = np.fromiter((isinstance(v, (int, float)) for v in value), dtype=bool, count=len(value))
+        return np.where(mask, value, 0).astype(float), mask
+    if isinstance(value, (int, float)):
+        return value, True
+    return 0, False
+
+
+def _scalar(value):
+    """Unwrap 0-d arrays and NumPy scalars into plain Python values."""
+    if isinstance(value, (np.ndarray, np.generic)) and np.ndim(value) == 0:
+        return value.item()
+    return value
+
+
+_criteria_match = np.frompyfunc(evaluate_criteria, 2, 1)
+
+
+def _matches(value, criteria):
+    if isinstance(criteria, np.ndarray):
+        return _criteria_match(value, criteria).astype(bool)
+    matches = compile_criteria(criteria)
+    if isinstance(value, np.ndarray):
+        return np.frompyfunc(matches, 1, 1)(value).astype(bool)
+    return bool(matches(value))
+
+
+def _key_values(data, sheet, keys):
+    by_key = data.get(sheet, {}).get('by_key', {})
+    return [by_key.get(k) for k in keys]
+
+
+# Key-based helpers
+
+def v_sum_keys(data, sheet, keys):
+    return sum((_numeric(v)[0] for v in _key_values(data, sheet, keys)), 0)
+
+
+def v_average_keys(data, sheet, keys):
+    total, count = 0, 0
+    for v in _key_values(data, sheet, keys):
+        value, mask = _numeric(v)
+        total = total + value
+        count = count + np.asarray(mask, dtype=int)
+    if np.ndim(count) == 0:
+        return _scalar(total / count) if count else 0
+    return np.where(count > 0, total / np.maximum(count, 1), 0)
+
+
+def v_count_if_keys(data, sheet, keys, criteria):
+    return _scalar(sum((np.asarray(_matches(v, criteria), dtype=int) for v in _key_values(data, sheet, keys)), 0))
+
+
+def v_sum_if_keys(data, sheet, keys, criteria):
+    total = 0
+    for v in _key_values(data, sheet, keys):
+        value, mask = _numeric(v)
+        total = total + np.where(np.logical_and(mask, _matches(v, criteria)), value, 0)
+    return _scalar(total)
+
+
+# Elementwise operators
+
+def v_where(condition, if_true, if_false):
+    """Elementwise IF; mixed text/number branches keep their own types."""
+    if not isinstance(condition, np.ndarray):
+        return if_true if condition else if_false
+    if_true, if_false = np.asarray(if_true), np.asarray(if_false)
+    if if_true.dtype.kind not in 'iufb' or if_false.dtype.kind not in 'iufb':
+        if_true, if_false = if_true.astype(object), if_false.astype(object)
+    return np.where(condition.astype(bool), if_true, if_false)
+
+
+def v_and(*values):
+    return _scalar(reduce(np.logical_and, values))
+
+
+def v_or(*values):
+    return _scalar(reduce(np.logical_or, values))
+
+
+def v_not(value):
+    return _scalar(np.logical_not(value))
+
+
+def v_str(value):
+    if isinstance(value, np.ndarray):
+        return np.array([str(v) for v in value], dtype=object)
+    return str(value)
+
+
+def v_concat(*args):
+    return reduce(lambda left, right: left + right, (v_str(a) for a in args), '')
+
+
+def v_round(value, digits=0):
+    if isinstance(value, np.ndarray):
+        return np.round(value.astype(float), int(digits))
+    return round(value, digits)
+
+
+# Per-scenario fallback
+
+class _RecordView(Mapping):
+    """Read-only view of one scenario of a batch: arrays are indexed, scalars pass through."""
+
+    def __init__(self, source, index):
+        self._source = source
+        self._index = index
+
+    def __getitem__(self, key):
+        value = self._source[key]
+        if isinstance(value, np.ndarray) and value.ndim == 1:
+            return _scalar(value[self._index])
+        if isinstance(value, dict):
+            return _RecordView(value, self._index)
+        return value
+
+    def __iter__(self):
+        return iter(self._source)
+
+    def __len__(self):
+        return len(self._source)
+
+
+def batch_size(data):
+    """Number of scenarios in `data` (length of its first 1-D array), or None if all scalar."""
+    for sheet in data.values():
+        if not isinstance(sheet, Mapping):
+            continue
+        for value in list(sheet.values()) + list(sheet.get('by_key', {}).values()):
+            if isinstance(value, np.ndarray) and value.ndim == 1:
+                return len(value)
+    return None
+
+
+def per_element(rule, data, shared_data=None, indices=None, results=None):
+    """
+    Evaluate a scalar rule function once per scenario and collect the results.
+
+    A scenario whose evaluation raises gets None, as the scalar rules backend returns.
+    With `indices`, only those scenarios are evaluated and written into `results`.
+    """
+    size = batch_size(data)
+    if size is None:
+        return rule(data, shared_data)
+    if results is None:
+        results = np.empty(size, dtype=object)
+    failures = 0
+    for i in range(size) if indices is None else indices:
+        try:
+            results[i] = rule(_RecordView(data, i), shared_data)
+        except Exception as e:
+            if not failures:
+                logging.error(f"Error in {rule.__name__}: {e}")
+            failures += 1
+            results[i] = None
+    if failures > 1:
+        logging.error(f"{rule.__name__} failed on {failures} of {size} scenarios")
+    return results
+
+
+def _non_finite(value):
+    """Mask of the NaN/infinite elements of a rule's result array."""
+    if value.dtype.kind == 'f':
+        return ~np.isfinite(value)
+    if value.dtype.kind == 'O':
+        return np.fromiter((isinstance(v, float) and not math.isfinite(v) for v in value),
+                           dtype=bool, count=len(value))
+    return np.zeros(value.shape, dtype=bool)
+
+
+def _vectorized_result(rule, data, shared_data, node, fallbacks):
+    """
+    Evaluate a vectorized rule, re-evaluating per element the scenarios an array pass
+    gets wrong: all of them if it raises (a zero divisor or a mixed-type comparison
+    anywhere in the batch), or those with a NaN/infinite result, which scalar Python
+    arithmetic raises on instead. Rules that fell back are recorded in `fallbacks`.
+    """
+    size = batch_size(data)
+    try:
+        value = _scalar(rule(data, shared_data))
+    except Exception as e:
+        if size is None:
+            raise
+        if fallbacks is not None:
+            fallbacks.setdefault(node, f"evaluated per element after {type(e).__name__}: {e}")
+        return per_element(rule, data, shared_data)
+    if size is None or not isinstance(value, np.ndarray) or value.ndim != 1:
+        return value
+    bad = np.flatnonzero(_non_finite(value))
+    if len(bad):
+        if fallbacks is not None:
+            fallbacks.setdefault(node, f"{len(bad)} of {size} scenarios evaluated per element (non-finite result)")
+        value = per_element(rule, data, shared_data, indices=bad.tolist(), results=value.astype(object))
+    return value
+
+
+def run_rules(rules, data, shared_data=None, fallbacks=None):
+    """
+    Evaluate vectorized rules in order, writing each result back into `data`.
+
+    Args:
+        rules (list): (sheet, cell, key or None, function) tuples in dependency order.
+        data (dict): {sheet: {cell: value, 'by_key': {key: value}}} where values are
+            scalars or 1-D arrays of equal length.
+        fallbacks (dict): Where to record {"Sheet!Cell": reason} for rules re-evaluated
+            per element (see `_vectorized_result`).
+
+    Returns:
+        dict: {"Sheet!Cell": result}.
+    """
+    results = {}
+    with np.errstate(all='ignore'):
+        for sheet, cell, key, rule in rules:
+            node = f"{sheet}!{cell}"
+            try:
+                value = _vectorized_result(rule, data, shared_data, node, fallbacks)
+            except Exception as e:
+                logging.error(f"Error evaluating rule for cell {node}: {e}")
+                value = None
+            store = data.setdefault(sheet, {})
+            store[cell] = value
+            if key is not None:
+                store.setdefault('by_key', {})[key] = value
+            results[node] = value
+    return results
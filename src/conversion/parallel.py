@@ -0,0 +1,178 @@
+"""
+Process-pool formula conversion and workbook extraction.
+
+ANTLR's Python runtime is CPU-bound, so large workbooks are converted by sharding the
+formula list into contiguous chunks across worker processes. Contiguous chunks keep
+copy-down formulas together, which keeps each worker's parse cache effective.
+
+Workbooks are extracted one per task with `map_files`, which streams results back as
+they finish and caps how many workbooks are in flight at once.
+"""
+
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .converter import ConvertedFormula, ExcelToPythonConverter
+
+# (converted formula, None) on success or (None, error message) on failure
+ConversionResult = Tuple[Optional[ConvertedFormula], Optional[str]]
+
+# (path, result, None) on success or (path, None, error message) on failure
+FileResult = Tuple[str, Any, Optional[str]]
+
+# Per-process state, set once by _init_worker
+_worker_converter = None
+_worker_shared_data = None
+
+
+def _init_worker(shared_data: Dict[str, Any]) -> None:
+    """Warm-initialize a worker with the shared cell-to-key map and settings."""
+    global _worker_converter, _worker_shared_data
+    _worker_converter = ExcelToPythonConverter({})
+    _worker_shared_data = shared_data
+
+
+def _convert_one(converter: ExcelToPythonConverter, formula_data: Dict[str, str],
+                 shared_data: Dict[str, Any]) -> ConversionResult:
+    try:
+        converted = converter.analyze_formula(
+            formula_data["formula"],
+            formula_data["cell"],
+            formula_data["sheet"],
+            shared_data
+        )
+        return converted, None
+    except Exception as e:
+        return None, str(e)
+
+
+def _convert_chunk(chunk: List[Dict[str, str]]) -> Tuple[List[ConversionResult], int, int, List[str]]:
+    cache = _worker_converter.parse_cache
+    hits, misses, shapes = cache.hits, cache.misses, len(cache.shapes())
+    results = [_convert_one(_worker_converter, f, _worker_shared_data) for f in chunk]
+    # Shapes are kept in insertion order, so the chunk's new ones are at the end
+    return results, cache.hits - hits, cache.misses - misses, cache.shapes()[shapes:]
+
+
+def resolve_workers(workers: int) -> int:
+    """Treat a non-positive worker count as 'one per CPU'."""
+    return workers if workers > 0 else (os.cpu_count() or 1)
+
+
+def convert_formulas(
+    formulas: List[Dict[str, str]],
+    shared_data: Dict[str, Any],
+    workers: int = 1,
+    converter: Optional[ExcelToPythonConverter] = None,
+    chunk_size: Optional[int] = None,
+    progress: Optional[Callable[[int], Any]] = None,
+) -> List[ConversionResult]:
+    """Convert formula dicts ({formula, cell, sheet}) and return results in input order.
+
+    With workers > 1 the formulas are converted on a process pool; worker parse cache
+    hit/miss counts and shapes are merged into `converter.parse_cache`. `progress` is called with the
+    number of formulas finished after each chunk.
+    """
+    converter = converter or ExcelToPythonConverter({})
+    workers = resolve_workers(workers)
+
+    if workers <= 1 or len(formulas) < 2:
+        results = []
+        for formula_data in formulas:
+            results.append(_convert_one(converter, formula_data, shared_data))
+            if progress:
+                progress(1)
+        return results
+
+    if chunk_size is None:
+        # A few chunks per worker balances load without losing copy-down locality
+        chunk_size = max(1, -(-len(formulas) // (workers * 4)))
+    chunks = [formulas[i:i + chunk_size] for i in range(0, len(formulas), chunk_size)]
+
+    results = []
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks)),
+                             initializer=_init_worker, initargs=(shared_data,)) as executor:
+        # map() yields in submission order, so results line up with the input
+        for chunk, (chunk_results, hits, misses, shapes) in zip(chunks, executor.map(_convert_chunk, chunks)):
+            results.extend(chunk_results)
+            converter.parse_cache.merge(hits, misses, shapes)
+            if progress:
+                progress(len(chunk))
+    return results
+
+
+def _call_isolated(function: Callable[[str], Any], path: str) -> Tuple[Any, Optional[str]]:
+    try:
+        return function(path), None
+    except Exception as e:
+        return None, str(e)
+
+
+def map_files(
+    function: Callable[[str], Any],
+    paths: Iterable[str],
+    workers: int = 1,
+    max_in_flight: Optional[int] = None,
+    ordered: bool = False,
+) -> Iterator[FileResult]:
+    """Apply `function` to each path, one file per task, yielding (path, result, error).
+
+    A file whose `function` raises yields its error message without affecting the other
+    files; if a worker process dies, the files it may have been running are reported as
+    failed and the pool is restarted for the rest. With workers > 1, at most
+    `max_in_flight` files (default: two per worker) are submitted or waiting to be
+    consumed at any time, which bounds memory. Results come in completion order, or in
+    input order with `ordered`.
+    """
+    paths = list(paths)
+    workers = resolve_workers(workers)
+    if workers <= 1 or len(paths) < 2:
+        for path in paths:
+            yield (path, *_call_isolated(function, path))
+        return
+
+    max_in_flight = max(1, max_in_flight or 2 * workers)
+    pending = iter(enumerate(paths))
+    in_flight = {}  # future -> (position, path)
+    finished = {}  # position -> result, held back until earlier files finish (ordered)
+    next_position = 0
+    executor = ProcessPoolExecutor(max_workers=min(workers, len(paths)))
+    try:
+        while True:
+            while len(in_flight) + len(finished) < max_in_flight:
+                item = next(pending, None)
+                if item is None:
+                    break
+                in_flight[executor.submit(_call_isolated, function, item[1])] = item
+            if not in_flight:
+                break
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            completed = []
+            broken = None
+            for future in done:
+                item = in_flight.pop(future)
+                try:
+                    completed.append((item, future.result()))
+                except BrokenProcessPool as e:
+                    broken = f"worker process died: {e}"
+                    completed.append((item, (None, broken)))
+            if broken:
+                # Every file still in the dead pool fails; the remaining files get a new pool
+                completed.extend((item, (None, broken)) for item in in_flight.values())
+                in_flight.clear()
+                executor.shutdown(wait=False, cancel_futures=True)
+                executor = ProcessPoolExecutor(max_workers=min(workers, len(paths)))
+
+            for (position, path), (result, error) in completed:
+                if not ordered:
+                    yield path, result, error
+                    continue
+                finished[position] = (path, result, error)
+            while next_position in finished:
+                yield finished.pop(next_position)
+                next_position += 1
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -1,6 +1,34 @@
-def generate_python_rules_file(converter, converted_formulas, shared_data, sorted_cells):
-    """Generate complete Python file with all rules, respecting topological order."""
-    header = '''# Auto-generated Python rule functions
+import io
+import logging
+import re
+
+from .vectorize import vectorize_expression
+
+
+def order_formulas(converted_formulas, sorted_cells):
+    """ConvertedFormula objects in `sorted_cells` order, skipping nodes without a formula (inputs, ranges)."""
+    by_node = {(f.node_id if f.sheet else f.cell_reference): f for f in converted_formulas}
+    ordered_formulas = [by_node[cell_ref] for cell_ref in sorted_cells if cell_ref in by_node]
+    skipped = len(sorted_cells) - len(ordered_formulas)
+    if skipped:
+        logging.info(f"Rules file: {len(ordered_formulas)} formulas, {skipped} input nodes skipped")
+    return ordered_formulas
+
+
+def write_python_rules_file(out, converter, converted_formulas, shared_data, sorted_cells, backend='python'):
+    """Write the rules module to the text stream `out`, one function at a time.
+
+    Formulas are looked up through a node index (see `order_formulas`), so the cost is
+    linear in the number of sorted cells, and the module is never held in memory whole.
+    """
+    ordered_formulas = order_formulas(converted_formulas, sorted_cells)
+
+    if backend == 'numpy':
+        return write_numpy_rules(out, ordered_formulas, shared_data)
+    if backend != 'python':
+        raise ValueError(f"Unknown rules backend: {backend}")
+
+    out.write('''# Auto-generated Python rule functions
 # Generated from Excel formulas
 
 # Import Excel-like helper functions
@@ -10,20 +38,106 @@ from src.conversion.excel_functions import *
 shared_data = {}
 
 # Generated rule functions
-'''
-    
+''')
+
     # Generate rule functions in topological order
-    rule_functions = []
-    for cell_ref in sorted_cells:
-        # Find the ConvertedFormula object that matches the cell_ref
-        formula = next((f for f in converted_formulas if (f"{f.sheet}!{f.cell_reference}" if f.sheet else f.cell_reference) == cell_ref), None)
-        if formula:
-            func_code = converter.generate_python_function(formula)
-            rule_functions.append(func_code)
+    for i, formula in enumerate(ordered_formulas):
+        if i:
+            out.write("\n\n")
+        out.write(converter.generate_python_function(formula))
+
+
+def generate_python_rules_file(converter, converted_formulas, shared_data, sorted_cells, backend='python'):
+    """Generate complete Python file with all rules, respecting topological order.
+
+    backend='numpy' emits a module whose rules operate on NumPy arrays, one element per
+    scenario (see `generate_numpy_rules`). To write large modules straight to a file,
+    use `write_python_rules_file`.
+    """
+    out = io.StringIO()
+    write_python_rules_file(out, converter, converted_formulas, shared_data, sorted_cells, backend)
+    return out.getvalue()
+
+
+def _function_name(converted):
+    return re.sub(r'\W', '_', f"rule_{converted.sheet.lower()}_{converted.cell_reference.lower()}")
+
+
+def generate_numpy_rules(ordered_formulas, shared_data):
+    """Generate a vectorized rules module from formulas in topological order (see `write_numpy_rules`)."""
+    out = io.StringIO()
+    write_numpy_rules(out, ordered_formulas, shared_data)
+    return out.getvalue()
+
+
+def write_numpy_rules(out, ordered_formulas, shared_data):
+    """Write a vectorized rules module for formulas in topological order to `out`.
+
+    Each rule takes `data` whose values are scalars or 1-D arrays with one element per
+    scenario. Rules that cannot be vectorized are evaluated per element and listed in the
+    module's FALLBACK_RULES with the reason.
+    """
+    cell_to_key_map = shared_data.get('cell_to_key_map', {})
+    out.write('''# Auto-generated vectorized rule functions
+# Generated from Excel formulas; inputs are scalars or NumPy arrays (one element per scenario)
+
+import numpy as np
+
+# Import Excel-like helper functions and their NumPy versions
+from src.conversion.excel_functions import *
+from src.conversion.numpy_functions import *
+
+# Generated rule functions
+''')
+    rule_entries = []
+    fallbacks = {}
+    for i, converted in enumerate(ordered_formulas):
+        if i:
+            out.write("\n\n\n")
+        func_name = _function_name(converted)
+        node_id = f"{converted.sheet}!{converted.cell_reference}"
+        vectorized, reason = vectorize_expression(converted.python_expression)
+        docstring = f'''    """
+    {converted.description}
+    Original Excel formula: {converted.original_formula}
+    Cell: {node_id}
+    Rule type: {converted.rule_type}
+    Vectorized: {"yes" if reason is None else f"no, evaluated per element ({reason})"}
+    """'''
+        if reason is None:
+            out.write(f'''def {func_name}(data, shared_data):
+{docstring}
+    return {vectorized}''')
         else:
-            print(f"Warning: Could not find formula for cell {cell_ref}")
-    
-    # Combine all parts
-    complete_code = header + "\n\n".join(rule_functions)
-    
-    return complete_code
\ No newline at end of file
+            fallbacks[node_id] = reason
+            out.write(f'''def _scalar_{func_name}(data, shared_data):
+    return {converted.python_expression}
+
+
+def {func_name}(data, shared_data):
+{docstring}
+    return per_element(_scalar_{func_name}, data, shared_data)''')
+        key = cell_to_key_map.get(converted.sheet, {}).get(converted.cell_reference)
+        rule_entries.append(f"    ({converted.sheet!r}, {converted.cell_reference!r}, {key!r}, {func_name}),")
+
+    logging.info(f"Vectorized rules: {len(ordered_formulas) - len(fallbacks)} vectorized, "
+                 f"{len(fallbacks)} evaluated per element")
+    fallback_entries = [f"    {node_id!r}: {reason!r}," for node_id, reason in fallbacks.items()]
+    out.write(f'''
+
+# Rules in dependency order: (sheet, cell, semantic key, function)
+RULES = [
+{chr(10).join(rule_entries)}
+]
+
+# Rules evaluated per element, with the reason they could not be vectorized; rules
+# re-evaluated per element at run time (zero divisors, mixed-type comparisons) are added
+FALLBACK_RULES = {{
+{chr(10).join(fallback_entries)}
+}}
+
+
+def evaluate(data, shared_data=None):
+    """Evaluate every rule in order, writing results back into data; returns {{"Sheet!Cell": result}}."""
+    return run_rules(RULES, data, shared_data, FALLBACK_RULES)
+''')
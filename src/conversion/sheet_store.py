@@ -0,0 +1,520 @@
+"""
+Sheet containers that cache derived indexes.
+
+`data[sheet]` is a mapping of cell values: a plain dict, an `IndexedSheet` (see
+`index_sheets`) or a columnar `SheetStore`, which extraction produces. The last two let
+the range helpers in excel_functions answer from cached indexes instead of looking up
+every cell on every call. Caches are dropped whenever a cell changes, so results always
+reflect the current values.
+"""
+
+import re
+from collections.abc import MutableMapping
+from functools import lru_cache
+from typing import Optional
+
+import numpy as np
+
+from .indexes import LookupIndex, RangeIndex, RangeStats, cell_position, column_letter, scan_range
+
+# The one non-cell entry of a sheet dict; writing it does not affect cell indexes
+KEY_VALUES = 'by_key'
+
+_MISSING = object()
+
+
+class IndexedCells:
+    """
+    Derived-index cache shared by the sheet containers (`IndexedSheet`, `SheetStore`).
+
+    Range helpers check for this base to use `range_stats` / `lookup_index` instead of
+    looking up cells one by one.
+    """
+
+    def _init_indexes(self):
+        self._derived = {}
+        self._scan_cost = 0
+
+    def invalidate(self):
+        """Drop every derived index."""
+        if self._derived:
+            self._derived = {}
+        self._scan_cost = 0
+
+    def derived(self, name, build):
+        """Return the cached index `name`, building it with `build(self)` if needed."""
+        index = self._derived.get(name)
+        if index is None:
+            index = self._derived[name] = build(self)
+        return index
+
+    def index_for(self, name, build, scan_cost):
+        """
+        Return the cached index `name`, or None when the caller should scan instead.
+
+        Until an index is built, callers scan the cells and `scan_cost` (cells the scan
+        touches) is accumulated; the index is built once the scans have cost as much as
+        building it would, so a sheet written between every query never pays more than
+        about twice the plain scan.
+        """
+        index = self._derived.get(name)
+        if index is None:
+            if self._scan_cost + scan_cost < len(self):
+                self._scan_cost += scan_cost
+                return None
+            index = self.derived(name, build)
+        return index
+
+    # --- range aggregates ---
+    def range_stats(self, start_cell, end_cell) -> RangeStats:
+        """Sum / numeric count / non-empty count of a rectangular range."""
+        start, end = cell_position(start_cell), cell_position(end_cell)
+        if start is None or end is None:
+            return RangeStats(0, 0, 0)
+        (start_row, start_col), (end_row, end_col) = start, end
+        area = max(end_row - start_row + 1, 0) * max(end_col - start_col + 1, 0)
+        index = self.index_for('range', RangeIndex, area)
+        stats = index.stats(start_row, start_col, end_row, end_col) if index is not None else None
+        if stats is None:
+            return self._scan(start_row, start_col, end_row, end_col)
+        return stats
+
+    def _scan(self, start_row, start_col, end_row, end_col) -> RangeStats:
+        return scan_range(self, start_row, start_col, end_row, end_col)
+
+    def lookup_index(self, letter, start_row, end_row) -> Optional[LookupIndex]:
+        """The shared `LookupIndex` of a lookup column, or None while scanning is cheaper."""
+        return self.index_for(
+            ('lookup', letter, start_row, end_row),
+            lambda cells: LookupIndex(cells, letter, start_row, end_row),
+            max(end_row - start_row + 1, 0),
+        )
+
+
+class IndexedSheet(IndexedCells, dict):
+    """A sheet dict whose derived indexes are built lazily and invalidated on writes."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._init_indexes()
+
+    def copy(self):
+        """Copy the cells; indexes are shared until either copy is written."""
+        clone = IndexedSheet(self)
+        clone._derived = dict(self._derived)
+        clone._scan_cost = self._scan_cost
+        return clone
+
+    # --- writes ---
+    def __setitem__(self, key, value):
+        if key != KEY_VALUES:
+            old = dict.get(self, key, _MISSING)
+            if old is _MISSING or not _same_value(old, value):
+                self.invalidate()
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        if key != KEY_VALUES:
+            self.invalidate()
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self.invalidate()
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def pop(self, key, *default):
+        if key in self and key != KEY_VALUES:
+            self.invalidate()
+        return super().pop(key, *default)
+
+    def popitem(self):
+        self.invalidate()
+        return super().popitem()
+
+    def clear(self):
+        super().clear()
+        self.invalidate()
+
+    # --- pickling keeps the cells only; indexes are rebuilt on demand ---
+    def __reduce__(self):
+        return (IndexedSheet, (dict(self),))
+
+
+# Type tags of SheetStore cells. _ABSENT marks cells that are not in the sheet at all;
+# _NONE and _EMPTY are present but blank (None and '').
+_ABSENT, _NONE, _EMPTY, _BOOL, _INT, _FLOAT, _TEXT, _OBJECT = range(8)
+# Largest extent (in cells) a sparse sheet is stored densely for, relative to its cells
+MAX_DENSE_RATIO = 8
+# Integers stored in the float64 column must round-trip exactly
+_MAX_EXACT_INT = 1 << 53
+_CELL_REF_RE = re.compile(r'([A-Z]+)([1-9][0-9]*)')
+
+
+@lru_cache(maxsize=1 << 16)
+def _ref_position(ref):
+    """0-based (row, col) of a canonical cell reference like 'B12', or None."""
+    match = _CELL_REF_RE.fullmatch(ref)
+    if not match:
+        return None
+    col = 0
+    for char in match.group(1):
+        col = col * 26 + (ord(char) - ord('A') + 1)
+    return int(match.group(2)) - 1, col - 1
+
+
+def _encode(value):
+    """(tag, number) of a cell value; number is what the float64 array holds."""
+    if value is None:
+        return _NONE, 0.0
+    if isinstance(value, bool):
+        return _BOOL, float(value)
+    if isinstance(value, int):
+        if -_MAX_EXACT_INT <= value <= _MAX_EXACT_INT:
+            return _INT, float(value)
+        return _OBJECT, 0.0
+    if isinstance(value, float):
+        return _FLOAT, value
+    if isinstance(value, str):
+        return (_TEXT, 0.0) if value else (_EMPTY, 0.0)
+    return _OBJECT, 0.0
+
+
+class SheetStore(IndexedCells, MutableMapping):
+    """
+    Compact columnar storage for one sheet's cell values.
+
+    Every cell has an int8 type tag (which doubles as the validity bitmap: _ABSENT cells
+    are not in the sheet) and a float64 slot. Numbers and booleans are stored in the slot
+    directly; for text and other objects (dates, integers beyond 2**53) the slot holds the
+    position of the value in an object pool, where equal values are stored once. Cells are
+    addressed by 0-based integer (row, col) through `get_at`/`set_at`, and the mapping
+    interface accepts 'B12' references (or (row, col) tuples) so `get_cell` and the range
+    helpers work unchanged. Non-cell entries such as 'by_key' are kept in a plain dict.
+    """
+
+    def __init__(self, cells=None, rows=0, cols=0):
+        self._tags = np.zeros((rows, cols), dtype=np.int8)
+        self._numbers = np.zeros((rows, cols), dtype=np.float64)
+        self._pool = []
+        self._pool_positions = {}
+        self._extras = {}
+        self._count = 0
+        self._init_indexes()
+        if cells:
+            self.update(cells)
+
+    @classmethod
+    def from_cells(cls, cells):
+        """Build a store from a {'A1': value, ...} mapping, sized to its extent up front."""
+        if isinstance(cells, SheetStore):
+            return cells.copy()
+        positions = [_ref_position(ref) if isinstance(ref, str) else None for ref in cells]
+        rows = max((p[0] + 1 for p in positions if p), default=0)
+        cols = max((p[1] + 1 for p in positions if p), default=0)
+        store = cls(rows=rows, cols=cols)
+        for position, (ref, value) in zip(positions, cells.items()):
+            if position is None:
+                store._extras[ref] = value
+            else:
+                store._put(position[0], position[1], value)
+        return store
+
+    @classmethod
+    def from_values(cls, values, rows, cols, fill_blank=True):
+        """
+        Build a store from {(row, col): value} with 1-based positions, as extraction
+        collects them. With `fill_blank` every cell of the rows x cols extent is present
+        and cells without a value read as None; otherwise only the given cells are.
+        """
+        store = cls(rows=rows, cols=cols)
+        if fill_blank:
+            store._tags[:] = _NONE
+            store._count = rows * cols
+        else:
+            store._count = len(values)
+        positions, tags, numbers = [], [], []
+        for (row, col), value in values.items():
+            tag, number = _encode(value)
+            if tag == _NONE and fill_blank:
+                continue
+            if tag >= _TEXT:
+                number = store._pooled(value)
+            positions.append((row - 1, col - 1))
+            tags.append(tag)
+            numbers.append(number)
+        if positions:
+            index = tuple(np.array(positions, dtype=np.intp).T)
+            store._tags[index] = tags
+            store._numbers[index] = numbers
+        return store
+
+    @property
+    def shape(self):
+        """(rows, cols) of the allocated extent."""
+        return self._tags.shape
+
+    # --- positional access ---
+    def get_at(self, row, col, default=None):
+        """Value at 0-based (row, col), or `default` for a cell that is not in the sheet."""
+        value = self._value_at(row, col)
+        return default if value is _MISSING else value
+
+    def set_at(self, row, col, value):
+        """Set the value at 0-based (row, col), growing the store as needed."""
+        old = self._value_at(row, col)
+        if old is _MISSING or not _same_value(old, value):
+            self.invalidate()
+        self._put(row, col, value)
+
+    def _value_at(self, row, col):
+        rows, cols = self._tags.shape
+        if not (0 <= row < rows and 0 <= col < cols):
+            return _MISSING
+        tag = self._tags.item(row, col)
+        if tag == _ABSENT:
+            return _MISSING
+        if tag <= _EMPTY:
+            return None if tag == _NONE else ''
+        number = self._numbers.item(row, col)
+        if tag == _FLOAT:
+            return number
+        if tag == _INT:
+            return int(number)
+        if tag == _BOOL:
+            return number != 0.0
+        return self._pool[int(number)]
+
+    def _pooled(self, value):
+        """Position of `value` in the object pool, adding it if needed."""
+        try:
+            key = (type(value), value)
+            position = self._pool_positions.get(key)
+        except TypeError:
+            # Unhashable objects are not shared
+            key = position = None
+        if position is None:
+            position = len(self._pool)
+            self._pool.append(value)
+            if key is not None:
+                self._pool_positions[key] = position
+        return position
+
+    def _put(self, row, col, value):
+        self._reserve(row + 1, col + 1)
+        tag, number = _encode(value)
+        if tag >= _TEXT:
+            number = self._pooled(value)
+        if self._tags[row, col] == _ABSENT:
+            self._count += 1
+        self._tags[row, col] = tag
+        self._numbers[row, col] = number
+
+    def _reserve(self, rows, cols):
+        """Grow the arrays (geometrically) to hold at least rows x cols cells."""
+        old_rows, old_cols = self._tags.shape
+        if rows <= old_rows and cols <= old_cols:
+            return
+        new_rows = max(rows, old_rows * 2) if rows > old_rows else old_rows
+        new_cols = max(cols, old_cols * 2) if cols > old_cols else old_cols
+        tags = np.zeros((new_rows, new_cols), dtype=np.int8)
+        numbers = np.zeros((new_rows, new_cols), dtype=np.float64)
+        tags[:old_rows, :old_cols] = self._tags
+        numbers[:old_rows, :old_cols] = self._numbers
+        self._tags, self._numbers = tags, numbers
+
+    # --- mapping interface ---
+    def _position(self, key):
+        if isinstance(key, str):
+            return _ref_position(key)
+        if isinstance(key, tuple):
+            return key
+        return None
+
+    def __getitem__(self, key):
+        position = self._position(key)
+        if position is None:
+            return self._extras[key]
+        value = self._value_at(*position)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        position = self._position(key)
+        if position is None:
+            # Non-cell entries (by_key) don't affect cell indexes
+            self._extras[key] = value
+        else:
+            self.set_at(position[0], position[1], value)
+
+    def __delitem__(self, key):
+        position = self._position(key)
+        if position is None:
+            del self._extras[key]
+            return
+        row, col = position
+        if self._value_at(row, col) is _MISSING:
+            raise KeyError(key)
+        self._tags[row, col] = _ABSENT
+        self._numbers[row, col] = 0.0
+        self._count -= 1
+        self.invalidate()
+
+    def __contains__(self, key):
+        position = self._position(key)
+        if position is None:
+            return key in self._extras
+        return self._value_at(*position) is not _MISSING
+
+    def __iter__(self):
+        # Row-major, as extraction records cells, then the non-cell entries
+        rows, cols = np.nonzero(self._tags)
+        letters = {}
+        for row, col in zip(rows.tolist(), cols.tolist()):
+            letter = letters.get(col)
+            if letter is None:
+                letter = letters[col] = column_letter(col + 1)
+            yield f"{letter}{row + 1}"
+        yield from list(self._extras)
+
+    def __len__(self):
+        return self._count + len(self._extras)
+
+    def __repr__(self):
+        rows, cols = self.shape
+        return f"SheetStore({self._count} cells in {rows}x{cols}, extras={list(self._extras)})"
+
+    def clear(self):
+        self.__init__()
+
+    def copy(self):
+        """Copy the cells; indexes are shared until either copy is written."""
+        clone = SheetStore.__new__(SheetStore)
+        clone._count = self._count
+        clone._tags, clone._numbers = self._tags.copy(), self._numbers.copy()
+        clone._pool, clone._pool_positions = list(self._pool), dict(self._pool_positions)
+        clone._extras = dict(self._extras)
+        clone._derived = dict(self._derived)
+        clone._scan_cost = self._scan_cost
+        return clone
+
+    # --- pickling keeps the cells only; indexes are rebuilt on demand ---
+    def __getstate__(self):
+        return {'tags': self._tags, 'numbers': self._numbers, 'pool': self._pool,
+                'extras': self._extras, 'count': self._count}
+
+    def __setstate__(self, state):
+        self._tags, self._numbers = state['tags'], state['numbers']
+        self._pool, self._extras, self._count = state['pool'], state['extras'], state['count']
+        self._pool_positions = {}
+        for position, value in enumerate(self._pool):
+            try:
+                self._pool_positions.setdefault((type(value), value), position)
+            except TypeError:
+                continue
+        self._init_indexes()
+
+    # --- range aggregates straight from the arrays ---
+    def range_stats(self, start_cell, end_cell) -> RangeStats:
+        """Sum / numeric count / non-empty count of a rectangular range."""
+        start, end = cell_position(start_cell), cell_position(end_cell)
+        if start is None or end is None:
+            return RangeStats(0, 0, 0)
+        (start_row, start_col), (end_row, end_col) = start, end
+        area = max(end_row - start_row + 1, 0) * max(end_col - start_col + 1, 0)
+        index = self.index_for('range', SheetStore._range_index, area)
+        stats = index.stats(start_row, start_col, end_row, end_col) if index is not None else None
+        if stats is None:
+            return self._scan(start_row, start_col, end_row, end_col)
+        return stats
+
+    def _range_index(self) -> RangeIndex:
+        tags, numbers = self._tags, self._numbers
+        is_int = (tags == _INT) | (tags == _BOOL)
+        is_float = tags == _FLOAT
+        ints = np.where(is_int, numbers, 0.0)
+        if np.abs(ints).sum() >= 2.0 ** 62 or any(isinstance(v, (int, float)) for v in self._pool):
+            # Sums that could overflow int64, or integers kept as objects: scan instead
+            return RangeIndex.unindexed()
+        return RangeIndex.from_grids(ints, np.where(is_float, numbers, 0.0), is_float, is_int | is_float, tags > _EMPTY)
+
+    def _scan(self, start_row, start_col, end_row, end_col) -> RangeStats:
+        top, left = max(start_row, 1) - 1, max(start_col, 1) - 1
+        tags = self._tags[top:end_row, left:end_col]
+        numbers = self._numbers[top:end_row, left:end_col]
+        int_values = numbers[(tags == _INT) | (tags == _BOOL)]
+        if np.abs(int_values).sum() < 2.0 ** 62:
+            int_total = int(int_values.astype(np.int64).sum())
+        else:
+            int_total = sum(int(v) for v in int_values.tolist())
+        float_values = numbers[tags == _FLOAT]
+        float_total, float_count = float(float_values.sum()), int(float_values.size)
+        numeric = int(int_values.size) + float_count
+        nonempty = int((tags > _EMPTY).sum())
+        for position in numbers[tags == _OBJECT].tolist():
+            value = self._pool[int(position)]
+            if isinstance(value, (int, float)):
+                # Integers too large for the float64 array
+                numeric += 1
+                int_total += value
+        if float_count:
+            return RangeStats(int_total + float_total, numeric, nonempty)
+        return RangeStats(int_total, numeric, nonempty)
+
+
+def _same_value(old, value):
+    # Recomputed formulas usually reproduce the cached value; keep indexes then
+    return type(old) is type(value) and old == value
+
+
+def _dense_enough(count, rows, cols):
+    # A SheetStore spends ~9 bytes per cell of its extent, a dict ~100 per stored cell
+    return rows * cols <= max(MAX_DENSE_RATIO * count, 1 << 16)
+
+
+def compact_values(values, rows, cols):
+    """
+    Store the cells {(row, col): value} (1-based) of a sparse extraction: a `SheetStore`
+    when they fill enough of their rows x cols extent, else an `IndexedSheet` holding
+    just those cells. Cells that are not stored read as missing, which the range helpers
+    treat as blank.
+    """
+    if _dense_enough(len(values), rows, cols):
+        return SheetStore.from_values(values, rows, cols, fill_blank=False)
+    return IndexedSheet({f"{column_letter(col)}{row}": value for (row, col), value in values.items()})
+
+
+def compact_sheet(cells):
+    """
+    `cells` itself if it already is an indexed container (`SheetStore`, `IndexedSheet`),
+    else a `SheetStore` of its cells, or an `IndexedSheet` when they are too sparse.
+    """
+    if isinstance(cells, IndexedCells):
+        return cells
+    positions = [_ref_position(ref) for ref in cells if isinstance(ref, str)]
+    positions = [p for p in positions if p is not None]
+    rows = max((row + 1 for row, _ in positions), default=0)
+    cols = max((col + 1 for _, col in positions), default=0)
+    if _dense_enough(len(positions), rows, cols):
+        return SheetStore.from_cells(cells)
+    return IndexedSheet(cells)
+
+
+def index_sheets(data):
+    """
+    Return a copy of `data` with every sheet dict wrapped in an `IndexedSheet`;
+    `SheetStore` sheets already keep their own indexes and are used as they are.
+    """
+    return {
+        sheet: cells if isinstance(cells, IndexedCells) or not isinstance(cells, dict) else IndexedSheet(cells)
+        for sheet, cells in data.items()
+    }
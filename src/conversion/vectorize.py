@@ -0,0 +1,100 @@
+"""
+Rewrite converted Python expressions into NumPy array expressions.
+
+`IF` (a conditional expression) becomes `v_where` unless a branch can raise,
+`AND`/`OR`/`NOT` become elementwise logical operations and key-based aggregates become
+their `numpy_functions` versions. Arithmetic and comparisons already broadcast over arrays and are kept as they are.
+Expressions using anything without a vectorized form are reported as unsupported so the
+generator can evaluate them per element instead.
+"""
+
+import ast
+from typing import Optional, Tuple
+
+# Helpers that broadcast over array inputs, and the name to call in vectorized code
+VECTOR_FUNCTIONS = {
+    'get_value': 'get_value',
+    'get_cell': 'get_cell',
+    'sum_keys': 'v_sum_keys',
+    'average_keys': 'v_average_keys',
+    'count_if_keys': 'v_count_if_keys',
+    'sum_if_keys': 'v_sum_if_keys',
+    'rows_count_keys': 'rows_count_keys',
+    'rows_count': 'rows_count',
+    'concat': 'v_concat',
+    'str': 'v_str',
+    'round': 'v_round',
+}
+
+
+# Operators that raise on some inputs (zero divisor, overflow)
+_RAISING_OPS = (ast.Div, ast.FloorDiv, ast.Mod, ast.Pow)
+
+
+class Unsupported(Exception):
+    """An expression construct with no vectorized form."""
+
+
+def _call(name, args):
+    return ast.Call(func=ast.Name(id=name, ctx=ast.Load()), args=args, keywords=[])
+
+
+class _Vectorizer(ast.NodeTransformer):
+
+    def visit_Call(self, node):
+        if not isinstance(node.func, ast.Name) or node.func.id not in VECTOR_FUNCTIONS:
+            raise Unsupported(ast.unparse(node.func))
+        self.generic_visit(node)
+        node.func = ast.Name(id=VECTOR_FUNCTIONS[node.func.id], ctx=ast.Load())
+        return node
+
+    def visit_IfExp(self, node):
+        # v_where evaluates both branches for every element, so a branch that can raise
+        # (IF(x=0,0,y/x)) would fail for the elements the condition guards against
+        for branch in (node.body, node.orelse):
+            if any(isinstance(sub, ast.BinOp) and isinstance(sub.op, _RAISING_OPS) for sub in ast.walk(branch)):
+                raise Unsupported('a conditional branch that can raise')
+        self.generic_visit(node)
+        return _call('v_where', [node.test, node.body, node.orelse])
+
+    def visit_BoolOp(self, node):
+        self.generic_visit(node)
+        return _call('v_and' if isinstance(node.op, ast.And) else 'v_or', node.values)
+
+    def visit_UnaryOp(self, node):
+        self.generic_visit(node)
+        if isinstance(node.op, ast.Not):
+            return _call('v_not', [node.operand])
+        return node
+
+    def visit_Compare(self, node):
+        self.generic_visit(node)
+        if len(node.ops) == 1:
+            return node
+        # a < b < c -> v_and(a < b, b < c)
+        operands = [node.left] + node.comparators
+        pairs = [
+            ast.Compare(left=left, ops=[op], comparators=[right])
+            for left, op, right in zip(operands, node.ops, operands[1:])
+        ]
+        return _call('v_and', pairs)
+
+    def visit_Lambda(self, node):
+        # safe_execute/is_error catch errors per call, which has no array equivalent
+        raise Unsupported('lambda')
+
+
+def vectorize_expression(expression: str) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Return (vectorized expression, None), or (None, reason) when the expression has to be
+    evaluated per element.
+    """
+    try:
+        tree = ast.parse(expression, mode='eval')
+    except SyntaxError as e:
+        return None, f"syntax error: {e.msg}"
+    try:
+        tree = _Vectorizer().visit(tree)
+    except Unsupported as e:
+        return None, f"no vectorized form for {e}"
+    return ast.unparse(ast.fix_missing_locations(tree)), None
@@ -0,0 +1,467 @@
+"""
+Dependency-ordered rule evaluation.
+
+`evaluate_rules` evaluates every expression against the raw extracted data, so a formula
+that reads another formula's cell sees the cached Excel value instead of the freshly
+computed one. `RuleEngine` walks the rules in topological order and writes each result
+back into the sheet's cell store (and its `by_key` entry) before dependents run.
+`Workbook` keeps one evaluated dataset and recalculates only what a change affects.
+"""
+
+import logging
+import math
+from collections import Counter
+
+import networkx as nx
+
+from src.conversion.dependencies import link_ranges
+from src.conversion.graph import DependencyGraph
+from src.conversion.sheet_store import IndexedCells, IndexedSheet
+from .evaluator import _raiser, compile_rule
+
+
+# Marks a batch record that leaves an input at its base value
+_MISSING = object()
+
+
+def node_id(sheet, cell):
+    """Graph node id of a sheet cell, as used by `build_dependency_graph`."""
+    return f"{sheet}!{cell}"
+
+
+def _change(old, new):
+    """How much a value moved between iterations: the difference of numbers, else 0 or inf."""
+    numbers = (int, float)
+    if isinstance(old, numbers) and isinstance(new, numbers) and not isinstance(old, bool) \
+            and not isinstance(new, bool):
+        change = abs(new - old)
+        # NaN never counts as converged
+        return change if change == change else math.inf
+    try:
+        return 0.0 if old == new else math.inf
+    except Exception:
+        return math.inf
+
+
+def _as_columns(records):
+    """Normalize a list of record dicts or a dict of columns to ({column: values}, row count)."""
+    if isinstance(records, dict):
+        columns = {column: list(values) for column, values in records.items()}
+        lengths = {len(values) for values in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError("All columns of a batch must have the same length")
+        return columns, lengths.pop() if lengths else 0
+    records = list(records)
+    names = dict.fromkeys(column for record in records for column in record)
+    columns = {column: [record.get(column, _MISSING) for record in records] for column in names}
+    return columns, len(records)
+
+
+class RuleEngine:
+    """
+    Rules compiled and ordered once, then evaluated against any number of datasets.
+
+    Args:
+        rules (list): Rule dictionaries with 'sheet', 'cell' and 'python_expression'
+            (the conversion summary format). 'dependencies' (cells, semantic keys and
+            ranges such as "S!B2:B9") is used when no graph is given.
+        graph (DependencyGraph): Dependency graph from `build_dependency_graph` (a
+            networkx DiGraph is converted). Built from the rules' 'dependencies' when
+            omitted. Cell nodes are linked to the range nodes containing them.
+        cell_to_key_map (dict): {sheet: {cell: key}}. A computed cell that has a semantic
+            key also updates `data[sheet]['by_key'][key]`, and rules reading that key are
+            ordered after it.
+        iterative (bool): Allow circular references, like Excel's iterative calculation.
+            The graph is condensed into strongly connected components; acyclic rules run
+            once in order and each cycle is repeated until no value changes by more than
+            `max_change`, or `max_iterations` times. `cycle_stats` reports each cycle.
+
+    Raises:
+        ValueError: If the rules contain a circular dependency (without `iterative`).
+    """
+
+    def __init__(self, rules, graph=None, cell_to_key_map=None, iterative=False,
+                 max_iterations=100, max_change=0.001):
+        cell_to_key_map = cell_to_key_map or {}
+        self.graph = self._build_graph(rules, graph, cell_to_key_map)
+        # Input cells inside a range are not graph nodes; changes reach the range through this
+        self._ranges = link_ranges(self.graph)
+
+        self._rules = {}
+        for rule in rules:
+            sheet, cell = rule['sheet'], rule['cell']
+            key = cell_to_key_map.get(sheet, {}).get(cell)
+            self._rules[node_id(sheet, cell)] = (sheet, cell, key, self._compile(rule))
+
+        self.max_iterations = max_iterations
+        self.max_change = max_change
+        self.cycle_stats = []
+        self._cycles = {}  # rule node -> rule nodes of its cycle, in evaluation order
+        if iterative:
+            self.order = self._condensed_order()
+        else:
+            self.order = [node for node in self.graph.topological_sort() if node in self._rules]
+        self._plans = {}
+        self._rule_levels = None
+
+        # Precomputed for incremental recalculation
+        self._cell_to_key = cell_to_key_map
+        self._key_to_cell = {
+            sheet: {key: cell for cell, key in mapping.items()}
+            for sheet, mapping in cell_to_key_map.items()
+        }
+        self._position = {node: i for i, node in enumerate(self.order)}
+
+    def _condensed_order(self):
+        """Rule order over the graph's strongly connected components; records the cycles."""
+        order = []
+        for component in self.graph.strongly_connected_components():
+            rules = [node for node in component if node in self._rules]
+            if rules and (len(component) > 1 or self.graph.has_self_loop(component[0])):
+                cycle = tuple(rules)
+                self._cycles.update(dict.fromkeys(cycle, cycle))
+            order.extend(rules)
+        return order
+
+    @staticmethod
+    def _build_graph(rules, graph, cell_to_key_map):
+        if isinstance(graph, nx.DiGraph):
+            graph = DependencyGraph.from_networkx(graph)
+        elif graph is not None:
+            graph = graph.copy()
+        else:
+            graph = DependencyGraph()
+            for rule in rules:
+                target = node_id(rule['sheet'], rule['cell'])
+                graph.add_node(target)
+                for dep in rule.get('dependencies', []):
+                    graph.add_edge(dep, target)
+        # Rules that read a computed cell by key must run after the cell itself
+        for sheet, mapping in cell_to_key_map.items():
+            for cell, key in mapping.items():
+                source = node_id(sheet, cell)
+                if source in graph:
+                    graph.add_edge(source, f"{sheet}:{key}")
+        return graph
+
+    @staticmethod
+    def _compile(rule):
+        try:
+            return compile_rule(rule['python_expression'])
+        except KeyError as e:
+            return _raiser(e)
+
+    def plan(self, targets=None):
+        """
+        Rule nodes to evaluate, in order, to compute `targets` (all rules when None).
+
+        Only the targets and the rules they transitively depend on are included.
+        Plans are cached per target set.
+        """
+        if targets is None:
+            return self.order
+        targets = frozenset(targets)
+        if targets not in self._plans:
+            needed = set()
+            for target in targets:
+                if target not in self.graph:
+                    raise KeyError(f"Unknown cell: {target}")
+                needed.add(target)
+                needed.update(self.graph.ancestors(target))
+            self._plans[targets] = [node for node in self.order if node in needed]
+        return self._plans[targets]
+
+    def affected(self, changed):
+        """Rule nodes that transitively depend on the `changed` nodes, in evaluation order."""
+        graph = self.graph
+        seen = set()
+        stack = []
+        for node in changed:
+            if node in graph:
+                stack.extend(graph.successor_ids(graph.index(node)).tolist())
+            else:
+                stack.extend(graph.index(range_node) for range_node in self._ranges.containing(node))
+        while stack:
+            node_index = stack.pop()
+            if node_index not in seen:
+                seen.add(node_index)
+                stack.extend(graph.successor_ids(node_index).tolist())
+        nodes = (graph.node(i) for i in seen)
+        return sorted((node for node in nodes if node in self._position), key=self._position.__getitem__)
+
+    def _resolve(self, sheet, key_or_cell, by_key=()):
+        """Return (cell, key) for a semantic key or a cell reference; either may be None."""
+        cell = self._key_to_cell.get(sheet, {}).get(key_or_cell)
+        if cell is not None or key_or_cell in by_key:
+            return cell, key_or_cell
+        return key_or_cell, self._cell_to_key.get(sheet, {}).get(key_or_cell)
+
+    def _working_copy(self, data, sheets=()):
+        """Copy the sheets rules (or `sheets`) write to, leaving the caller's data untouched."""
+        working = dict(data)
+        for sheet in {sheet for sheet, _, _, _ in self._rules.values()}.union(sheets):
+            cells = data.get(sheet, {})
+            # Indexed copies keep range lookups fast while rules write into them
+            store = cells.copy() if isinstance(cells, IndexedCells) else IndexedSheet(cells)
+            store['by_key'] = dict(store.get('by_key', {}))
+            working[sheet] = store
+        return working
+
+    def levels(self, targets=None):
+        """
+        The rules of `plan(targets)` grouped into levels: a rule's level is the number of
+        rules on the longest dependency path leading to it, so the rules of one level are
+        independent of each other and only read results of earlier levels.
+        """
+        if self._rule_levels is None:
+            depth = {}
+            for node in self.graph.topological_sort():
+                depth[node] = max((depth[p] + (p in self._rules) for p in self.graph.predecessors(node)),
+                                  default=0)
+            self._rule_levels = {node: depth[node] for node in self._rules}
+        groups = {}
+        for node in self.plan(targets):
+            groups.setdefault(self._rule_levels[node], []).append(node)
+        return [groups[level] for level in sorted(groups)]
+
+    def evaluate(self, data, targets=None, in_place=False, scheduler=None):
+        """
+        Evaluate rules in dependency order against `data`.
+
+        Args:
+            data (dict): {sheet: {cell: value, 'by_key': {key: value}}}.
+            targets (iterable): Node ids ("Sheet!A1") to compute; only these and the rules
+                they depend on are evaluated. All rules when None.
+            in_place (bool): Write computed values into `data` itself instead of a copy.
+            scheduler (LevelScheduler): Evaluate level by level, running the rules of
+                large levels concurrently (see scheduler.py). Sequential when None or
+                when the rules contain cycles.
+
+        Returns:
+            dict: {node id: result}. A rule that raises evaluates to None, and None is
+            what its dependents read.
+        """
+        working = data if in_place else self._working_copy(data)
+        if scheduler is not None and not self._cycles:
+            return scheduler.run(self, working, self.levels(targets))
+        return self._run(working, self.plan(targets))
+
+    def _evaluate(self, working, node):
+        """Value of one rule against `working`; None (logged) if the rule raises."""
+        try:
+            return self._rules[node][3](working)
+        except Exception as e:
+            logging.error(f"Error evaluating rule for cell {node}: {e}")
+            return None
+
+    def _store(self, working, node, value):
+        """Write a rule's value into its cell and semantic key."""
+        sheet, cell, key, _ = self._rules[node]
+        store = working.setdefault(sheet, {})
+        store[cell] = value
+        if key is not None:
+            store.setdefault('by_key', {})[key] = value
+
+    def _run(self, working, nodes):
+        results = {}
+        if self._cycles:
+            self.cycle_stats = []
+        for node in nodes:
+            cycle = self._cycles.get(node)
+            if cycle is not None:
+                # A cycle's members are contiguous in the order; solve them together
+                if node not in results:
+                    results.update(self._iterate(working, cycle))
+                continue
+            value = results[node] = self._evaluate(working, node)
+            self._store(working, node, value)
+        return results
+
+    def _iterate(self, working, cycle):
+        """
+        Fixed-point iteration of one cycle, starting from the values currently stored;
+        blank members start at 0, as in Excel. An iteration in which a member raised
+        never counts as converged.
+        """
+        for node in cycle:
+            sheet, cell, _, _ = self._rules[node]
+            if working.get(sheet, {}).get(cell) is None:
+                self._store(working, node, 0)
+        values = {}
+        converged = False
+        iterations = 0
+        largest = 0.0
+        errors = {}
+        while iterations < self.max_iterations and not converged:
+            iterations += 1
+            largest = 0.0
+            errors = {}
+            for node in cycle:
+                sheet, cell, _, _ = self._rules[node]
+                old = working.get(sheet, {}).get(cell)
+                try:
+                    value = self._rules[node][3](working)
+                except Exception as e:
+                    value = None
+                    errors[node] = e
+                values[node] = value
+                self._store(working, node, value)
+                largest = max(largest, _change(old, value))
+            converged = largest <= self.max_change and not errors
+        # Only the last iteration's errors are logged, once per rule
+        for node, e in errors.items():
+            logging.error(f"Error evaluating rule for cell {node}: {e}")
+        self.cycle_stats.append({
+            'cells': list(cycle), 'iterations': iterations, 'converged': converged, 'max_change': largest,
+        })
+        if not converged:
+            logging.warning(f"Cycle {', '.join(cycle)} did not converge in {iterations} iterations "
+                            f"(last change {largest:g})")
+        return values
+
+    def evaluate_batch(self, base_data, records, targets=None):
+        """
+        Evaluate the rules once per input record.
+
+        Args:
+            base_data (dict): Data shared by every record, as for `evaluate`.
+            records: A list of {column: value} dicts or a {column: [values]} table. Columns
+                are "Sheet:Key" for semantic keys or "Sheet!A1" for cells; a column missing
+                from a record keeps its base value.
+            targets (iterable): Node ids to return; all rules when None.
+
+        Returns:
+            dict: {node id: [result per record]}.
+
+        Inputs are resolved and the affected rules planned once for the whole batch, so
+        each record only re-evaluates rules that depend on the batch columns.
+        """
+        columns, count = _as_columns(records)
+        inputs = []
+        for column in columns:
+            sheet, sep, name = column.partition(':')
+            if not sep or '!' in sheet:
+                sheet, _, name = column.partition('!')
+            inputs.append((sheet, name))
+
+        working = self._working_copy(base_data, sheets={sheet for sheet, _ in inputs})
+        self._run(working, self.order)
+
+        slots = []
+        changed = set()
+        for (sheet, name), values in zip(inputs, columns.values()):
+            store = working[sheet]
+            by_key = store['by_key']
+            cell, key = self._resolve(sheet, name, by_key)
+            if cell is not None:
+                changed.add(node_id(sheet, cell))
+            if key is not None:
+                changed.add(f"{sheet}:{key}")
+            base_value = by_key.get(key) if cell is None or cell not in store else store[cell]
+            slots.append((store, cell, by_key, key, base_value, values))
+
+        plan = []
+        for node in self.affected(changed):
+            sheet, cell, key, function = self._rules[node]
+            plan.append((node, working[sheet], cell, key, function))
+        outputs = list(targets) if targets is not None else list(self.order)
+        table = {node: [] for node in outputs}
+        readers = []
+        for node in outputs:
+            if node not in self._rules:
+                raise KeyError(f"Unknown cell: {node}")
+            sheet, cell, _, _ = self._rules[node]
+            readers.append((table[node], working[sheet], cell))
+
+        errors = Counter()
+        plan_nodes = [entry[0] for entry in plan]
+        for i in range(count):
+            for store, cell, by_key, key, base_value, values in slots:
+                value = values[i]
+                if value is _MISSING:
+                    value = base_value
+                if cell is not None:
+                    store[cell] = value
+                if key is not None:
+                    by_key[key] = value
+            if self._cycles:
+                # Cycles are re-solved per record, starting from the previous record's values
+                self._run(working, plan_nodes)
+            else:
+                for node, store, cell, key, function in plan:
+                    try:
+                        value = function(working)
+                    except Exception as e:
+                        if not errors[node]:
+                            logging.error(f"Error evaluating rule for cell {node}: {e}")
+                        errors[node] += 1
+                        value = None
+                    store[cell] = value
+                    if key is not None:
+                        store['by_key'][key] = value
+            for column, store, cell in readers:
+                column.append(store[cell])
+
+        for node, failures in errors.items():
+            if failures > 1:
+                logging.error(f"Rule for cell {node} failed on {failures} of {count} records")
+        return table
+
+    def bind(self, data):
+        """Evaluate every rule against a copy of `data` and return a `Workbook` for what-if updates."""
+        return Workbook(self, data)
+
+
+class Workbook:
+    """
+    Evaluated state of a `RuleEngine` over one dataset, recalculated incrementally.
+
+    `set_value` changes an input and marks it dirty; `recalc` re-evaluates only the rules
+    that transitively depend on dirty inputs.
+
+    Usage:
+        workbook = engine.bind(data)
+        workbook.set_value('Inputs', 'Price', 12)
+        changed = workbook.recalc()
+    """
+
+    def __init__(self, engine, data):
+        self.engine = engine
+        self.data = engine._working_copy(data)
+        self.values = engine._run(self.data, engine.order)
+        self._dirty = set()
+
+    def _resolve(self, sheet, key_or_cell):
+        by_key = self.data.get(sheet, {}).get('by_key', {})
+        return self.engine._resolve(sheet, key_or_cell, by_key)
+
+    def set_value(self, sheet, key_or_cell, value):
+        """
+        Set an input by semantic key or cell reference and mark its dependents dirty.
+
+        Setting a formula cell overrides its value until one of its own inputs changes.
+        """
+        cell, key = self._resolve(sheet, key_or_cell)
+        store = self.data.setdefault(sheet, {})
+        if cell is not None:
+            store[cell] = value
+            self._dirty.add(node_id(sheet, cell))
+        if key is not None:
+            store.setdefault('by_key', {})[key] = value
+            self._dirty.add(f"{sheet}:{key}")
+
+    def get_value(self, sheet, key_or_cell):
+        """Current value of a cell or semantic key."""
+        cell, key = self._resolve(sheet, key_or_cell)
+        store = self.data.get(sheet, {})
+        if cell is not None and cell in store:
+            return store[cell]
+        return store.get('by_key', {}).get(key)
+
+    def recalc(self):
+        """Re-evaluate the dependents of every value set since the last recalc; returns {node id: result}."""
+        nodes = self.engine.affected(self._dirty)
+        self._dirty = set()
+        results = self.engine._run(self.data, nodes)
+        self.values.update(results)
+        return results
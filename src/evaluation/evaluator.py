@@ -1,5 +1,140 @@
 import logging
-from src.conversion.excel_functions import * 
+from functools import lru_cache
+from src.conversion.excel_functions import *
+
+# Helper functions visible to rule expressions
+EVAL_GLOBALS = {
+    'get_cell': get_cell,
+    'get_value': get_value,
+    'sum_range': sum_range,
+    'count_range': count_range,
+    'average_range': average_range,
+    'count_if_range': count_if_range,
+    'count_if': count_if,
+    'sum_if': sum_if,
+    'sum_keys': sum_keys,
+    'average_keys': average_keys,
+    'count_if_keys': count_if_keys,
+    'sum_if_keys': sum_if_keys,
+    'countifs_keys': countifs_keys,
+    'sumifs_keys': sumifs_keys,
+    'averageifs_keys': averageifs_keys,
+    'maxifs_keys': maxifs_keys,
+    'safe_execute': safe_execute,
+    'is_error': is_error,
+    'concat': concat,
+    'round_down': round_down,
+    'rows_count': rows_count,
+    'rows_count_keys': rows_count_keys,
+    'find_text': find_text,
+    'vlookup': vlookup,
+    'index': index,
+    'indirect': indirect,
+    'countifs': countifs,
+    'sumifs': sumifs,
+    'averageifs': averageifs,
+    'maxifs': maxifs,
+    'eomonth': eomonth,
+    'yearfrac': yearfrac,
+}
+
+
+def _raiser(error):
+    """A rule function that re-raises the error its expression failed to compile with."""
+    def rule(data):
+        raise error
+    return rule
+
+
+# Compiled rule functions kept by `compile_rule`; bounded for long-running processes
+# (the web UI) that compile the expressions of every uploaded workbook
+COMPILED_RULES_CACHE_SIZE = 16384
+
+
+@lru_cache(maxsize=COMPILED_RULES_CACHE_SIZE)
+def compile_rule(expression):
+    """
+    Compile a rule expression once into a function of `data`.
+
+    Functions are cached by expression text (least recently used first out), so rules
+    shared between rule sets (or evaluated again on another dataset) are only compiled
+    the first time.
+    """
+    source = f"def rule(data):\n    return ({expression})\n"
+    namespace = dict(EVAL_GLOBALS)
+    try:
+        exec(compile(source, '<rule>', 'exec'), namespace)
+    except SyntaxError as e:
+        return _raiser(e)
+    return namespace['rule']
+
+
+class RuleSet:
+    """
+    A list of rules compiled once and evaluated against any number of datasets.
+
+    Args:
+        rules (list): Rule dictionaries with 'cell' and 'python_expression'.
+        combined (bool): Generate a single function that evaluates every rule in one
+            call instead of calling one function per rule.
+    """
+
+    def __init__(self, rules, combined=False):
+        self.cells = [rule['cell'] for rule in rules]
+        self.combined = combined
+        if combined:
+            self._evaluate_all = self._compile_combined(rules)
+        else:
+            self.functions = [self._compile(rule) for rule in rules]
+
+    @staticmethod
+    def _compile(rule):
+        try:
+            return compile_rule(rule['python_expression'])
+        except KeyError as e:
+            return _raiser(e)
+
+    @staticmethod
+    def _on_error(cell, error):
+        logging.error(f"Error evaluating rule for cell {cell}: {error}")
+        return None
+
+    def _compile_combined(self, rules):
+        lines = ["def evaluate_all(data):", "    results = {}"]
+        for rule in rules:
+            cell = repr(rule['cell'])
+            expression = rule.get('python_expression')
+            if expression is None:
+                lines.append(f"    results[{cell}] = _on_error({cell}, 'missing python_expression')")
+                continue
+            try:
+                # Validate each expression on its own so one bad rule can't break the set
+                compile(f"({expression})", '<rule>', 'eval')
+            except (SyntaxError, TypeError) as e:
+                lines.append(f"    results[{cell}] = _on_error({cell}, {repr(str(e))})")
+                continue
+            lines.append("    try:")
+            lines.append(f"        results[{cell}] = ({expression})")
+            lines.append("    except Exception as e:")
+            lines.append(f"        results[{cell}] = _on_error({cell}, e)")
+        lines.append("    return results")
+
+        namespace = dict(EVAL_GLOBALS, _on_error=self._on_error)
+        exec(compile("\n".join(lines) + "\n", '<rule set>', 'exec'), namespace)
+        return namespace['evaluate_all']
+
+    def evaluate(self, data):
+        """Evaluate every rule against `data`, returning {cell: result}."""
+        if self.combined:
+            return self._evaluate_all(data)
+        results = {}
+        for cell, function in zip(self.cells, self.functions):
+            try:
+                results[cell] = function(data)
+            except Exception as e:
+                results[cell] = self._on_error(cell, e)
+        return results
+
 
 def evaluate_rules(rules, data):
     """
@@ -12,42 +147,4 @@ def evaluate_rules(rules, data):
     Returns:
         dict: A dictionary containing the evaluation results.
     """
-    results = {}
-    eval_globals = {
-        'data': data,
-        'get_cell': get_cell,
-        'get_value': get_value,
-        'sum_range': sum_range,
-        'count_range': count_range,
-        'average_range': average_range,
-        'count_if_range': count_if_range,
-        'count_if': count_if,
-        'sum_if': sum_if,
-        'sum_keys': sum_keys,
-        'average_keys': average_keys,
-        'count_if_keys': count_if_keys,
-        'sum_if_keys': sum_if_keys,
-        'countifs_keys': countifs_keys,
-        'safe_execute': safe_execute,
-        'is_error': is_error,
-        'concat': concat,
-        'round_down': round_down,
-        'rows_count': rows_count,
-        'rows_count_keys': rows_count_keys,
-        'find_text': find_text,
-        'vlookup': vlookup,
-        'index': index,
-        'indirect': indirect,
-        'countifs': countifs,
-        'eomonth': eomonth,
-        'yearfrac': yearfrac,
-    }
-
-    for rule in rules:
-        try:
-            result = eval(rule['python_expression'], eval_globals)
-            results[rule['cell']] = result
-        except Exception as e:
-            logging.error(f"Error evaluating rule for cell {rule['cell']}: {e}")
-            results[rule['cell']] = None
-    return results
+    return RuleSet(rules).evaluate(data)
@@ -1,8 +1,13 @@
+import logging
 import os
-from openpyxl import load_workbook
+from collections import Counter
+from openpyxl.utils import get_column_letter
 
+from src.conversion.sheet_store import SheetStore, compact_values
+from src.utils.xlsx_reader import XlsxReader
 
-def extract_data_and_formulas_from_excel(file_path):
+
+def extract_data_and_formulas_from_excel(file_path, sparse=False):
     """Extracts formulas, cell data, and key-value mappings from an Excel file.
     Detects explicit Key/Value tables (two columns labeled 'Key' and 'Value') and
     also implicit label/value pairs without headers (e.g., labels in one column and values in the next).
@@ -10,162 +15,225 @@ def extract_data_and_formulas_from_excel(file_path):
     each data cell to a derived key of the form '<row_key>:<column_header>'.
     Returns per sheet:
       - formulas: list of {cell, formula}
-      - data: dict of cell_reference -> value
+      - data: SheetStore of cell_reference -> value (a compact, dict-compatible mapping; with
+        sparse=True an IndexedSheet instead when the cells with data are too scattered)
       - key_values: dict of key -> value
       - cell_to_key: dict of value_cell_reference -> key (e.g., 'B12' -> 'Engine' or 'Color:Choice1')
-    """
-    workbook = load_workbook(filename=file_path, data_only=True)  # Use data_only=True to get values
-    formulas_workbook = load_workbook(filename=file_path, data_only=False)
+    Each sheet's XML is read once, collecting cached values and formula text in the same pass.
 
+    With sparse=True blank cells (no value and no formula) are skipped entirely, so
+    formatting-only regions cost nothing and the used range is trimmed to the cells that
+    hold data; `data` then only contains those cells and missing cells read as blank.
+    """
     extracted_data = {}
 
-    for sheet_name in workbook.sheetnames:
-        ws = workbook[sheet_name]
-        formulas_ws = formulas_workbook[sheet_name]
-
-        formulas_in_sheet = []
-        data_in_sheet = {}
-        key_values = {}
-        cell_to_key = {}
-
-        # Collect raw cell values
-        for row in ws.iter_rows():
-            for cell in row:
-                data_in_sheet[cell.coordinate] = cell.value
-
-        # Collect formulas (use non-data_only workbook)
-        for row in formulas_ws.iter_rows():
-            for cell in row:
-                if cell.data_type == 'f' and cell.value:
-                    formulas_in_sheet.append({
-                        "cell": cell.coordinate,
-                        "formula": f"={cell.value}" if not str(cell.value).startswith('=') else str(cell.value)
-                    })
-
-        # Try to detect a Key/Value header row within the first few rows
-        header_found = False
-        header_row_idx = None
-        key_col_letter = None
-        value_col_letter = None
-
-        max_scan_rows = min(10, ws.max_row)
-        for r in range(1, max_scan_rows + 1):
-            row_values = {cell.column_letter: (cell.value.strip() if isinstance(cell.value, str) else cell.value)
-                          for cell in ws[r] if cell.value is not None}
-            key_cols = [col for col, val in row_values.items() if isinstance(val, str) and val.lower() == 'key']
-            value_cols = [col for col, val in row_values.items() if isinstance(val, str) and val.lower() == 'value']
-            if key_cols and value_cols:
-                key_col_letter = key_cols[0]
-                value_col_letter = value_cols[0]
-                header_row_idx = r
-                header_found = True
-                break
+    with XlsxReader(file_path) as reader:
+        for sheet_name in reader.sheetnames:
+            extracted_data[sheet_name] = _extract_sheet(reader.iter_cells(sheet_name), sparse, sheet_name)
 
-        # If key/value layout found, build the mappings
-        if header_found and key_col_letter and value_col_letter and header_row_idx:
-            for r in range(header_row_idx + 1, ws.max_row + 1):
-                key_cell = f"{key_col_letter}{r}"
-                val_cell = f"{value_col_letter}{r}"
-                key = ws[key_cell].value
-                val = ws[val_cell].value
-                if key is None:
-                    continue
+    return extracted_data
+
+
+def _extract_sheet(cells, sparse=False, sheet_name=None):
+    """Build the per-sheet extraction result from (row, column, value, formula) records."""
+    formulas_in_sheet = []
+
+    # Collect cached values and formulas in one pass
+    values = {}
+    max_row = max_column = 1
+    reported_rows = reported_columns = 0
+    for row, column, value, formula in cells:
+        if sparse:
+            if row > reported_rows:
+                reported_rows = row
+            if column > reported_columns:
+                reported_columns = column
+            if value is None and not formula:
+                # Styled or otherwise empty cell
+                continue
+        values[(row, column)] = value
+        if row > max_row:
+            max_row = row
+        if column > max_column:
+            max_column = column
+        if formula:
+            formulas_in_sheet.append({
+                "cell": f"{get_column_letter(column)}{row}",
+                "formula": formula,
+            })
+
+    column_letters = [get_column_letter(c) for c in range(1, max_column + 1)]
+    if sparse:
+        # Only cells holding data; the used range ends at the last of them
+        if reported_rows * reported_columns > 2 * max_row * max_column:
+            logging.info(f"{sheet_name}: trimmed phantom used range "
+                         f"A1:{get_column_letter(reported_columns)}{reported_rows} to "
+                         f"A1:{column_letters[-1]}{max_row} ({len(values)} cells with data)")
+        data_in_sheet = compact_values(values, max_row, max_column)
+    else:
+        # Raw cell values for the whole used range, as openpyxl's iter_rows() reports it
+        data_in_sheet = SheetStore.from_values(values, max_row, max_column) if values else SheetStore()
+
+    key_values, cell_to_key = _detect_key_values(values, max_row, max_column, column_letters)
+
+    return {
+        "formulas": formulas_in_sheet,
+        "data": data_in_sheet,
+        "key_values": key_values,
+        "cell_to_key": cell_to_key,
+    }
+
+
+# Rows searched for a Key/Value header, and for a criteria-matrix header
+_HEADER_SCAN_ROWS = 10
+_MATRIX_SCAN_ROWS = 20
+# Leftmost label columns tried as label/value pairs when there is no header
+_PAIR_SCAN_COLUMNS = 10
+
+
+class _LayoutStats:
+    """
+    Statistics for layout detection, gathered in one pass over the non-empty cells:
+    the cells of the first rows (where headers are looked for), per-column non-null and
+    string counts, and for each candidate label column the number of rows with a label
+    (a string other than 'Key'/'Value') and a value right of it.
+    """
+
+    def __init__(self, values):
+        self.top_rows = {}
+        self.non_null = Counter()
+        self.strings = Counter()
+        self.pair_matches = Counter()
+        for (row, col), value in values.items():
+            if value is None:
+                continue
+            self.non_null[col] += 1
+            if isinstance(value, str):
+                self.strings[col] += 1
+            if row <= _MATRIX_SCAN_ROWS:
+                self.top_rows.setdefault(row, {})[col] = value
+            if 1 < col <= _PAIR_SCAN_COLUMNS + 1:
+                label = values.get((row, col - 1))
+                if isinstance(label, str) and label.strip() not in ("Key", "Value"):
+                    self.pair_matches[col - 1] += 1
+
+    def row(self, r):
+        """Non-empty cells of a top row as {col: value}, in column order."""
+        return dict(sorted(self.top_rows.get(r, {}).items()))
+
+
+def _column_cells(values, col, first_row=1):
+    """(row, value) of the non-empty cells of one column from `first_row` down, in row order."""
+    return sorted((row, value) for (row, c), value in values.items()
+                  if c == col and row >= first_row and value is not None)
+
+
+def _detect_key_values(values, max_row, max_column, column_letters):
+    """
+    Detect Key/Value tables, label/value column pairs and criteria matrices.
+    Returns (key_values, cell_to_key).
+    """
+    key_values = {}
+    cell_to_key = {}
+    stats = _LayoutStats(values)
+
+    def cell_value(r, c):
+        return values.get((r, c))
+
+    # Try to detect a Key/Value header row within the first few rows
+    header_found = False
+    header_row_idx = None
+    key_col_idx = None
+    value_col_idx = None
+
+    max_scan_rows = min(_HEADER_SCAN_ROWS, max_row)
+    for r in range(1, max_scan_rows + 1):
+        row_values = {c: v.strip() if isinstance(v, str) else v for c, v in stats.row(r).items()}
+        key_cols = [col for col, val in row_values.items() if isinstance(val, str) and val.lower() == 'key']
+        value_cols = [col for col, val in row_values.items() if isinstance(val, str) and val.lower() == 'value']
+        if key_cols and value_cols:
+            key_col_idx = key_cols[0]
+            value_col_idx = value_cols[0]
+            header_row_idx = r
+            header_found = True
+            break
+
+    # If key/value layout found, build the mappings
+    if header_found and key_col_idx and value_col_idx and header_row_idx:
+        value_col_letter = column_letters[value_col_idx - 1]
+        for r, key in _column_cells(values, key_col_idx, header_row_idx + 1):
+            if isinstance(key, str):
+                key = key.strip()
+            if key == "":
+                continue
+            key_values[key] = cell_value(r, value_col_idx)
+            cell_to_key[f"{value_col_letter}{r}"] = key
+    else:
+        # Heuristic: find adjacent label/value columns without headers
+        # Strategy: count rows where the left cell is a non-empty string and the right cell
+        # is non-empty (numeric or string), per pair of adjacent columns. Pick the pair
+        # with max matches.
+        max_matches = 0
+        best_pair = None  # (label_col, value_col)
+        for col_idx in range(1, min(max_column, _PAIR_SCAN_COLUMNS) + 1):
+            if col_idx >= max_column or not stats.strings[col_idx] or not stats.non_null[col_idx + 1]:
+                continue
+            matches = stats.pair_matches[col_idx]
+            if matches > max_matches and matches >= 3:  # need at least a few rows to be credible
+                max_matches = matches
+                best_pair = (col_idx, col_idx + 1)
+        if best_pair:
+            label_col, value_col = best_pair
+            value_col_letter = column_letters[value_col - 1]
+            for r, key in _column_cells(values, label_col):
                 if isinstance(key, str):
-                    key = key.strip()
-                if key == "":
-                    continue
-                key_values[key] = val
-                cell_to_key[val_cell] = key
-        else:
-            # Heuristic: find adjacent label/value columns without headers
-            # Strategy: scan pairs of adjacent columns and count rows where left cell is a non-empty string
-            # and right cell is non-empty (numeric or string). Pick the pair with max matches.
-            max_matches = 0
-            best_pair = None  # (label_col_letter, value_col_letter)
-            # Limit scan to first 5 non-empty columns to keep this cheap
-            non_empty_cols = list(range(1, min(ws.max_column, 10) + 1))
-            for col_idx in non_empty_cols:
-                if col_idx >= ws.max_column:
+                    k = key.strip()
+                    if k:
+                        key_values[k] = cell_value(r, value_col)
+                        cell_to_key[f"{value_col_letter}{r}"] = k
+
+    # Detect criteria matrices: find a header row containing a 'Key' header and other non-empty headers.
+    # For each row under it, map value cells to derived semantic keys '<row_key>:<header>'.
+    criteria_header_row = None
+    criteria_key_col_idx = None
+    criteria_headers = {}  # col_index -> header string
+
+    for r in range(1, min(max_row, _MATRIX_SCAN_ROWS) + 1):
+        # Build a map of column index -> header value for row r
+        headers_this_row = {}
+        key_col_idx_candidate = None
+        for c, v in stats.row(r).items():
+            if isinstance(v, str):
+                vv = v.strip()
+                headers_this_row[c] = vv
+                if vv.lower() == 'key':
+                    key_col_idx_candidate = c
+        if key_col_idx_candidate is not None:
+            # Build headers excluding the 'Key' column (and exclude a 'Value' column if present on same row)
+            local_headers = {}
+            for c, hv in headers_this_row.items():
+                if c == key_col_idx_candidate:
                     continue
-                label_col = col_idx
-                value_col = col_idx + 1
-                matches = 0
-                for r in range(1, ws.max_row + 1):
-                    lcell = ws.cell(row=r, column=label_col)
-                    vcell = ws.cell(row=r, column=value_col)
-                    lval = lcell.value
-                    vval = vcell.value
-                    if isinstance(lval, str) and lval.strip() not in ("Key", "Value") and vval is not None:
-                        matches += 1
-                if matches > max_matches and matches >= 3:  # need at least a few rows to be credible
-                    max_matches = matches
-                    best_pair = (label_col, value_col)
-            if best_pair:
-                label_col, value_col = best_pair
-                for r in range(1, ws.max_row + 1):
-                    lcell = ws.cell(row=r, column=label_col)
-                    vcell = ws.cell(row=r, column=value_col)
-                    key = lcell.value
-                    val = vcell.value
-                    if isinstance(key, str):
-                        k = key.strip()
-                        if k:
-                            key_values[k] = val
-                            cell_to_key[vcell.coordinate] = k
-
-        # Detect criteria matrices: find a header row containing a 'Key' header and other non-empty headers.
-        # For each row under it, map value cells to derived semantic keys '<row_key>:<header>'.
-        criteria_header_row = None
-        criteria_key_col_idx = None
-        criteria_headers = {}  # col_index -> header string
-
-        for r in range(1, min(ws.max_row, 20) + 1):
-            # Build a map of column index -> header value for row r
-            headers_this_row = {}
-            key_col_idx_candidate = None
-            for c in range(1, ws.max_column + 1):
-                v = ws.cell(row=r, column=c).value
-                if isinstance(v, str):
-                    vv = v.strip()
-                    headers_this_row[c] = vv
-                    if vv.lower() == 'key':
-                        key_col_idx_candidate = c
-            if key_col_idx_candidate is not None:
-                # Build headers excluding the 'Key' column (and exclude a 'Value' column if present on same row)
-                local_headers = {}
-                for c, hv in headers_this_row.items():
-                    if c == key_col_idx_candidate:
-                        continue
-                    if hv.lower() == 'value':
-                        # skip VALUE column to avoid duplicating simple key/value pairs
-                        continue
-                    if hv:
-                        local_headers[c] = hv
-                if local_headers:
-                    criteria_header_row = r
-                    criteria_key_col_idx = key_col_idx_candidate
-                    criteria_headers = local_headers
-                    break
-
-        if criteria_header_row and criteria_key_col_idx and criteria_headers:
-            # Iterate rows under header until a blank key
-            for rr in range(criteria_header_row + 1, ws.max_row + 1):
-                row_key_val = ws.cell(row=rr, column=criteria_key_col_idx).value
-                if not isinstance(row_key_val, str) or not row_key_val.strip():
+                if hv.lower() == 'value':
+                    # skip VALUE column to avoid duplicating simple key/value pairs
                     continue
-                row_key = row_key_val.strip()
-                for c_idx, header_text in criteria_headers.items():
-                    vcell = ws.cell(row=rr, column=c_idx)
-                    coord = vcell.coordinate
-                    derived_key = f"{row_key}:{header_text}"
-                    cell_to_key[coord] = derived_key
-                    key_values[derived_key] = vcell.value
-
-        extracted_data[sheet_name] = {
-            "formulas": formulas_in_sheet,
-            "data": data_in_sheet,
-            "key_values": key_values,
-            "cell_to_key": cell_to_key,
-        }
-
-    return extracted_data
\ No newline at end of file
+                if hv:
+                    local_headers[c] = hv
+            if local_headers:
+                criteria_header_row = r
+                criteria_key_col_idx = key_col_idx_candidate
+                criteria_headers = local_headers
+                break
+
+    if criteria_header_row and criteria_key_col_idx and criteria_headers:
+        for rr, row_key_val in _column_cells(values, criteria_key_col_idx, criteria_header_row + 1):
+            if not isinstance(row_key_val, str) or not row_key_val.strip():
+                continue
+            row_key = row_key_val.strip()
+            for c_idx, header_text in criteria_headers.items():
+                coord = f"{column_letters[c_idx - 1]}{rr}"
+                derived_key = f"{row_key}:{header_text}"
+                cell_to_key[coord] = derived_key
+                key_values[derived_key] = cell_value(rr, c_idx)
+
+    return key_values, cell_to_key
@@ -2,12 +2,17 @@ from flask import Flask, render_template, jsonify, request
 import json
 import os
 from pathlib import Path
+from typing import Optional
 from werkzeug.utils import secure_filename
 
 from src.utils.scrape import extract_data_and_formulas_from_excel
+from src.conversion.cache import ConversionCache
 from src.conversion.converter import ExcelToPythonConverter, build_dependency_graph, topological_sort
+from src.conversion.parallel import convert_formulas
 from src.conversion.rules_generator import generate_python_rules_file
+from src.conversion.sheet_store import compact_sheet, index_sheets
 from src.evaluation.evaluator import evaluate_rules
+from src.evaluation.engine import RuleEngine
 
 # Resolve project root (two levels up from this file: src/utils/web_ui.py -> project root)
 CURRENT_FILE = Path(__file__).resolve()
@@ -17,6 +22,8 @@ STATIC_DIR = PROJECT_ROOT / 'static'
 
 # Explicitly set template & static folders so running from any CWD works
 app = Flask(__name__, template_folder=str(TEMPLATES_DIR), static_folder=str(STATIC_DIR))
+# Re-uploads of the same workbook are served from the extraction cache (None disables it)
+app.config['EXTRACTION_CACHE'] = ConversionCache(str(PROJECT_ROOT / 'data' / 'cache'))
 
 
 def load_extracted_data():
@@ -43,9 +50,16 @@ def get_data():
     return jsonify(data)
 
 
-def process_excel_file(file_path: str, include_code: bool = False, strict: bool = False):
-    """Process a single Excel file path through conversion and evaluation."""
-    extracted = extract_data_and_formulas_from_excel(file_path)
+def process_excel_file(file_path: str, include_code: bool = False, strict: bool = False, workers: int = 1,
+                       cache: Optional[ConversionCache] = None):
+    """Process a single Excel file path through conversion and evaluation.
+    `workers` > 1 converts formulas on a process pool (0 = one per CPU).
+    With a `cache`, a workbook whose bytes were seen before is not parsed again.
+    """
+    if cache:
+        extracted = cache.extract(file_path, extract_data_and_formulas_from_excel)
+    else:
+        extracted = extract_data_and_formulas_from_excel(file_path)
 
     all_formulas = []
     all_data = {}
@@ -62,8 +76,10 @@ def process_excel_file(file_path: str, include_code: bool = False, strict: bool
         # data model
         cell_values = sheet_data.get("data", {})
         key_values = sheet_data.get("key_values", {})
-        all_data.setdefault(sheet_name, {})
-        all_data[sheet_name].update(cell_values)
+        if sheet_name in all_data:
+            all_data[sheet_name].update(cell_values)
+        else:
+            all_data[sheet_name] = compact_sheet(cell_values)
         all_data[sheet_name]['by_key'] = key_values
         # semantic map
         sheet_cell_to_key.setdefault(sheet_name, {})
@@ -74,18 +90,21 @@ def process_excel_file(file_path: str, include_code: bool = False, strict: bool
 
     converted = []
     errors = []
-    for f in all_formulas:
-        try:
-            conv = converter.analyze_formula(f["formula"], f["cell"], f["sheet"], shared_data)
+    results = convert_formulas(all_formulas, shared_data, workers=workers, converter=converter)
+    for f, (conv, error) in zip(all_formulas, results):
+        if conv is not None:
             converted.append(conv)
-        except Exception as e:
-            errors.append({"cell": f["cell"], "sheet": f["sheet"], "error": str(e)})
+        else:
+            errors.append({"cell": f["cell"], "sheet": f["sheet"], "error": error})
 
     response = {
         "file": os.path.basename(file_path),
         "converted_count": len(converted),
         "errors": errors,
+        "parse_cache": converter.parse_cache.stats(),
     }
+    if cache:
+        response["extraction_cache"] = cache.stats()
 
     if converted:
         graph = build_dependency_graph(converted)
@@ -98,8 +117,7 @@ def process_excel_file(file_path: str, include_code: bool = False, strict: bool
         # rules summary
         summary = []
         for conv in converted:
-            node_id = f"{conv.sheet}!{conv.cell_reference}"
-            deps = list(conv.dependencies.predecessors(node_id))
+            deps = conv.dependency_nodes()
             summary.append({
                 "cell": conv.cell_reference,
                 "sheet": conv.sheet,
@@ -112,10 +130,16 @@ def process_excel_file(file_path: str, include_code: bool = False, strict: bool
                 "unresolved_inputs": conv.unresolved_inputs,
             })
 
-        
-        eval_results = evaluate_rules(summary, all_data)
-        for item in summary:
-            item['evaluation_result'] = eval_results.get(item['cell'])
+        if order:
+            engine = RuleEngine(summary, graph, sheet_cell_to_key)
+            eval_results = engine.evaluate(index_sheets(all_data))
+            for item in summary:
+                item['evaluation_result'] = eval_results.get(f"{item['sheet']}!{item['cell']}")
+        else:
+            # No dependency order (cycle): evaluate each rule against the extracted values
+            eval_results = evaluate_rules(summary, all_data)
+            for item in summary:
+                item['evaluation_result'] = eval_results.get(item['cell'])
 
         response.update({
             "sorted_cells": order,
@@ -123,10 +147,7 @@ def process_excel_file(file_path: str, include_code: bool = False, strict: bool
         })
 
         if include_code:
-            # Keep order alignment
-            formula_map = {f"{f.sheet}!{f.cell_reference}": f for f in converted}
-            sorted_formulas = [formula_map[c] for c in order if c in formula_map]
-            code = generate_python_rules_file(converter, sorted_formulas, shared_data, order)
+            code = generate_python_rules_file(converter, converted, shared_data, order)
             response["generated_code"] = code
 
     return response
@@ -151,7 +172,9 @@ def convert_endpoint():
     include_code = request.args.get('include_code') in ('1', 'true', 'True')
     strict = request.args.get('strict') in ('1', 'true', 'True')
 
-    result = process_excel_file(file_path, include_code=include_code, strict=strict)
+    result = process_excel_file(file_path, include_code=include_code, strict=strict,
+                                workers=app.config.get('CONVERT_WORKERS', 1),
+                                cache=app.config.get('EXTRACTION_CACHE'))
     return jsonify(result)
 
 
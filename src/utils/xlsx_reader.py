@@ -0,0 +1,217 @@
+"""
+Single-pass streaming reader for .xlsx/.xlsm workbooks.
+
+openpyxl returns either formulas (data_only=False) or cached values (data_only=True)
+for a cell, so getting both means loading the whole workbook twice. This reader streams
+each worksheet's XML once and yields a cell's cached value and formula text together,
+clearing parsed elements as it goes so memory does not grow with sheet size.
+Values are converted the way openpyxl converts them (shared strings, booleans, int/float
+casting, date-formatted serials and shared-formula translation).
+"""
+
+import posixpath
+import zipfile
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from openpyxl.formula.translate import Translator
+from openpyxl.reader.strings import read_string_table
+from openpyxl.styles.stylesheet import Stylesheet
+from openpyxl.utils.cell import coordinate_to_tuple
+from openpyxl.utils.datetime import CALENDAR_MAC_1904, CALENDAR_WINDOWS_1900, from_excel, from_ISO8601
+from openpyxl.xml.constants import PKG_REL_NS, REL_NS, SHEET_MAIN_NS
+from openpyxl.xml.functions import fromstring, iterparse
+
+_ROW_TAG = f'{{{SHEET_MAIN_NS}}}row'
+_CELL_TAG = f'{{{SHEET_MAIN_NS}}}c'
+_VALUE_TAG = f'{{{SHEET_MAIN_NS}}}v'
+_FORMULA_TAG = f'{{{SHEET_MAIN_NS}}}f'
+_INLINE_STRING_TAG = f'{{{SHEET_MAIN_NS}}}is'
+_TEXT_TAG = f'{{{SHEET_MAIN_NS}}}t'
+_SHEET_DATA_TAG = f'{{{SHEET_MAIN_NS}}}sheetData'
+
+_OFFICE_DOCUMENT_REL = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument'
+_WORKSHEET_REL = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet'
+
+# (row, column, cached value, formula text starting with '=' or None)
+CellRecord = Tuple[int, int, object, Optional[str]]
+
+
+def _cast_number(value: str):
+    """Convert a numeric string to int or float, as openpyxl does."""
+    if '.' in value or 'E' in value or 'e' in value:
+        return float(value)
+    return int(value)
+
+
+def _rels_path(part: str) -> str:
+    folder, name = posixpath.split(part)
+    return posixpath.join(folder, '_rels', f'{name}.rels')
+
+
+def _resolve_target(source_part: str, target: str) -> str:
+    if target.startswith('/'):
+        return target.lstrip('/')
+    return posixpath.normpath(posixpath.join(posixpath.dirname(source_part), target))
+
+
+class XlsxReader:
+    """Stream cells (cached value and formula together) from an .xlsx/.xlsm file.
+
+    Usage:
+        with XlsxReader(path) as reader:
+            for sheet_name in reader.sheetnames:
+                for row, col, value, formula in reader.iter_cells(sheet_name):
+                    ...
+    """
+
+    def __init__(self, file_path: str):
+        self.archive = zipfile.ZipFile(file_path)
+        self._sheet_parts: Dict[str, str] = {}
+        self.epoch = CALENDAR_WINDOWS_1900
+        self._read_workbook()
+        self.shared_strings = self._read_shared_strings()
+        self.date_formats, self.timedelta_formats = self._read_date_styles()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self) -> None:
+        self.archive.close()
+
+    @property
+    def sheetnames(self) -> List[str]:
+        return list(self._sheet_parts)
+
+    # --- workbook-level parts ---
+    def _read_rels(self, part: str) -> Dict[str, Tuple[str, str]]:
+        """Map relationship id -> (type, resolved target part) for a part."""
+        try:
+            root = fromstring(self.archive.read(_rels_path(part)))
+        except KeyError:
+            return {}
+        rels = {}
+        for rel in root.findall(f'{{{PKG_REL_NS}}}Relationship'):
+            rels[rel.get('Id')] = (rel.get('Type'), _resolve_target(part, rel.get('Target')))
+        return rels
+
+    def _read_workbook(self) -> None:
+        package_rels = self._read_rels('')
+        self.workbook_part = next(
+            (target for rel_type, target in package_rels.values() if rel_type == _OFFICE_DOCUMENT_REL),
+            'xl/workbook.xml'
+        )
+        self._workbook_rels = self._read_rels(self.workbook_part)
+
+        root = fromstring(self.archive.read(self.workbook_part))
+        workbook_pr = root.find(f'{{{SHEET_MAIN_NS}}}workbookPr')
+        if workbook_pr is not None and workbook_pr.get('date1904') in ('1', 'true'):
+            self.epoch = CALENDAR_MAC_1904
+
+        for sheet in root.iter(f'{{{SHEET_MAIN_NS}}}sheet'):
+            rel_type, target = self._workbook_rels.get(sheet.get(f'{{{REL_NS}}}id'), (None, None))
+            # Chartsheets and dialog sheets have no cells
+            if rel_type == _WORKSHEET_REL:
+                self._sheet_parts[sheet.get('name')] = target
+
+    def _part_of_type(self, suffix: str) -> Optional[str]:
+        for rel_type, target in self._workbook_rels.values():
+            if rel_type.endswith(suffix):
+                return target
+        return None
+
+    def _read_shared_strings(self) -> List[str]:
+        part = self._part_of_type('/sharedStrings')
+        if not part:
+            return []
+        with self.archive.open(part) as src:
+            return read_string_table(src)
+
+    def _read_date_styles(self):
+        part = self._part_of_type('/styles')
+        if not part:
+            return set(), set()
+        stylesheet = Stylesheet.from_tree(fromstring(self.archive.read(part)))
+        return stylesheet.date_formats, stylesheet.timedelta_formats
+
+    # --- worksheet cells ---
+    def iter_cells(self, sheet_name: str) -> Iterator[CellRecord]:
+        """Yield (row, column, value, formula) for every <c> element of a sheet, in file order."""
+        shared_formulae: Dict[str, Translator] = {}
+        sheet_data = None
+        row_counter = 0
+        col_counter = 0
+        with self.archive.open(self._sheet_parts[sheet_name]) as src:
+            for event, element in iterparse(src, events=('start', 'end')):
+                tag = element.tag
+                if event == 'start':
+                    if tag == _ROW_TAG:
+                        row_counter = int(element.get('r', row_counter + 1))
+                        col_counter = 0
+                    elif tag == _SHEET_DATA_TAG:
+                        sheet_data = element
+                    continue
+                if tag == _CELL_TAG:
+                    coordinate = element.get('r')
+                    if coordinate:
+                        row, column = coordinate_to_tuple(coordinate)
+                        col_counter = column
+                    else:
+                        col_counter += 1
+                        row, column = row_counter, col_counter
+                    value = self._cell_value(element, coordinate)
+                    formula = self._cell_formula(element, coordinate, shared_formulae)
+                    yield row, column, value, formula
+                elif tag == _ROW_TAG:
+                    # Cells have been consumed; detach the row to keep memory bounded
+                    element.clear()
+                    if sheet_data is not None:
+                        sheet_data.remove(element)
+
+    def _cell_value(self, element, coordinate):
+        data_type = element.get('t', 'n')
+        if data_type == 'inlineStr':
+            inline = element.find(_INLINE_STRING_TAG)
+            if inline is None:
+                return None
+            return ''.join(t.text or '' for t in inline.iter(_TEXT_TAG))
+
+        value = element.findtext(_VALUE_TAG, None) or None
+        if value is None:
+            return None
+        if data_type == 'n':
+            value = _cast_number(value)
+            style_id = int(element.get('s', 0))
+            if style_id in self.date_formats:
+                try:
+                    return from_excel(value, self.epoch, timedelta=style_id in self.timedelta_formats)
+                except (OverflowError, ValueError):
+                    return "#VALUE!"
+            return value
+        if data_type == 's':
+            return self.shared_strings[int(value)]
+        if data_type == 'b':
+            return bool(int(value))
+        if data_type == 'd':
+            return from_ISO8601(value)
+        # 'str' (formula string result) and 'e' (error) are kept as text
+        return value
+
+    def _cell_formula(self, element, coordinate, shared_formulae) -> Optional[str]:
+        formula = element.find(_FORMULA_TAG)
+        if formula is None:
+            return None
+        formula_type = formula.get('t')
+        if formula_type == 'dataTable':
+            # What-if data tables have no formula text to convert
+            return None
+        value = "=" + (formula.text or "")
+        if formula_type == 'shared':
+            idx = formula.get('si')
+            if idx in shared_formulae:
+                return shared_formulae[idx].translate_formula(coordinate)
+            if value != "=":
+                shared_formulae[idx] = Translator(value, coordinate)
+        return value
@@ -0,0 +1,62 @@
+import json
+
+from openpyxl import Workbook
+
+from src.conversion.batch_process import (
+    batch_process_files, extract_customer_preference_table, find_customer_preference_data,
+    find_customer_preference_table, read_ndjson
+)
+
+
+def _save_workbook(path, value):
+    wb = Workbook()
+    ws = wb.active
+    ws['A1'], ws['B1'] = 'Key', 'Value'
+    ws['A2'], ws['B2'], ws['C2'] = 'rate', value, '=B2*2'
+    wb.save(path)
+
+
+def test_preference_table_is_read_in_one_pass():
+    ws = Workbook().active
+    ws['B2'] = "Customer preferences"
+    for row in range(3, 503):
+        ws.cell(row=row, column=2, value=f"pref{row}")
+        ws.cell(row=row, column=3, value="GER")
+        ws.cell(row=row, column=4, value=row)
+    ws['B600'] = "after the blank row"
+
+    calls = []
+    iter_rows = ws.iter_rows
+    ws.iter_rows = lambda *args, **kwargs: calls.append(kwargs) or iter_rows(*args, **kwargs)
+
+    columns = find_customer_preference_table(ws)
+    assert columns == {'header_row': 2, 'start_col': 2, 'data_start_row': 3}
+    table = extract_customer_preference_table(ws, columns)
+    assert len(table["preferences"]) == 500
+    assert table["preferences"]["pref7"] == {"preference_values": ["GER", "7"]}
+    assert len(calls) == 2, "each scanner should read the sheet in a single pass"
+
+    assert find_customer_preference_data(ws) == {'preference': 2, 'header_row': 2, 'data_start_row': 3}
+
+
+def test_ndjson_output_streams_and_resumes(tmp_path, capsys):
+    input_dir, output = tmp_path / 'in', tmp_path / 'out.ndjson'
+    input_dir.mkdir()
+    for i in range(2):
+        _save_workbook(input_dir / f'book{i}.xlsx', i)
+    batch_process_files(str(input_dir), str(output), output_format='ndjson')
+    lines = output.read_text().splitlines()
+    assert len(lines) == 2 and all(json.loads(line)["file"].startswith('book') for line in lines)
+
+    # A run killed mid-write leaves a partial line; resuming drops it and skips finished files
+    _save_workbook(input_dir / 'book2.xlsx', 2)
+    with open(output, 'a') as f:
+        f.write('{"file": "book2.xlsx", "da')
+    capsys.readouterr()
+    batch_process_files(str(input_dir), str(output), output_format='ndjson', resume=True)
+    assert "Processed 1 of 1 files" in capsys.readouterr().out
+
+    records = dict(read_ndjson(str(output)))
+    assert sorted(records) == ['book0.xlsx', 'book1.xlsx', 'book2.xlsx']
+    assert records['book2.xlsx']["key_value_data"] == {'Sheet': {'rate': 2}}
+    assert records['book1.xlsx']["formulas"][0]["formula"] == '=B2*2'
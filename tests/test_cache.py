@@ -0,0 +1,96 @@
+import os
+
+from src.conversion.cache import ConversionCache, referenced_sheets
+from src.conversion.converter import ExcelToPythonConverter
+
+shared_data = {
+    'cell_to_key_map': {
+        'Source': {'B5': 'Mileage'},
+        'Other': {'A1': 'Unrelated'},
+    },
+    'strict_no_cells': False,
+}
+
+formulas = [
+    {"formula": "=Source!B5*2", "cell": "C1", "sheet": "Formulas"},
+    {"formula": "=C1+1", "cell": "C2", "sheet": "Formulas"},
+]
+
+
+def test_referenced_sheets():
+    assert referenced_sheets(["=Source!B5+'My Sheet'!A1", "=A1"], "Formulas") == ["Formulas", "My Sheet", "Source"]
+
+
+def test_sheet_round_trip(tmp_path):
+    cache = ConversionCache(str(tmp_path))
+    converter = ExcelToPythonConverter({})
+    converted = [converter.analyze_formula(f["formula"], f["cell"], f["sheet"], shared_data) for f in formulas]
+    key = cache.sheet_key("Formulas", formulas, shared_data)
+
+    assert cache.load_sheet(key) is None
+    cache.store_sheet(key, converted, [])
+
+    reloaded = ConversionCache(str(tmp_path)).load_sheet(key)
+    assert [c.python_expression for c in reloaded["converted"]] == [c.python_expression for c in converted]
+    assert reloaded["errors"] == []
+
+
+def test_sheet_key_invalidation():
+    cache = ConversionCache("unused")
+    key = cache.sheet_key("Formulas", formulas, shared_data)
+
+    # Key maps of sheets the formulas don't reference don't matter
+    other_changed = dict(shared_data, cell_to_key_map=dict(shared_data['cell_to_key_map'], Other={}))
+    assert cache.sheet_key("Formulas", formulas, other_changed) == key
+
+    # Referenced key maps, settings and formula text do
+    source_changed = dict(shared_data, cell_to_key_map=dict(shared_data['cell_to_key_map'], Source={}))
+    assert cache.sheet_key("Formulas", formulas, source_changed) != key
+    assert cache.sheet_key("Formulas", formulas, dict(shared_data, strict_no_cells=True)) != key
+    edited = [formulas[0], dict(formulas[1], formula="=C1+2")]
+    assert cache.sheet_key("Formulas", edited, shared_data) != key
+
+
+def test_extract_is_cached_by_content(tmp_path):
+    workbook = tmp_path / "book.xlsx"
+    workbook.write_bytes(b"workbook bytes")
+    calls = []
+
+    def extract(path):
+        calls.append(path)
+        return {"Sheet1": {"formulas": []}}
+
+    cache = ConversionCache(str(tmp_path / "cache"))
+    assert cache.extract(str(workbook), extract) == {"Sheet1": {"formulas": []}}
+    assert cache.extract(str(workbook), extract) == {"Sheet1": {"formulas": []}}
+    assert len(calls) == 1
+
+    workbook.write_bytes(b"edited bytes")
+    cache.extract(str(workbook), extract)
+    assert len(calls) == 2
+    assert cache.stats() == {"hits": 1, "misses": 2, "evictions": 0}
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ConversionCache(str(tmp_path))
+    payload = b"x" * 1000
+    for key in ("a", "b", "c"):
+        cache.store_sheet(key, [payload], [])
+    entry_size = cache._path('sheets', 'a').stat().st_size
+    for age, key in enumerate(("a", "b", "c")):
+        os.utime(cache._path('sheets', key), ns=(10 ** 9 * (age + 1),) * 2)
+
+    # Reading "a" makes it the most recently used; "b" is now the oldest
+    capped = ConversionCache(str(tmp_path), max_bytes=3 * entry_size)
+    assert capped.load_sheet("a") is not None
+    capped.store_sheet("d", [payload], [])
+    assert capped.load_sheet("b") is None
+    assert all(capped.load_sheet(key) is not None for key in ("a", "c", "d"))
+    assert capped.stats() == {"hits": 4, "misses": 1, "evictions": 1}
+
+    # Re-storing a key replaces its entry without growing the running total
+    roomy = ConversionCache(str(tmp_path), max_bytes=10 * entry_size)
+    roomy.store_sheet("e", [payload], [])
+    for _ in range(5):
+        roomy.store_sheet("a", [payload], [])
+    assert roomy._total_bytes == 4 * entry_size
@@ -32,6 +32,12 @@ CONVERSION_TEST_CASES = [
     ('=IF(ISERROR(A1/B1),"Error",A1/B1)',
      '("Error" if is_error(lambda: (get_cell(data, \'TestSheet\', \'A1\') / get_cell(data, \'TestSheet\', \'B1\'))) else (get_cell(data, \'TestSheet\', \'A1\') / get_cell(data, \'TestSheet\', \'B1\')))'),
     ("=INDEX(A1:C3,2,3)", "index(data, 'TestSheet', 'A1:C3', 2, 3)"),
+    ('=COUNTIFS(A1:A5,">5",B1:B5,A1)',
+     'countifs(data, [(\'TestSheet\', \'A1:A5\', ">5"), (\'TestSheet\', \'B1:B5\', get_cell(data, \'TestSheet\', \'A1\'))])'),
+    ('=SUMIFS(C1:C5,A1:A5,">5",B1:B5,"x")',
+     'sumifs(data, (\'TestSheet\', \'C1:C5\'), [(\'TestSheet\', \'A1:A5\', ">5"), (\'TestSheet\', \'B1:B5\', "x")])'),
+    ('=AVERAGEIFS(C1:C5,A1:A5,"<>")', 'averageifs(data, (\'TestSheet\', \'C1:C5\'), [(\'TestSheet\', \'A1:A5\', "<>")])'),
+    ('=MAXIFS(Source!C1:C2,Source!C1:C2,">1")', 'maxifs(data, (\'Source\', \'C1:C2\'), [(\'Source\', \'C1:C2\', ">1")])'),
     # RIGHT function tests
     ('=RIGHT("Hello World",5)', 'right_text("Hello World", 5)'),
     ('=RIGHT(A1,3)', 'right_text(get_cell(data, \'TestSheet\', \'A1\'), 3)'),
@@ -146,4 +152,50 @@ def test_right_function_execution():
         else:
             result = input_str  # No bracket found
             
-        assert result == expected, f"Failed for '{input_str}': got '{result}', expected '{expected}'"
\ No newline at end of file
+        assert result == expected, f"Failed for '{input_str}': got '{result}', expected '{expected}'"
+
+
+def test_relative_r1c1_normalization():
+    """Copy-down formulas normalize to the same relative shape; literals are left alone."""
+    from src.conversion.converter import to_relative_r1c1
+    assert to_relative_r1c1("$B2/SUM($B$2:$B$9)", 2, 3) == "R[0]C2/SUM(R2C2:R9C2)"
+    assert to_relative_r1c1("$B3/SUM($B$2:$B$9)", 3, 3) == "R[0]C2/SUM(R2C2:R9C2)"
+    assert to_relative_r1c1('IF(A1="A1",Sheet1!B2,0)', 1, 2) == 'IF(R[0]C[-1]="A1",Sheet1!R[1]C[0],0)'
+
+
+def test_parse_cache_reuses_copy_down_shapes():
+    """Cached parse trees produce the same output as a fresh parse for every row."""
+    key_map = {'cell_to_key_map': {'Formulas': {'B3': 'Color'}}}
+    cached = ExcelToPythonConverter({})
+    for row in range(2, 6):
+        formula = f"=IF($B{row}>0,$B{row}/SUM($B$2:$B$9),D{row + 1})"
+        result = cached.analyze_formula(formula, f"C{row}", "Formulas", key_map)
+        fresh = ExcelToPythonConverter({}).analyze_formula(formula, f"C{row}", "Formulas", key_map)
+        assert result.python_expression == fresh.python_expression
+        assert set(result.dependencies) == set(fresh.dependencies)
+    assert cached.parse_cache.stats() == {"hits": 3, "misses": 1, "shapes": 1}
+
+
+def test_parse_cache_remembers_invalid_formulas():
+    cache_converter = ExcelToPythonConverter({})
+    for cell in ("A1", "A2"):
+        with pytest.raises(Exception, match="Invalid formula"):
+            cache_converter.analyze_formula("=SUM($A$1:)", cell, "TestSheet", shared_data)
+    assert cache_converter.parse_cache.stats()["misses"] == 1
+
+
+def test_parallel_conversion_matches_serial_order():
+    """Process-pool conversion returns results (and errors) aligned with the input."""
+    from src.conversion.parallel import convert_formulas
+    formulas = [{"formula": f"=$B{r}/SUM($B$2:$B$9)", "cell": f"C{r}", "sheet": "Sheet1"} for r in range(2, 10)]
+    formulas.insert(3, {"formula": "=SUM(A1:)", "cell": "D1", "sheet": "Sheet1"})
+
+    serial_converter, parallel_converter = ExcelToPythonConverter({}), ExcelToPythonConverter({})
+    serial = convert_formulas(formulas, shared_data, converter=serial_converter)
+    parallel = convert_formulas(formulas, shared_data, workers=2, chunk_size=3, converter=parallel_converter)
+
+    assert [c.python_expression if c else error for c, error in parallel] == \
+           [c.python_expression if c else error for c, error in serial]
+    assert parallel[3][0] is None and "Invalid formula" in parallel[3][1]
+    # Shapes parsed in the workers are merged, and counted once across workers
+    assert parallel_converter.parse_cache.stats()["shapes"] == serial_converter.parse_cache.stats()["shapes"] == 2
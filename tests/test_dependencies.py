@@ -0,0 +1,58 @@
+import random
+
+from src.conversion.converter import ExcelToPythonConverter, build_dependency_graph, topological_sort
+from src.conversion.dependencies import RangeContainment, parse_range_node
+from src.conversion.indexes import column_letter
+from src.evaluation.engine import RuleEngine
+
+
+def test_containment_matches_brute_force():
+    rng = random.Random(4)
+    ranges = set()
+    for _ in range(400):
+        rows = rng.randint(1, 60), rng.randint(1, 60)
+        cols = rng.randint(1, 40), rng.choice([rng.randint(1, 40), 1])
+        ranges.add(f"{rng.choice('ST')}!{column_letter(cols[0])}{rows[0]}:{column_letter(cols[1])}{rows[1]}")
+    containment = RangeContainment(ranges)
+    for _ in range(500):
+        sheet, row, col = rng.choice('ST'), rng.randint(1, 62), rng.randint(1, 42)
+        expected = {r for r in ranges if (lambda s, t, l, b, rt: s == sheet and t <= row <= b and l <= col <= rt)(
+            *parse_range_node(r))}
+        assert set(containment.containing(f"{sheet}!{column_letter(col)}{row}")) == expected
+    assert containment.containing("S:Key") == [] and containment.containing("U!A1") == []
+
+
+def test_graph_size_follows_references_not_area():
+    converter = ExcelToPythonConverter({})
+    shared_data = {'cell_to_key_map': {}}
+    converted = [converter.analyze_formula(f"=$B{row}/SUM($B$2:$B$9000)", f"C{row}", "S", shared_data)
+                 for row in range(2, 2002)]
+    # Totals past column Z and the column of ratios itself feed later formulas
+    converted.append(converter.analyze_formula("=SUM(C2:C2001)+SUM(Y1:AB3)", "D1", "S", shared_data))
+    graph = build_dependency_graph(converted)
+    assert graph.number_of_nodes() == 2 * 2000 + 4
+    # Per ratio: its two inputs, plus B{row} and C{row} each inside one range
+    assert graph.number_of_edges() == 4 * 2000 + 2
+    order = topological_sort(graph)
+    assert order.index("S!C2001") < order.index("S!C2:C2001") < order.index("S!D1")
+    assert "S!Y1:AB3" in graph
+
+
+def test_engine_recalculates_through_ranges():
+    converter = ExcelToPythonConverter({})
+    shared_data = {'cell_to_key_map': {}}
+    formulas = [("=SUM(A1:A3)", "B1"), ("=B1*2", "B2"), ("=SUM(AA1:AB2)", "C1")]
+    converted = [converter.analyze_formula(f, cell, "S", shared_data) for f, cell in formulas]
+    rules = [{"sheet": c.sheet, "cell": c.cell_reference, "python_expression": c.python_expression,
+              "dependencies": c.dependency_nodes()} for c in converted]
+    assert rules[0]["dependencies"] == ["S!A1:A3"]
+
+    data = {'S': {'A1': 1, 'A2': 2, 'A3': 3, 'AA1': 1, 'AB2': 1, 'by_key': {}}}
+    for graph in (build_dependency_graph(converted), None):
+        workbook = RuleEngine(rules[::-1], graph).bind(data)
+        assert workbook.values == {"S!B1": 6, "S!B2": 12, "S!C1": 2}
+        # A2 and AB1 are not graph nodes; their ranges are found through the containment index
+        workbook.set_value('S', 'A2', 20)
+        assert workbook.recalc() == {"S!B1": 24, "S!B2": 48}
+        workbook.set_value('S', 'AB1', 5)
+        assert workbook.recalc() == {"S!C1": 7}
@@ -0,0 +1,179 @@
+import pytest
+
+from src.conversion.converter import ExcelToPythonConverter, build_dependency_graph
+from src.evaluation.engine import RuleEngine
+from src.evaluation.scheduler import LevelScheduler
+
+cell_to_key_map = {
+    'Inputs': {'B1': 'Price', 'B2': 'Quantity'},
+    'Calc': {'A2': 'Total'},
+}
+
+
+def _data():
+    # Cached Excel values for the formula cells are deliberately stale
+    return {
+        'Inputs': {'B1': 10, 'B2': 3, 'by_key': {'Price': 10, 'Quantity': 3}},
+        'Calc': {'A1': 0, 'A2': 0, 'A3': 0, 'by_key': {'Total': 0}},
+    }
+
+
+def _engine():
+    formulas = [
+        ("=Inputs!B1*Inputs!B2", "A1"),
+        ("=A1+5", "A2"),
+        ("=Calc!A2*2", "A3"),
+    ]
+    converter = ExcelToPythonConverter({})
+    shared_data = {'cell_to_key_map': cell_to_key_map}
+    converted = [converter.analyze_formula(f, cell, "Calc", shared_data) for f, cell in formulas]
+    rules = [
+        {"sheet": c.sheet, "cell": c.cell_reference, "python_expression": c.python_expression}
+        for c in converted
+    ]
+    # Reverse the rules so evaluation order has to come from the graph
+    return RuleEngine(rules[::-1], build_dependency_graph(converted), cell_to_key_map)
+
+
+def test_dependents_read_computed_values():
+    data = _data()
+    results = _engine().evaluate(data)
+    assert results == {"Calc!A1": 30, "Calc!A2": 35, "Calc!A3": 70}
+    # The caller's data is left untouched
+    assert data['Calc']['A1'] == 0 and data['Calc']['by_key']['Total'] == 0
+
+
+def test_engine_is_reusable_across_datasets():
+    engine = _engine()
+    data = _data()
+    data['Inputs']['by_key']['Quantity'] = 4
+    assert engine.evaluate(data)["Calc!A3"] == 90
+    assert engine.evaluate(_data())["Calc!A3"] == 70
+
+
+def test_targets_only_evaluate_what_is_needed():
+    engine = _engine()
+    assert engine.plan(["Calc!A2"]) == ["Calc!A1", "Calc!A2"]
+    assert engine.evaluate(_data(), targets=["Calc!A2"]) == {"Calc!A1": 30, "Calc!A2": 35}
+
+
+def test_rules_without_graph_use_summary_dependencies():
+    rules = [
+        {"sheet": "S", "cell": "B1", "python_expression": "get_cell(data, 'S', 'A1') + 1",
+         "dependencies": ["S!A1"]},
+        {"sheet": "S", "cell": "A1", "python_expression": "41", "dependencies": []},
+    ]
+    assert RuleEngine(rules).evaluate({'S': {}}) == {"S!A1": 41, "S!B1": 42}
+
+
+def test_recalc_only_reevaluates_dependents():
+    engine = _engine()
+    workbook = engine.bind(_data())
+    assert workbook.values["Calc!A3"] == 70
+
+    workbook.set_value('Inputs', 'Quantity', 4)
+    assert workbook.recalc() == {"Calc!A1": 40, "Calc!A2": 45, "Calc!A3": 90}
+    assert workbook.get_value('Calc', 'Total') == 45
+
+    # Overriding a formula cell only recomputes what reads it
+    workbook.set_value('Calc', 'A2', 100)
+    assert workbook.recalc() == {"Calc!A3": 200}
+    assert workbook.recalc() == {}
+
+
+def test_set_value_by_cell_updates_key():
+    workbook = _engine().bind(_data())
+    workbook.set_value('Inputs', 'B1', 20)
+    assert workbook.get_value('Inputs', 'Price') == 20
+    assert workbook.recalc()["Calc!A3"] == 130
+
+
+def test_evaluate_batch_matches_per_record_evaluation():
+    engine = _engine()
+    records = [
+        {"Inputs:Price": 10, "Inputs:Quantity": 1},
+        {"Inputs:Quantity": 5},
+        {"Inputs!B1": 2, "Inputs:Quantity": 2},
+    ]
+    table = engine.evaluate_batch(_data(), records, targets=["Calc!A1", "Calc!A3"])
+    assert table == {"Calc!A1": [10, 50, 4], "Calc!A3": [30, 110, 18]}
+
+    columns = {"Inputs:Quantity": [1, 2, 3]}
+    assert engine.evaluate_batch(_data(), columns)["Calc!A2"] == [15, 25, 35]
+
+
+def test_level_scheduler_matches_sequential_evaluation():
+    # A wide first level of independent rules, then a total over all of them
+    rules = [{"sheet": "S", "cell": f"B{row}", "python_expression": f"get_cell(data, 'S', 'A{row}') * 2",
+              "dependencies": [f"S!A{row}"]} for row in range(1, 201)]
+    rules.append({"sheet": "S", "cell": "C1", "python_expression": "sum_range(data, 'S', 'B1', 'B200')",
+                  "dependencies": ["S!B1:B200"]})
+    rules.append({"sheet": "S", "cell": "C2", "python_expression": "get_cell(data, 'S', 'C1') + 1",
+                  "dependencies": ["S!C1"]})
+    engine = RuleEngine(rules[::-1])
+    assert [len(level) for level in engine.levels()] == [200, 1, 1]
+    assert engine.levels(["S!C2"])[1:] == [["S!C1"], ["S!C2"]]
+
+    data = {'S': {f"A{row}": row for row in range(1, 201)}}
+    expected = engine.evaluate(data)
+    with LevelScheduler(workers=4, min_parallel_cost=0) as scheduler:
+        assert engine.evaluate(data, scheduler=scheduler) == expected
+    assert expected["S!C2"] == 200 * 201 + 1
+    assert scheduler.parallel_levels == 1 and scheduler.inline_levels == 2
+
+    # Levels too cheap to be worth dispatching stay inline
+    with LevelScheduler(workers=4, min_parallel_cost=60) as scheduler:
+        assert engine.evaluate(data, scheduler=scheduler) == expected
+    assert scheduler.parallel_levels == 0
+
+
+def _circular_interest_rules():
+    converter = ExcelToPythonConverter({})
+    shared_data = {'cell_to_key_map': {}}
+    formulas = [("=B2*0.1", "B1"), ("=B3+B1", "B2"), ("=B2*2", "B4"), ("=B5+1", "B5")]
+    converted = [converter.analyze_formula(f, cell, "Debt", shared_data) for f, cell in formulas]
+    rules = [{"sheet": c.sheet, "cell": c.cell_reference, "python_expression": c.python_expression}
+             for c in converted]
+    return rules, build_dependency_graph(converted)
+
+
+def test_iterative_mode_solves_cycles():
+    rules, graph = _circular_interest_rules()
+    with pytest.raises(ValueError, match="Circular dependency detected!"):
+        RuleEngine(rules, graph)
+
+    engine = RuleEngine(rules, graph, iterative=True, max_iterations=50, max_change=1e-9)
+    assert engine.order.index("Debt!B4") > max(engine.order.index("Debt!B1"), engine.order.index("Debt!B2"))
+    results = engine.evaluate({'Debt': {'B1': 0, 'B2': 0, 'B3': 1000, 'B5': 0}})
+    # Interest on the debt including the interest itself: B1 = 0.1 * (1000 + B1)
+    assert results["Debt!B1"] == pytest.approx(1000 / 9)
+    assert results["Debt!B4"] == pytest.approx(2 * 10000 / 9)
+
+    interest, runaway = sorted(engine.cycle_stats, key=lambda stats: len(stats['cells']), reverse=True)
+    assert sorted(interest['cells']) == ["Debt!B1", "Debt!B2"] and interest['converged']
+    assert interest['iterations'] < 50
+    assert runaway == {'cells': ["Debt!B5"], 'iterations': 50, 'converged': False, 'max_change': 1}
+    assert results["Debt!B5"] == 50
+
+    workbook = engine.bind({'Debt': {'B1': 0, 'B2': 0, 'B3': 1000, 'B5': 0}})
+    workbook.set_value('Debt', 'B3', 2000)
+    assert workbook.recalc()["Debt!B1"] == pytest.approx(2000 / 9)
+
+
+def test_iterative_mode_starts_blank_cycle_members_at_zero_and_flags_errors():
+    converter = ExcelToPythonConverter({})
+    shared_data = {'cell_to_key_map': {}}
+    converted = [converter.analyze_formula(f, cell, "S", shared_data)
+                 for f, cell in [("=B1+B3", "B2"), ("=B2*0.05", "B3")]]
+    rules = [{"sheet": c.sheet, "cell": c.cell_reference, "python_expression": c.python_expression}
+             for c in converted]
+    engine = RuleEngine(rules, build_dependency_graph(converted), iterative=True, max_change=1e-9)
+
+    # Formula cells extracted without a cached value are None
+    results = engine.evaluate({'S': {'B1': 100, 'B2': None, 'B3': None}})
+    assert results["S!B2"] == pytest.approx(100 / 0.95)
+    assert engine.cycle_stats[0]['converged']
+
+    results = engine.evaluate({'S': {'B1': 'text', 'B2': None, 'B3': None}})
+    assert results == {"S!B2": None, "S!B3": None}
+    assert not engine.cycle_stats[0]['converged']
@@ -0,0 +1,136 @@
+import random
+
+import pytest
+
+from src.conversion.excel_functions import (
+    averageifs, averageifs_keys, compile_criteria, count_if_range, countifs, countifs_keys, evaluate_criteria,
+    index, maxifs, maxifs_keys, sum_if, sumifs, sumifs_keys, vlookup
+)
+from src.conversion.sheet_store import index_sheets
+
+CRITERIA_CASES = [
+    ('">10"', 11, True),
+    ('">10"', 10, False),
+    ('">=10"', 10.0, True),
+    ('"<=2"', 3, False),
+    ('"<5"', "text", False),
+    ('"<>x"', "X", False),
+    ('"<>x"', "y", True),
+    ('"<>x"', None, True),
+    ('"<>"', None, False),
+    ('"<>"', 0, True),
+    ('"=abc"', "ABC", True),
+    ('"5"', 5, True),
+    ('"5"', "5", True),
+    ('"=5"', 5.0, True),
+    ('"a*"', "Apple", True),
+    ('"a*"', "banana", False),
+    ('"?at"', "cat", True),
+    ('"?at"', "chat", False),
+    ('"~*"', "*", True),
+    ('"~*"', "x", False),
+    ('">b"', "c", True),
+    ('""', "", True),
+    ('""', None, True),
+    (7, 7, True),
+    (7, "7", True),
+    (7, "seven", False),
+    ("Auto", "auto", True),
+]
+
+
+@pytest.mark.parametrize("criteria, value, expected", CRITERIA_CASES)
+def test_criteria(criteria, value, expected):
+    assert evaluate_criteria(value, criteria) is expected
+
+
+def test_compiled_criteria_are_cached():
+    assert compile_criteria('">=10"') is compile_criteria('">=10"')
+
+
+def test_boolean_and_number_criteria_are_cached_apart():
+    # True == 1 == 1.0, but a boolean criterion only matches booleans and "TRUE"
+    data = {'S': {'A1': True, 'A2': 1, 'A3': 1.0, 'A4': 'TRUE', 'A5': 'true'}}
+    assert count_if_range(data, 'S', 'A1', 'A5', True) == 3
+    assert count_if_range(data, 'S', 'A1', 'A5', 1) == 2
+    assert count_if_range(data, 'S', 'A1', 'A5', 1.0) == 2
+    assert count_if_range(data, 'S', 'A1', 'A5', True) == 3
+
+
+def test_range_criteria_functions():
+    data = {'S': {'A1': 5, 'A2': 15, 'A3': "n/a", 'A4': 25, 'B1': 'x', 'B2': 'y', 'B3': 'x', 'B4': 'x'}}
+    assert count_if_range(data, 'S', 'A1', 'A4', '">10"') == 2
+    assert sum_if(data, 'S', 'A1', 'A4', '">10"') == 40
+    assert countifs(data, [('S', 'A1:A4', '">1"'), ('S', 'B1:B4', '"x"')]) == 2
+    # Ranges are aligned by position, not absolute row
+    assert countifs(data, [('S', 'A2:A3', '">10"'), ('S', 'B3:B4', '"x"')]) == 1
+    assert countifs(data, [('S', 'A1:A4', '">1"'), ('S', 'B1:B3', '"x"')]) == "#VALUE!"
+
+
+@pytest.mark.parametrize("criteria, value, expected", CRITERIA_CASES)
+def test_columnar_countifs_matches_criteria(criteria, value, expected):
+    data = {'S': {'A1': value, 'A2': 'pad'}}
+    assert countifs(data, [('S', 'A1:A1', criteria)]) == int(expected)
+    assert countifs(index_sheets(data), [('S', 'A1:A1', criteria)]) == int(expected)
+
+
+def test_aggregate_ifs():
+    data = {'S': {
+        'A1': 'x', 'A2': 'y', 'A3': 'x', 'A4': 'x', 'A5': 'x',
+        'B1': 1, 'B2': 5, 'B3': 9, 'B4': 12, 'B5': 3,
+        'C1': 10, 'C2': 20, 'C3': "n/a", 'C4': 40, 'C5': 2.5,
+    }}
+    for sheets in (data, index_sheets(data)):
+        criteria = [('S', 'A1:A5', '"x"'), ('S', 'B1:B5', '">2"')]
+        assert countifs(sheets, criteria) == 3
+        assert sumifs(sheets, ('S', 'C1:C5'), criteria) == 42.5
+        assert averageifs(sheets, ('S', 'C1:C5'), criteria) == 21.25
+        assert maxifs(sheets, ('S', 'C1:C5'), criteria) == 40
+        assert type(sumifs(sheets, ('S', 'C1:C4'), [('S', 'A1:A4', '"x"')])) is int
+        assert maxifs(sheets, ('S', 'C1:C5'), [('S', 'A1:A5', '"z"')]) == 0
+        assert sumifs(sheets, ('S', 'C1:C4'), criteria) == "#VALUE!"
+
+
+def test_aggregate_ifs_keys():
+    data = {'S': {'by_key': {'r1': 'x', 'r2': 'y', 'r3': 'x', 'v1': 4, 'v2': 6, 'v3': 8}}}
+    regions, values = ['r1', 'r2', 'r3'], ['v1', 'v2', 'v3']
+    assert countifs_keys(data, 'S', [regions, values], ['"x"', '">4"']) == 1
+    assert sumifs_keys(data, 'S', values, [regions], ['"x"']) == 12
+    assert averageifs_keys(data, 'S', values, [regions], ['"x"']) == 6
+    assert maxifs_keys(data, 'S', values, [regions], ['"<>x"']) == 6
+
+
+def _price_table(rows=200, seed=11):
+    rng = random.Random(seed)
+    cells = {}
+    for row in range(1, rows + 1):
+        cells[f"A{row}"] = rng.choice([rng.randint(0, 60), f"sku{rng.randint(0, 30)}"])
+        if row % 17:
+            cells[f"B{row}"] = row * 10
+    return cells
+
+
+def test_indexed_vlookup_matches_scan():
+    plain = {'P': _price_table()}
+    indexed = index_sheets(plain)
+    lookups = list(range(-1, 65)) + [f"sku{i}" for i in range(32)]
+    for lookup in lookups:
+        for exact in (True, False):
+            expected = vlookup(lookup, plain, 'P', 'A1:B200', 2, exact)
+            assert vlookup(lookup, indexed, 'P', 'A1:B200', 2, exact) == expected, (lookup, exact)
+    assert any(key[0] == 'lookup' for key in indexed['P']._derived)
+
+
+def test_indexed_vlookup_sees_writes():
+    data = index_sheets({'P': {'A1': 'a', 'B1': 1, 'A2': 'b', 'B2': 2, 'A3': 'c', 'B3': 3}})
+    for _ in range(3):
+        assert vlookup('b', data, 'P', 'A1:B3', 2) == 2
+    data['P']['A2'] = 'z'
+    assert vlookup('b', data, 'P', 'A1:B3', 2) == "#N/A"
+    assert vlookup('z', data, 'P', 'A1:B3', 2) == 2
+
+
+def test_lookups_past_column_z():
+    data = {'S': {'Z1': 'k', 'AA1': 'wide', 'AB2': 'deep'}}
+    assert vlookup('k', data, 'S', 'Z1:AA1', 2) == 'wide'
+    assert index(data, 'S', 'AA1:AB2', 2, 2) == 'deep'
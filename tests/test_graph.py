@@ -0,0 +1,59 @@
+import random
+
+import networkx as nx
+import pytest
+
+from src.conversion.graph import DependencyGraph
+
+
+def _random_dag(nodes=300, edges=1200, seed=2):
+    rng = random.Random(seed)
+    names = [f"S!A{i}" for i in range(nodes)]
+    pairs = []
+    for _ in range(edges):
+        a, b = sorted(rng.sample(range(nodes), 2))
+        pairs.append((names[a], names[b]))
+    return names, pairs
+
+
+def test_graph_matches_networkx():
+    names, pairs = _random_dag()
+    graph = DependencyGraph(pairs + pairs[:50])
+    reference = nx.DiGraph(pairs)
+    assert graph.number_of_nodes() == reference.number_of_nodes()
+    assert graph.number_of_edges() == reference.number_of_edges(), "duplicate edges are dropped"
+    for node in names[::7]:
+        if node in reference:
+            assert sorted(graph.successors(node)) == sorted(reference.successors(node))
+            assert sorted(graph.predecessors(node)) == sorted(reference.predecessors(node))
+            assert graph.ancestors(node) == nx.ancestors(reference, node)
+
+    order = graph.topological_sort()
+    position = {node: i for i, node in enumerate(order)}
+    assert all(position[a] < position[b] for a, b in pairs)
+    assert nx.utils.graphs_equal(graph.to_networkx(), reference)
+
+
+def test_graph_grows_after_queries_and_detects_cycles():
+    graph = DependencyGraph([("S!A1", "S!B1")])
+    copy = graph.copy()
+    assert graph.topological_sort() == ["S!A1", "S!B1"]
+    graph.add_edge("S!B1", "S!C1")
+    assert graph.ancestors("S!C1") == {"S!A1", "S!B1"}
+    assert "S!C1" not in copy
+    graph.add_edge("S!C1", "S!A1")
+    with pytest.raises(ValueError, match="Circular dependency detected!"):
+        graph.topological_sort()
+
+
+def test_strongly_connected_components_in_dependency_order():
+    rng = random.Random(11)
+    edges = [(f"S!A{rng.randint(1, 60)}", f"S!A{rng.randint(1, 60)}") for _ in range(90)]
+    graph = DependencyGraph(edges)
+    components = graph.strongly_connected_components()
+    expected = {frozenset(c) for c in nx.strongly_connected_components(graph.to_networkx())}
+    assert {frozenset(c) for c in components} == expected
+
+    position = {node: i for i, component in enumerate(components) for node in component}
+    assert all(position[source] <= position[target] for source, target in graph.edges())
+    assert graph.has_self_loop("S!A1") == (("S!A1", "S!A1") in set(graph.edges()))
@@ -97,3 +97,24 @@ def test_execution_with_evaluator_sum_keys_and_get_value():
     results = evaluate_rules(rules, mock_data)
     assert results['C1'] == (57351 + 2016)
     assert results['C2'] == '6-cylinder'
+
+
+def test_rule_set_compiles_once_and_isolates_errors():
+    from src.evaluation.evaluator import RuleSet, compile_rule
+    rules = [
+        {'cell': 'C1', 'python_expression': "sum_keys(data, 'Source', ['Mileage', 'Year'])"},
+        {'cell': 'C2', 'python_expression': "get_value(data, 'Source', 'Year') / 0"},
+        {'cell': 'C3', 'python_expression': "get_value(data, 'Source',"},
+        {'cell': 'C4', 'python_expression': "safe_execute(lambda: get_cell(data, 'Source', 'B5') + 1, 0)"},
+    ]
+    expected = {'C1': 57351 + 2016, 'C2': None, 'C3': None, 'C4': 57352}
+
+    for combined in (False, True):
+        rule_set = RuleSet(rules, combined=combined)
+        assert rule_set.evaluate(mock_data) == expected
+        # The same compiled rule set is reusable across datasets
+        other = {'Source': {'B5': 1, 'by_key': {'Mileage': 1, 'Year': 2}}}
+        assert rule_set.evaluate(other) == {'C1': 3, 'C2': None, 'C3': None, 'C4': 2}
+
+    assert compile_rule(rules[0]['python_expression']) is compile_rule(rules[0]['python_expression'])
+    assert compile_rule.cache_info().maxsize is not None
@@ -0,0 +1,25 @@
+import os
+
+from src.conversion.parallel import map_files
+
+
+def _measure(path):
+    if path.startswith('bad'):
+        raise ValueError(f"cannot read {path}")
+    if path == 'crash':
+        os._exit(1)
+    return len(path)
+
+
+def test_map_files_isolates_failures():
+    paths = ['a', 'bad1', 'ccc', 'dddd', 'bad2', 'ee']
+    expected = [(p, None, f"cannot read {p}") if p.startswith('bad') else (p, len(p), None) for p in paths]
+    assert list(map_files(_measure, paths)) == expected
+    assert list(map_files(_measure, paths, workers=2, max_in_flight=3, ordered=True)) == expected
+    assert sorted(map_files(_measure, paths, workers=2), key=str) == sorted(expected, key=str)
+
+
+def test_map_files_survives_dead_workers():
+    results = list(map_files(_measure, ['a', 'crash', 'bb', 'ccc'], workers=2, max_in_flight=1, ordered=True))
+    assert [(path, result) for path, result, _ in results] == [('a', 1), ('crash', None), ('bb', 2), ('ccc', 3)]
+    assert results[1][2].startswith("worker process died")
@@ -0,0 +1,26 @@
+import io
+
+from src.conversion.converter import ExcelToPythonConverter, build_dependency_graph, topological_sort
+from src.conversion.rules_generator import generate_python_rules_file, order_formulas, write_python_rules_file
+
+
+def test_rules_file_follows_order_and_skips_inputs():
+    converter = ExcelToPythonConverter({})
+    shared_data = {'cell_to_key_map': {}}
+    formulas = [("=B1*2", "B2"), ("=SUM(A1:A3)+B2", "B3"), ("=A1", "B1")]
+    converted = [converter.analyze_formula(f, cell, "S", shared_data) for f, cell in formulas]
+    order = topological_sort(build_dependency_graph(converted))
+    assert "S!A1:A3" in order
+
+    ordered = order_formulas(converted, order)
+    assert [f.cell_reference for f in ordered] == ["B1", "B2", "B3"]
+
+    out = io.StringIO()
+    write_python_rules_file(out, converter, converted, shared_data, order)
+    code = generate_python_rules_file(converter, converted, shared_data, order)
+    assert out.getvalue() == code
+    assert code.index("def rule_s_b1(") < code.index("def rule_s_b2(") < code.index("def rule_s_b3(")
+
+    module = {}
+    exec(compile(code, '<rules>', 'exec'), module)
+    assert module['rule_s_b2']({'S': {'B1': 4}}, {}) == 8
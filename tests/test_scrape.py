@@ -0,0 +1,119 @@
+import datetime
+import zipfile
+
+import pytest
+from openpyxl import Workbook, load_workbook
+
+from src.conversion.excel_functions import count_if_range, count_range, index, sum_range
+from src.utils.scrape import _extract_sheet, extract_data_and_formulas_from_excel
+from src.utils.xlsx_reader import XlsxReader
+
+
+def _share_formulas(path, part, first_row, last_row):
+    """Rewrite D{first_row}:D{last_row} of a sheet as one Excel-style shared formula."""
+    with zipfile.ZipFile(path) as zin:
+        items = [(item, zin.read(item.filename)) for item in zin.infolist()]
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as zout:
+        for item, data in items:
+            if item.filename == part:
+                xml = data.decode()
+                xml = xml.replace(f'<f>C{first_row}*2</f>',
+                                  f'<f t="shared" ref="D{first_row}:D{last_row}" si="0">C{first_row}*2</f><v>20</v>')
+                for r in range(first_row + 1, last_row + 1):
+                    xml = xml.replace(f'<f>C{r}*2</f>', '<f t="shared" si="0"/>')
+                data = xml.encode()
+            zout.writestr(item, data)
+
+
+@pytest.fixture
+def workbook_path(tmp_path):
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Formulas"
+    ws["A1"] = "Key"
+    ws["B1"] = "Value"
+    ws["A2"] = " Mileage "
+    ws["B2"] = 57351
+    ws["A3"] = "Year"
+    ws["B3"] = 2016
+    ws["C2"] = "=B2/SUM($B$2:$B$3)"
+    ws["E5"] = datetime.datetime(2020, 5, 17)
+    ws["F6"].number_format = "0.00"  # styled but empty
+    ws["AX900"].number_format = "0.00"  # phantom used range
+
+    source = wb.create_sheet("Source")
+    for r in range(1, 5):
+        source[f"B{r}"] = f"label{r}"
+        source[f"C{r}"] = r * 10
+        source[f"D{r}"] = f"=C{r}*2"
+    wb.create_sheet("Empty")
+
+    path = tmp_path / "book.xlsx"
+    wb.save(path)
+    _share_formulas(path, "xl/worksheets/sheet2.xml", 1, 4)
+    return str(path)
+
+
+def test_reader_yields_values_and_formulas_in_one_pass(workbook_path):
+    with XlsxReader(workbook_path) as reader:
+        assert reader.sheetnames == ["Formulas", "Source", "Empty"]
+        cells = {(r, c): (v, f) for r, c, v, f in reader.iter_cells("Source")}
+        assert list(reader.iter_cells("Empty")) == []
+    assert cells[(1, 2)] == ("label1", None)
+    assert cells[(1, 3)] == (10, None)
+    # The shared formula master keeps its cached value; followers are translated per row
+    assert cells[(1, 4)] == (20, "=C1*2")
+    assert cells[(3, 4)] == (None, "=C3*2")
+
+
+def test_extraction_matches_openpyxl(workbook_path):
+    extracted = extract_data_and_formulas_from_excel(workbook_path)
+    formulas_wb = load_workbook(workbook_path)
+    values_wb = load_workbook(workbook_path, data_only=True)
+
+    for sheet_name in formulas_wb.sheetnames:
+        expected_data = {c.coordinate: c.value for row in values_wb[sheet_name].iter_rows() for c in row}
+        expected_formulas = [{"cell": c.coordinate, "formula": c.value}
+                             for row in formulas_wb[sheet_name].iter_rows() for c in row if c.data_type == 'f']
+        assert extracted[sheet_name]["data"] == expected_data
+        assert extracted[sheet_name]["formulas"] == expected_formulas
+
+    assert extracted["Formulas"]["data"]["E5"] == datetime.datetime(2020, 5, 17)
+    assert extracted["Formulas"]["key_values"] == {"Mileage": 57351, "Year": 2016}
+    assert extracted["Formulas"]["cell_to_key"] == {"B2": "Mileage", "B3": "Year"}
+    # No header row: labels in B pair up with values in C
+    assert extracted["Source"]["cell_to_key"] == {f"C{r}": f"label{r}" for r in range(1, 5)}
+
+
+def test_sparse_extraction_skips_blank_cells(workbook_path):
+    dense = extract_data_and_formulas_from_excel(workbook_path)
+    sparse = extract_data_and_formulas_from_excel(workbook_path, sparse=True)
+
+    for sheet_name, sheet in dense.items():
+        formula_cells = {f["cell"] for f in sheet["formulas"]}
+        expected = {ref: v for ref, v in sheet["data"].items() if v is not None or ref in formula_cells}
+        assert dict(sparse[sheet_name]["data"]) == expected
+        for key in ("formulas", "key_values", "cell_to_key"):
+            assert sparse[sheet_name][key] == sheet[key]
+
+    assert "AX900" in dense["Formulas"]["data"] and "AX900" not in sparse["Formulas"]["data"]
+    # Missing cells read as blank in range functions
+    data = {name: sheet["data"] for name, sheet in dense.items()}
+    sparse_data = {name: sheet["data"] for name, sheet in sparse.items()}
+    for function, args in ((sum_range, ('A1', 'F6')), (count_range, ('A1', 'F6')),
+                           (count_if_range, ('A1', 'F6', '""')), (count_if_range, ('A1', 'F6', '"<>x"'))):
+        assert function(sparse_data, 'Formulas', *args) == function(data, 'Formulas', *args)
+    assert index(sparse_data, 'Formulas', 'A1:F6', 6, 6) is None
+    assert index(sparse_data, 'Formulas', 'A1:F6', 7, 1) == "#REF!"
+
+
+def test_layout_detection_from_records():
+    # Criteria matrix: a 'Key' header with one column per criterion, no Key/Value pair
+    records = [(1, 1, "Key", None), (1, 2, "Choice1", None), (1, 3, "Choice2", None),
+               (2, 1, "Color", None), (2, 2, "Red", None), (2, 3, "Blue", None),
+               (3, 1, " Size ", None), (3, 2, 1, None), (4, 1, "", None)]
+    result = _extract_sheet(iter(records))
+    assert result["cell_to_key"] == {"B2": "Color:Choice1", "C2": "Color:Choice2",
+                                     "B3": "Size:Choice1", "C3": "Size:Choice2"}
+    assert result["key_values"] == {"Color:Choice1": "Red", "Color:Choice2": "Blue",
+                                    "Size:Choice1": 1, "Size:Choice2": None}
@@ -0,0 +1,129 @@
+import datetime
+import math
+import pickle
+import random
+
+import pytest
+
+from src.conversion.excel_functions import average_range, column_letter, count_range, sum_range
+from src.conversion.sheet_store import IndexedSheet, SheetStore, index_sheets
+from src.evaluation.engine import RuleEngine
+
+
+def _random_sheet(rows=40, cols=30, seed=7):
+    rng = random.Random(seed)
+    cells = {}
+    for row in range(1, rows + 1):
+        for col in range(1, cols + 1):
+            choice = rng.random()
+            ref = f"{column_letter(col)}{row}"
+            if choice < 0.4:
+                cells[ref] = rng.randint(-50, 50)
+            elif choice < 0.6:
+                cells[ref] = rng.choice(["", "text", None, True])
+            elif choice < 0.8:
+                cells[ref] = rng.randint(0, 8) / 4
+    cells['by_key'] = {'Total': 1}
+    return cells
+
+
+def test_column_letter():
+    assert [column_letter(n) for n in (1, 26, 27, 52, 703)] == ['A', 'Z', 'AA', 'AZ', 'AAA']
+
+
+def test_indexed_ranges_match_plain_scans():
+    plain = {'S': _random_sheet()}
+    indexed = index_sheets(plain)
+    rng = random.Random(3)
+    for _ in range(300):
+        r1, r2 = sorted(rng.randint(1, 45) for _ in range(2))
+        c1, c2 = sorted(rng.randint(1, 32) for _ in range(2))
+        start, end = f"{column_letter(c1)}{r1}", f"${column_letter(c2)}${r2}"
+        for function in (sum_range, count_range, average_range):
+            expected = function(plain, 'S', start, end)
+            actual = function(indexed, 'S', start, end)
+            assert type(actual) is type(expected)
+            assert abs(actual - expected) < 1e-9
+    assert indexed['S']._derived, "repeated queries should build the prefix-sum index"
+
+
+def test_writes_invalidate_index():
+    data = {'S': IndexedSheet({'A1': 1, 'A2': 2, 'A3': 3})}
+    for _ in range(3):
+        assert sum_range(data, 'S', 'A1', 'A3') == 6
+    data['S']['A2'] = 20
+    assert sum_range(data, 'S', 'A1', 'A3') == 24
+    assert count_range(data, 'S', 'A1', 'A4') == 3
+
+    copy = data['S'].copy()
+    copy['A1'] = 100
+    assert sum_range({'S': copy}, 'S', 'A1', 'A3') == 123
+    assert sum_range(data, 'S', 'A1', 'A3') == 24
+
+    restored = pickle.loads(pickle.dumps(data['S']))
+    assert isinstance(restored, IndexedSheet) and restored == data['S']
+
+
+@pytest.mark.parametrize("big", [3.5e12, 1e17])
+@pytest.mark.parametrize("make_sheet", [IndexedSheet, SheetStore.from_cells])
+def test_small_floats_below_a_large_value_sum_like_a_scan(make_sheet, big):
+    plain = {'S': {'B1': big, 'B2': 0.07, 'B3': 0.07, 'B4': 0.07, 'C1': 1.5, 'C2': 2.25}}
+    expected = sum_range(plain, 'S', 'B2', 'B4')
+    indexed = {'S': make_sheet(plain['S'])}
+    assert [sum_range(indexed, 'S', 'B2', 'B4') for _ in range(3)] == [expected] * 3
+    assert 'range' in indexed['S']._derived
+    assert sum_range(indexed, 'S', 'C1', 'C2') == 3.75
+
+
+def test_sheet_store_behaves_like_the_dict():
+    cells = _random_sheet(rows=12, cols=6)
+    cells.update({'G1': 2 ** 60, 'G2': datetime.date(2024, 1, 2), 'G3': -0.0})
+    store = SheetStore.from_cells(cells)
+    assert store == cells and set(store) == set(cells)
+    assert list(store)[:3] == ['A1', 'B1', 'C1'], "cells iterate row by row"
+    assert len(store) == len(cells)
+    for ref, value in cells.items():
+        assert type(store[ref]) is type(value) and store[ref] == value
+    assert 'Z99' not in store and store.get('Z99') is None and store.get_at(0, 6) == 2 ** 60
+
+    store['Z99'] = 'far'
+    assert store[98, 25] == 'far' and store.shape >= (99, 26)
+    del store['A1']
+    assert 'A1' not in store and len(store) == len(cells)
+
+    restored = pickle.loads(pickle.dumps(store))
+    assert isinstance(restored, SheetStore) and restored == store
+
+
+@pytest.mark.parametrize("huge_int", [False, True])
+def test_sheet_store_ranges_match_plain_scans(huge_int):
+    plain = {'S': _random_sheet()}
+    if huge_int:
+        # Beyond float64 precision: kept as an object and summed exactly
+        plain['S']['B3'] = 2 ** 60
+    stored = {'S': SheetStore.from_cells(plain['S'])}
+    rng = random.Random(5)
+    for _ in range(300):
+        r1, r2 = sorted(rng.randint(1, 45) for _ in range(2))
+        c1, c2 = sorted(rng.randint(1, 32) for _ in range(2))
+        start, end = f"{column_letter(c1)}{r1}", f"{column_letter(c2)}{r2}"
+        for function in (sum_range, count_range, average_range):
+            expected = function(plain, 'S', start, end)
+            actual = function(stored, 'S', start, end)
+            assert type(actual) is type(expected) and math.isclose(actual, expected, abs_tol=1e-9)
+    assert 'range' in stored['S']._derived
+
+    stored['S']['A1'] = 1000
+    plain['S']['A1'] = 1000
+    assert sum_range(stored, 'S', 'A1', 'AF40') == sum_range(plain, 'S', 'A1', 'AF40')
+
+
+def test_engine_evaluates_on_sheet_stores():
+    rules = [{'sheet': 'S', 'cell': 'B1', 'python_expression': "sum_range(data, 'S', 'A1', 'A3')",
+              'dependencies': ['S!A1', 'S!A2', 'S!A3']}]
+    data = {'S': SheetStore.from_cells({'A1': 1, 'A2': 2.5, 'A3': 'x', 'by_key': {}})}
+    workbook = RuleEngine(rules).bind(data)
+    assert workbook.values == {'S!B1': 3.5}
+    workbook.set_value('S', 'A3', 4)
+    assert workbook.recalc() == {'S!B1': 7.5}
+    assert data['S']['A3'] == 'x'
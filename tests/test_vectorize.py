@@ -0,0 +1,120 @@
+import numpy as np
+
+from src.conversion.converter import ExcelToPythonConverter, build_dependency_graph, topological_sort
+from src.conversion.rules_generator import generate_python_rules_file
+from src.conversion.vectorize import vectorize_expression
+from src.evaluation.engine import RuleEngine
+
+cell_to_key_map = {
+    'Source': {'B5': 'Mileage', 'B6': 'Year', 'B12': 'Engine', 'B14': 'Made in'},
+    'Formulas': {'B2': 'Mileage weight'},
+}
+
+FORMULAS = [
+    ("=IF(Source!B5<=60000,1,0)", "E2"),
+    ('=IF(OR(Source!B12="6-cylinder",Source!B12="8-cylinder"),1,0)', "E3"),
+    ("=IF(AND(Source!B6>=2015,NOT(Source!B5>100000)),E2*B2,0)", "E4"),
+    ('=IF(E4>10,"Good match",E4)', "E5"),
+    ("=SUM(Source!B5:B6)", "E6"),
+    ('=IFERROR(FIND("GER",Source!B14),0)', "E7"),
+]
+
+
+def _base_data():
+    return {
+        'Source': {'by_key': {'Mileage': 57351, 'Year': 2016, 'Engine': '6-cylinder', 'Made in': 'Stuttgart, GER'}},
+        'Formulas': {'B2': 100, 'by_key': {'Mileage weight': 100}},
+    }
+
+
+def _convert():
+    converter = ExcelToPythonConverter({})
+    shared_data = {'cell_to_key_map': cell_to_key_map}
+    converted = [converter.analyze_formula(f, cell, "Formulas", shared_data) for f, cell in FORMULAS]
+    order = topological_sort(build_dependency_graph(converted))
+    return converter, converted, shared_data, order
+
+
+def test_vectorize_expression_rewrites_conditionals():
+    source, reason = vectorize_expression("(1 if (get_value(data, 'S', 'K') > 3) and not x else 0)")
+    assert reason is None
+    assert source == "v_where(v_and(get_value(data, 'S', 'K') > 3, v_not(x)), 1, 0)"
+    assert vectorize_expression("safe_execute(lambda: 1 / 0, 0)") == (None, "no vectorized form for safe_execute")
+
+
+def test_numpy_backend_matches_scalar_evaluation():
+    converter, converted, shared_data, order = _convert()
+    code = generate_python_rules_file(converter, converted, shared_data, order, backend='numpy')
+    module = {}
+    exec(compile(code, '<numpy rules>', 'exec'), module)
+    assert module['FALLBACK_RULES'] == {'Formulas!E7': 'no vectorized form for safe_execute'}
+
+    records = {
+        'Source:Mileage': [57351, 120000, 20000, 80000],
+        'Source:Year': [2016, 2018, 2010, 2020],
+        'Source:Engine': ['6-cylinder', '4-cylinder', '8-cylinder', 'electric'],
+        'Source:Made in': ['Stuttgart, GER', 'Detroit, USA', 'Munich, GER', 'Tokyo, JPN'],
+    }
+    rules = [
+        {"sheet": c.sheet, "cell": c.cell_reference, "python_expression": c.python_expression}
+        for c in converted
+    ]
+    engine = RuleEngine(rules, build_dependency_graph(converted), cell_to_key_map)
+    expected = engine.evaluate_batch(_base_data(), records)
+
+    data = _base_data()
+    for column, values in records.items():
+        sheet, key = column.split(':')
+        data[sheet]['by_key'][key] = np.array(values, dtype=object)
+    results = module['evaluate'](data)
+
+    assert set(results) == set(expected)
+    for node, values in expected.items():
+        assert list(np.broadcast_to(results[node], len(values))) == values, node
+
+
+def test_guarded_division_is_evaluated_per_element():
+    expression = "(0 if get_cell(data, 'S', 'B5') == 0 else 100 / get_cell(data, 'S', 'B5'))"
+    assert vectorize_expression(expression) == (None, "no vectorized form for a conditional branch that can raise")
+
+    converter = ExcelToPythonConverter({})
+    shared_data = {'cell_to_key_map': cell_to_key_map}
+    converted = [converter.analyze_formula("=IF(Source!B5=0,0,100/Source!B5)", "E8", "Formulas", shared_data)]
+    code = generate_python_rules_file(converter, converted, shared_data, ["Formulas!E8"], backend='numpy')
+    module = {}
+    exec(compile(code, '<numpy rules>', 'exec'), module)
+    assert list(module['FALLBACK_RULES']) == ['Formulas!E8']
+
+    data = _base_data()
+    data['Source']['by_key']['Mileage'] = np.array([0, 50, 0], dtype=object)
+    assert list(module['evaluate'](data)['Formulas!E8']) == [0, 2, 0]
+
+
+def test_unguarded_zero_divisor_and_mixed_comparison_match_scalar_evaluation():
+    converter = ExcelToPythonConverter({})
+    shared_data = {'cell_to_key_map': cell_to_key_map}
+    formulas = [("=Source!B5/Source!B6", "E9"), ("=IF(Source!B12>3,1,0)", "E10")]
+    converted = [converter.analyze_formula(f, cell, "Formulas", shared_data) for f, cell in formulas]
+    order = topological_sort(build_dependency_graph(converted))
+    code = generate_python_rules_file(converter, converted, shared_data, order, backend='numpy')
+    module = {}
+    exec(compile(code, '<numpy rules>', 'exec'), module)
+    assert module['FALLBACK_RULES'] == {}
+
+    records = {'Source:Mileage': [10, 10, 10], 'Source:Year': [2, 0, 5], 'Source:Engine': [4, 'V8', 2]}
+    rules = [{"sheet": c.sheet, "cell": c.cell_reference, "python_expression": c.python_expression}
+             for c in converted]
+    engine = RuleEngine(rules, build_dependency_graph(converted), cell_to_key_map)
+    expected = engine.evaluate_batch(_base_data(), records)
+    assert expected == {'Formulas!E9': [5.0, None, 2.0], 'Formulas!E10': [1, None, 0]}
+
+    # Object arrays raise on the zero divisor, numeric arrays give inf
+    for dtype in (object, None):
+        data = _base_data()
+        by_key = data['Source']['by_key']
+        by_key['Mileage'], by_key['Year'] = (np.array(records[c], dtype=dtype) for c in ('Source:Mileage', 'Source:Year'))
+        by_key['Engine'] = np.array(records['Source:Engine'], dtype=object)
+        results = module['evaluate'](data)
+        for node, values in expected.items():
+            assert list(results[node]) == values, (node, dtype)
+    assert set(module['FALLBACK_RULES']) == {'Formulas!E9', 'Formulas!E10'}